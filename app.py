@@ -3,46 +3,107 @@ from flask import Flask
 from flask_cors import CORS
 from dotenv import load_dotenv
 from flask_jwt_extended import JWTManager
-from flask_migrate import Migrate, upgrade
+from datetime import timedelta
+from flask_migrate import Migrate
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
 import logging
 
-from db import db
+from db import db, engine_options
 from routes.auth import auth_bp
 from routes.tasks import tasks_bp
 from routes.contacts import contacts_bp
 from routes.accounts import accounts_bp
 from routes.journal import journal_bp
 from routes.books import books_bp
+from balances import balances_cli
+from cache import init_cache
+from authz import init_authz
+from passwords import init_passwords
+from storage import attachments_cli, init_storage
+from jobs import worker_command
+from tokens import init_tokens, tokens_cli
+from ratelimit import init_rate_limits
+from metrics import init_metrics
+from logging_setup import configure_logging, init_request_ids
+from release import release_command, run_migrations
 
 
 load_dotenv()
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s %(name)s %(threadName)s : %(message)s",
-    handlers=[
-        logging.FileHandler("app.log"),
-        logging.StreamHandler()
-    ]
-)
+# Request threads only enqueue log records; a background thread writes them
+configure_logging()
 
 logger = logging.getLogger(__name__)
 
+def env_flag(name, default):
+    return os.getenv(name, default).lower() not in ("0", "off", "false", "no")
+
+def register_blueprints(app):
+    app.register_blueprint(auth_bp, url_prefix="/api/auth")
+    app.register_blueprint(tasks_bp, url_prefix="/api/tasks")
+    app.register_blueprint(contacts_bp, url_prefix="/api/contacts")
+    app.register_blueprint(accounts_bp, url_prefix="/api/accounts")
+    app.register_blueprint(journal_bp, url_prefix="/api/journal")
+    app.register_blueprint(books_bp, url_prefix="/api/books")
+
 def create_app():
     app = Flask(__name__)
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv("DATABASE_URL")
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
     app.config['JWT_SECRET_KEY'] = os.getenv("SECRET_KEY")
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(minutes=int(os.getenv("JWT_ACCESS_MINUTES", 15)))
+    app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=int(os.getenv("JWT_REFRESH_DAYS", 30)))
+    # Seconds between each worker's pulls of tokens revoked through other workers
+    app.config['BLOCKLIST_REFRESH'] = int(os.getenv("BLOCKLIST_REFRESH", 30))
+    app.config['REPORT_CACHE_ENABLED'] = env_flag("REPORT_CACHE", "on")
+    app.config['REPORT_CACHE_URL'] = os.getenv("REPORT_CACHE_URL")
+    app.config['REPORT_CACHE_TTL'] = int(os.getenv("REPORT_CACHE_TTL", 60))
+    app.config['REPORT_CACHE_SIZE'] = int(os.getenv("REPORT_CACHE_SIZE", 512))
+    app.config['AUTHZ_CACHE_TTL'] = int(os.getenv("AUTHZ_CACHE_TTL", 300))
+    # werkzeug method string, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000"
+    app.config['PASSWORD_HASH_METHOD'] = os.getenv("PASSWORD_HASH_METHOD")
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv("PASSWORD_HASH_WORKERS", 0))
+    app.config['PASSWORD_HASH_QUEUE'] = int(os.getenv("PASSWORD_HASH_QUEUE", 0))
+    # 0 disables the limiter
+    app.config['LOGIN_IP_PER_MINUTE'] = int(os.getenv("LOGIN_IP_PER_MINUTE", 30))
+    app.config['LOGIN_ACCOUNT_PER_MINUTE'] = int(os.getenv("LOGIN_ACCOUNT_PER_MINUTE", 10))
+    # "local" (files under STORAGE_DIR) or "s3" (needs boto3 and S3_BUCKET)
+    app.config['STORAGE_BACKEND'] = os.getenv("STORAGE_BACKEND", "local")
+    app.config['STORAGE_DIR'] = os.getenv("STORAGE_DIR", "uploads")
+    app.config['S3_BUCKET'] = os.getenv("S3_BUCKET")
+    app.config['S3_ENDPOINT_URL'] = os.getenv("S3_ENDPOINT_URL")
+    app.config['S3_PREFIX'] = os.getenv("S3_PREFIX", "")
+    app.config['MAX_UPLOAD_BYTES'] = int(os.getenv("MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
+    # Background jobs (`flask worker`): threads per process, idle poll seconds,
+    # and seconds before a job left running by a dead worker is retried
+    app.config['JOB_WORKER_THREADS'] = int(os.getenv("JOB_WORKER_THREADS", 2))
+    app.config['JOB_POLL_INTERVAL'] = float(os.getenv("JOB_POLL_INTERVAL", 2))
+    app.config['JOB_TIMEOUT'] = int(os.getenv("JOB_TIMEOUT", 600))
+    # Set MIGRATE_ON_START=0 and run `flask release` once per deploy instead
+    app.config['MIGRATE_ON_START'] = env_flag("MIGRATE_ON_START", "1")
+    # Requests issuing more queries than this are logged as warnings (0 disables)
+    app.config['QUERY_BUDGET'] = int(os.getenv("QUERY_BUDGET", 50))
+    app.config['METRICS_TOKEN'] = os.getenv("METRICS_TOKEN")
 
     db.init_app(app)
+    init_cache(app)
+    init_authz(app)
+    init_passwords(app)
+    init_rate_limits(app)
+    init_storage(app)
+    init_request_ids(app)
+    init_metrics(app)
     migrate = Migrate(app, db)
     jwt = JWTManager(app)
+    init_tokens(app, jwt)
 
     # Correct CORS setup for frontend (Vercel + optional localhost)
     CORS(
         app,
         supports_credentials=True,
+        expose_headers=["ETag", "X-Request-ID"],
         resources={r"/api/*": {"origins": [
             "https://crm-web-app-orpin.vercel.app",
             "http://localhost:5173"
@@ -51,24 +112,33 @@ def create_app():
 
     app.url_map.strict_slashes = False
 
+    # Behind a load balancer, trust this many X-Forwarded-For hops so the
+    # login rate limit sees client addresses rather than the proxy's
+    proxy_hops = int(os.getenv("PROXY_FIX_X_FOR", 0))
+    if proxy_hops:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_hops)
+
     # Register blueprints
-    app.register_blueprint(auth_bp, url_prefix="/api/auth")
-    app.register_blueprint(tasks_bp, url_prefix="/api/tasks")
-    app.register_blueprint(contacts_bp, url_prefix="/api/contacts")
-    app.register_blueprint(accounts_bp, url_prefix="/api/accounts")
-    app.register_blueprint(journal_bp, url_prefix="/api/journal")
-    app.register_blueprint(books_bp, url_prefix="/api/books")
+    register_blueprints(app)
+
+    app.cli.add_command(balances_cli)
+    app.cli.add_command(tokens_cli)
+    app.cli.add_command(attachments_cli)
+    app.cli.add_command(worker_command)
+    app.cli.add_command(release_command)
 
-    logger.info("Starting migrations...")
-    with app.app_context():
-        try:
-            upgrade()
-            logger.info("Database migrations applied successfully.")
-        except Exception as e:
-            logger.error(f"Failed to apply migrations: {e}")
-    logger.info("Migrations finished, app is ready.")
+    if app.config['MIGRATE_ON_START']:
+        logger.info("Starting migrations...")
+        with app.app_context():
+            try:
+                if run_migrations():
+                    logger.info("Database migrations applied successfully.")
+            except Exception as e:
+                logger.error(f"Failed to apply migrations: {e}")
+        logger.info("Migrations finished, app is ready.")
     return app
 
+# Development server only; production runs `gunicorn -c gunicorn.conf.py wsgi:app`
 if __name__ == "__main__":
     app = create_app()
     port = int(os.environ.get("PORT", 5000))
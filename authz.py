@@ -0,0 +1,112 @@
+# authz.py
+# Shared authorization for book-scoped endpoints. Instead of every handler
+# running AccountingBook.query.filter_by(id=..., user_id=...), the ids of the
+# books a user owns are cached per worker and checked in memory by the
+# @book_required decorator, which stores the verified id on g.book_id.
+#
+# books.py drops a user's entry when a book is created or deleted. Another
+# worker may still hold the old set: a book it has not seen yet triggers a
+# reload before answering 404, and a deleted book can only stay "owned" for
+# AUTHZ_CACHE_TTL seconds, during which every data query still filters by
+# user_id and writes that load the book row with load_book() answer 404.
+# Ownership itself never moves between users.
+from functools import wraps
+
+from flask import current_app, g, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+
+from cache import TTLCache
+from db import db
+from models import AccountingBook, User
+
+
+def init_authz(app):
+    ttl = app.config.get("AUTHZ_CACHE_TTL", 300)
+    size = app.config.get("AUTHZ_CACHE_SIZE", 10000)
+    app.extensions["owned_books"] = TTLCache(size, ttl=ttl)
+    app.extensions["user_profiles"] = TTLCache(size, ttl=ttl)
+
+
+def _load_owned_books(user_id):
+    rows = db.session.query(AccountingBook.id).filter(AccountingBook.user_id == user_id)
+    return frozenset(r[0] for r in rows)
+
+
+def owned_book_ids(user_id, refresh=False):
+    cache = current_app.extensions["owned_books"]
+    key = str(user_id)
+    books = None if refresh else cache.get(key)
+    if books is None:
+        books = _load_owned_books(user_id)
+        cache.set(key, books)
+    return books
+
+
+def owns_book(user_id, book_id):
+    if book_id in owned_book_ids(user_id):
+        return True
+    # Possibly created through another worker since the set was cached
+    return book_id in owned_book_ids(user_id, refresh=True)
+
+
+def invalidate_owned_books(user_id):
+    current_app.extensions["owned_books"].delete(str(user_id))
+
+
+def load_book(book_id):
+    """The AccountingBook for an id @book_required accepted, or None if it has been deleted.
+
+    A book deleted through another worker can still be in this worker's
+    cached set; its entry is dropped so the next request reloads it.
+    """
+    book = db.session.get(AccountingBook, book_id)
+    if book is None:
+        invalidate_owned_books(get_jwt_identity())
+    return book
+
+
+def _request_book_id():
+    book_id = request.args.get("book_id", type=int)
+    if book_id is None and request.is_json:
+        try:
+            book_id = int((request.get_json(silent=True) or {}).get("book_id"))
+        except (AttributeError, TypeError, ValueError):
+            book_id = None
+    return book_id
+
+
+def book_required(view):
+    """Require a book_id (query string or JSON body) owned by the current user; sets g.book_id.
+
+    Must be applied below @jwt_required().
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        book_id = _request_book_id()
+        if not book_id:
+            return jsonify({"error": "book_id is required"}), 400
+        if not owns_book(get_jwt_identity(), book_id):
+            return jsonify({"error": "Book not found"}), 404
+        g.book_id = book_id
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def user_profile(user_id):
+    """The /me payload, cached; None if the user does not exist."""
+    cache = current_app.extensions["user_profiles"]
+    profile = cache.get(str(user_id))
+    if profile is None:
+        user = db.session.get(User, int(user_id))
+        if user is None:
+            return None
+        profile = {
+            "id": user.id,
+            "username": user.username,
+            "firstName": user.firstName,
+            "lastName": user.lastName,
+            "email": user.email,
+            "contact": user.contact
+        }
+        cache.set(str(user_id), profile)
+    return profile
@@ -0,0 +1,197 @@
+# balances.py
+# Materialized per-account running balances (AccountBalance), updated in the
+# same transaction as journal writes so reports read O(accounts) rows instead
+# of re-scanning every JournalLine of the book.
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy.dialects import postgresql, sqlite
+
+from db import db
+from models import AccountBalance, JournalEntry, JournalLine
+
+CENT = Decimal("0.01")
+# INSERT ... ON CONFLICT DO UPDATE; other databases fall back to SELECT ... FOR UPDATE
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+balances_cli = AppGroup("balances", help="Verify or rebuild materialized account balances.")
+
+
+def to_amount(value):
+    return Decimal(str(value or 0)).quantize(CENT)
+
+
+def period_start(d):
+    return date(d.year, d.month, 1)
+
+
+def apply_lines(book_id, entry_date, lines, sign=1):
+    """Add (sign=1) or remove (sign=-1) (account_id, debit, credit) lines from the book's balances."""
+    deltas = defaultdict(lambda: [Decimal(0), Decimal(0)])
+    for account_id, debit, credit in lines:
+        deltas[account_id][0] += to_amount(debit)
+        deltas[account_id][1] += to_amount(credit)
+    if not deltas:
+        return
+    period = period_start(entry_date)
+    # Sorted so concurrent writers take the row locks in the same order
+    rows = [
+        {"book_id": book_id, "account_id": account_id, "period": period,
+         "debit": sign * debit, "credit": sign * credit}
+        for account_id, (debit, credit) in sorted(deltas.items())
+    ]
+    insert = UPSERT_INSERTS.get(db.session.get_bind().dialect.name)
+    if insert is not None:
+        # One atomic upsert: two transactions posting the first line of a month
+        # to the same account cannot both insert the row
+        table = AccountBalance.__table__
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.book_id, table.c.account_id, table.c.period],
+            set_={
+                "debit": table.c.debit + stmt.excluded.debit,
+                "credit": table.c.credit + stmt.excluded.credit
+            }
+        )
+        db.session.execute(stmt, rows)
+        return
+
+    existing = (
+        AccountBalance.query.filter(
+            AccountBalance.book_id == book_id,
+            AccountBalance.period == period,
+            AccountBalance.account_id.in_(deltas.keys())
+        )
+        .with_for_update()
+        .all()
+    )
+    by_account = {b.account_id: b for b in existing}
+    for row in rows:
+        balance = by_account.get(row["account_id"])
+        if balance is None:
+            balance = AccountBalance(book_id=book_id, account_id=row["account_id"], period=period,
+                                     debit=Decimal(0), credit=Decimal(0))
+            db.session.add(balance)
+        balance.debit = (balance.debit or Decimal(0)) + row["debit"]
+        balance.credit = (balance.credit or Decimal(0)) + row["credit"]
+
+
+def entry_lines(entry_id):
+    return (
+        db.session.query(JournalLine.account_id, JournalLine.debit, JournalLine.credit)
+        .filter(JournalLine.entry_id == entry_id)
+        .all()
+    )
+
+
+def balance_totals(book_id, start=None, end=None):
+    """Return {account_id: (debit, credit)} from the materialized balances of a book.
+
+    start and end must fall on month boundaries; they select whole periods.
+    """
+    query = (
+        db.session.query(
+            AccountBalance.account_id,
+            db.func.sum(AccountBalance.debit),
+            db.func.sum(AccountBalance.credit)
+        )
+        .filter(AccountBalance.book_id == book_id)
+    )
+    if start:
+        query = query.filter(AccountBalance.period >= period_start(start))
+    if end:
+        query = query.filter(AccountBalance.period <= period_start(end))
+    rows = query.group_by(AccountBalance.account_id).all()
+    return {account_id: (float(debit or 0), float(credit or 0)) for account_id, debit, credit in rows}
+
+
+def ledger_balances(book_id=None):
+    """Recompute {(book_id, account_id, period): (debit, credit)} from the journal."""
+    year = db.extract("year", JournalEntry.date)
+    month = db.extract("month", JournalEntry.date)
+    query = (
+        db.session.query(
+            JournalEntry.book_id,
+            JournalLine.account_id,
+            year,
+            month,
+            db.func.coalesce(db.func.sum(JournalLine.debit), 0),
+            db.func.coalesce(db.func.sum(JournalLine.credit), 0)
+        )
+        .join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
+        .group_by(JournalEntry.book_id, JournalLine.account_id, year, month)
+    )
+    if book_id is not None:
+        query = query.filter(JournalEntry.book_id == book_id)
+    return {
+        (b, a, date(int(y), int(m), 1)): (to_amount(debit), to_amount(credit))
+        for b, a, y, m, debit, credit in query.all()
+    }
+
+
+def stored_balances(book_id=None):
+    query = AccountBalance.query
+    if book_id is not None:
+        query = query.filter_by(book_id=book_id)
+    return {
+        (b.book_id, b.account_id, b.period): (to_amount(b.debit), to_amount(b.credit))
+        for b in query.all()
+    }
+
+
+def find_drift(book_id=None):
+    """List every (book, account, period) whose stored balance disagrees with the ledger."""
+    expected = ledger_balances(book_id)
+    stored = stored_balances(book_id)
+    zero = (Decimal(0), Decimal(0))
+    drift = []
+    for key in sorted(set(expected) | set(stored)):
+        want = expected.get(key, zero)
+        have = stored.get(key, zero)
+        if want != have:
+            drift.append({
+                "book_id": key[0],
+                "account_id": key[1],
+                "period": key[2].isoformat(),
+                "expected": [str(v) for v in want],
+                "stored": [str(v) for v in have]
+            })
+    return drift
+
+
+def rebuild_balances(book_id=None):
+    """Replace the materialized balances with totals recomputed from the ledger."""
+    query = AccountBalance.query
+    if book_id is not None:
+        query = query.filter_by(book_id=book_id)
+    query.delete(synchronize_session=False)
+    rows = [
+        {"book_id": b, "account_id": a, "period": p, "debit": debit, "credit": credit}
+        for (b, a, p), (debit, credit) in ledger_balances(book_id).items()
+    ]
+    if rows:
+        db.session.execute(AccountBalance.__table__.insert(), rows)
+    db.session.commit()
+    return len(rows)
+
+
+@balances_cli.command("verify")
+@click.option("--book-id", type=int, default=None, help="Only check this book.")
+def verify_command(book_id):
+    drift = find_drift(book_id)
+    for d in drift:
+        click.echo(f"book {d['book_id']} account {d['account_id']} {d['period']}: "
+                   f"expected {d['expected']} stored {d['stored']}")
+    if drift:
+        raise SystemExit(f"{len(drift)} balance rows drifted from the ledger; run 'flask balances rebuild'.")
+    click.echo("Balances match the ledger.")
+
+
+@balances_cli.command("rebuild")
+@click.option("--book-id", type=int, default=None, help="Only rebuild this book.")
+def rebuild_command(book_id):
+    count = rebuild_balances(book_id)
+    click.echo(f"Rebuilt {count} balance rows.")
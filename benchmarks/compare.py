@@ -0,0 +1,55 @@
+# benchmarks/compare.py
+# Compares two benchmarks/load.py result files endpoint by endpoint and exits
+# non-zero when p95 latency or average query count regressed past a threshold.
+#
+#   python benchmarks/compare.py baseline.json candidate.json --threshold 10
+import argparse
+import json
+
+
+def change(old, new):
+    if not old or new is None:
+        return None
+    return round((new - old) / old * 100, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two load benchmark results.")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed p95 regression in percent.")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    rows = []
+    regressions = []
+    for name, new in candidate["endpoints"].items():
+        old = baseline["endpoints"].get(name)
+        if not old:
+            continue
+        p95 = change(old["p95_ms"], new["p95_ms"])
+        rps = change(old["throughput_rps"], new["throughput_rps"])
+        rows.append({"endpoint": name, "p95_ms": [old["p95_ms"], new["p95_ms"]], "p95_change_pct": p95,
+                     "rps": [old["throughput_rps"], new["throughput_rps"]], "rps_change_pct": rps})
+        if p95 is not None and p95 > args.threshold:
+            regressions.append(f"{name}: p95 {old['p95_ms']} -> {new['p95_ms']} ms (+{p95}%)")
+    for endpoint, new in candidate.get("server", {}).items():
+        old = baseline.get("server", {}).get(endpoint)
+        if old and new["avg_queries"] > old["avg_queries"]:
+            regressions.append(f"{endpoint}: queries/request {old['avg_queries']} -> {new['avg_queries']}")
+
+    print(json.dumps({
+        "baseline": baseline.get("commit"),
+        "candidate": candidate.get("commit"),
+        "endpoints": rows,
+        "regressions": regressions
+    }, indent=2))
+    raise SystemExit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# benchmarks/load.py
+# Concurrent load generator for a running API (gunicorn or `python app.py`).
+# Logs in as a seeded user, drives the hot endpoints from several threads and
+# prints machine-readable JSON: per-endpoint p50/p95/p99 latency, throughput,
+# errors, and query counts / DB time taken from the server's /metrics.
+#
+#   python benchmarks/seed.py ... > seed.json
+#   python benchmarks/load.py --base-url http://localhost:5000 --seed-file seed.json \
+#       --duration 30 --concurrency 16 > results.json
+#   python benchmarks/compare.py baseline.json results.json
+#
+# /metrics is per process, so server-side query counts are only complete when
+# the server runs a single worker (e.g. WEB_CONCURRENCY=1).
+# --cold adds a unique query parameter to report URLs so every request misses
+# the report cache and measures the aggregation path itself.
+import argparse
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+ENDPOINTS = {
+    "journal_list": "/api/journal?book_id={book}&limit=100",
+    "trial_balance": "/api/journal/trial-balance?book_id={book}",
+    "income_statement": "/api/journal/income-statement?book_id={book}",
+    "balance_sheet": "/api/journal/balance-sheet?book_id={book}",
+    "accounts": "/api/accounts?book_id={book}",
+    "contacts": "/api/contacts",
+    "tasks": "/api/tasks"
+}
+REPORTS = {"trial_balance", "income_statement", "balance_sheet"}
+METRIC_LINE = re.compile(r'^(http_request_db_(?:queries|seconds))_(sum|count)\{endpoint="([^"]+)",method="GET"\} (\S+)$')
+
+
+def request(base_url, path, token=None, body=None, timeout=120):
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(base_url + path, data=data, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.status, resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def scrape_metrics(base_url, metrics_token=None):
+    status, body = request(base_url, "/metrics", token=metrics_token)
+    totals = defaultdict(dict)
+    if status != 200:
+        return totals
+    for line in body.decode().splitlines():
+        match = METRIC_LINE.match(line)
+        if match:
+            name, kind, endpoint, value = match.groups()
+            totals[endpoint][f"{name}_{kind}"] = float(value)
+    return totals
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the CRM API with concurrent load.")
+    parser.add_argument("--base-url", default="http://localhost:5000")
+    parser.add_argument("--seed-file", required=True, help="JSON printed by benchmarks/seed.py")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="Comma-separated subset to run.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20, help="Seconds to run.")
+    parser.add_argument("--cold", action="store_true", help="Bypass the report cache.")
+    parser.add_argument("--metrics-token", default=None)
+    args = parser.parse_args()
+
+    with open(args.seed_file) as f:
+        seed = json.load(f)
+    user = seed["users"][0]
+    status, body = request(args.base_url, "/api/auth/login", body={"login": user["login"], "password": user["password"]})
+    if status != 200:
+        raise SystemExit(f"Login failed ({status}): {body[:200]!r}")
+    token = json.loads(body)["token"]
+    status, body = request(args.base_url, "/api/books", token=token)
+    book = json.loads(body)[0]["id"]
+
+    names = [n for n in args.endpoints.split(",") if n in ENDPOINTS]
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    before = scrape_metrics(args.base_url, args.metrics_token)
+    deadline = time.perf_counter() + args.duration
+
+    def worker(offset):
+        i = offset
+        while time.perf_counter() < deadline:
+            name = names[i % len(names)]
+            i += 1
+            path = ENDPOINTS[name].format(book=book)
+            if args.cold and name in REPORTS:
+                path += f"&_={uuid.uuid4().hex}"
+            started = time.perf_counter()
+            status, _ = request(args.base_url, path, token=token)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies[name].append(elapsed)
+                if status >= 400:
+                    errors[name] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for n in range(args.concurrency):
+            pool.submit(worker, n)
+    wall = time.perf_counter() - started
+    after = scrape_metrics(args.base_url, args.metrics_token)
+
+    results = {}
+    for name in names:
+        values = sorted(latencies[name])
+        results[name] = {
+            "requests": len(values),
+            "errors": errors[name],
+            "throughput_rps": round(len(values) / wall, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 2) if values else None,
+            "p95_ms": round(percentile(values, 95) * 1000, 2) if values else None,
+            "p99_ms": round(percentile(values, 99) * 1000, 2) if values else None
+        }
+    server = {}
+    for endpoint, totals in after.items():
+        prev = before.get(endpoint, {})
+        count = totals.get("http_request_db_queries_count", 0) - prev.get("http_request_db_queries_count", 0)
+        if count <= 0:
+            continue
+        queries = totals.get("http_request_db_queries_sum", 0) - prev.get("http_request_db_queries_sum", 0)
+        db_seconds = totals.get("http_request_db_seconds_sum", 0) - prev.get("http_request_db_seconds_sum", 0)
+        server[endpoint] = {
+            "requests": int(count),
+            "avg_queries": round(queries / count, 2),
+            "avg_db_ms": round(db_seconds / count * 1000, 2)
+        }
+
+    print(json.dumps({
+        "benchmark": "load",
+        "commit": git_commit(),
+        "base_url": args.base_url,
+        "concurrency": args.concurrency,
+        "duration_s": round(wall, 2),
+        "cold": args.cold,
+        "total_requests": sum(r["requests"] for r in results.values()),
+        "total_throughput_rps": round(sum(r["requests"] for r in results.values()) / wall, 2),
+        "endpoints": results,
+        "server": server
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# benchmarks/login_bench.py
+# Login throughput. Two modes:
+#
+#   # Raw verify rate per hashing method, 1 thread vs. --threads threads
+#   python benchmarks/login_bench.py hash --methods scrypt:32768:8:1,pbkdf2:sha256:600000
+#
+#   # End-to-end logins/second against a running server; start it with
+#   # LOGIN_IP_PER_MINUTE=0 LOGIN_ACCOUNT_PER_MINUTE=0 or the limiter is what you measure
+#   python benchmarks/login_bench.py http --seed-file seed.json --concurrency 16 --duration 20
+#
+# Both print JSON, like benchmarks/load.py.
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from werkzeug.security import check_password_hash, generate_password_hash  # noqa: E402
+
+from load import git_commit, percentile, request  # noqa: E402
+
+PASSWORD = "benchpass1"
+
+
+def verify_rate(stored, threads, duration):
+    deadline = time.perf_counter() + duration
+    counts = [0] * threads
+
+    def worker(n):
+        while time.perf_counter() < deadline:
+            check_password_hash(stored, PASSWORD)
+            counts[n] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for n in range(threads):
+            pool.submit(worker, n)
+    return round(sum(counts) / (time.perf_counter() - started), 1)
+
+
+def hash_mode(args):
+    results = {}
+    for method in args.methods.split(","):
+        stored = generate_password_hash(PASSWORD, method)
+        results[method] = {
+            "stored_prefix": stored.split("$", 1)[0],
+            "verifies_per_s_1_thread": verify_rate(stored, 1, args.duration),
+            f"verifies_per_s_{args.threads}_threads": verify_rate(stored, args.threads, args.duration)
+        }
+    return {"benchmark": "password_hash", "cpus": os.cpu_count(), "methods": results}
+
+
+def http_mode(args):
+    with open(args.seed_file) as f:
+        users = json.load(f)["users"]
+    latencies = []
+    statuses = Counter()
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def worker(n):
+        i = n
+        while time.perf_counter() < deadline:
+            user = users[i % len(users)]
+            i += 1
+            started = time.perf_counter()
+            status, _ = request(args.base_url, "/api/auth/login", body={"login": user["login"], "password": user["password"]})
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for n in range(args.concurrency):
+            pool.submit(worker, n)
+    wall = time.perf_counter() - started
+    values = sorted(latencies)
+    return {
+        "benchmark": "login",
+        "commit": git_commit(),
+        "base_url": args.base_url,
+        "concurrency": args.concurrency,
+        "duration_s": round(wall, 2),
+        "requests": len(values),
+        "logins_per_s": round(statuses[200] / wall, 2),
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "p50_ms": round(percentile(values, 50) * 1000, 2) if values else None,
+        "p95_ms": round(percentile(values, 95) * 1000, 2) if values else None,
+        "p99_ms": round(percentile(values, 99) * 1000, 2) if values else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure password hashing and login throughput.")
+    sub = parser.add_subparsers(dest="mode", required=True)
+    hash_parser = sub.add_parser("hash")
+    hash_parser.add_argument("--methods", default="scrypt:32768:8:1,pbkdf2:sha256:600000")
+    hash_parser.add_argument("--threads", type=int, default=os.cpu_count() or 2)
+    hash_parser.add_argument("--duration", type=float, default=3)
+    http_parser = sub.add_parser("http")
+    http_parser.add_argument("--base-url", default="http://localhost:5000")
+    http_parser.add_argument("--seed-file", required=True, help="JSON printed by benchmarks/seed.py")
+    http_parser.add_argument("--concurrency", type=int, default=8)
+    http_parser.add_argument("--duration", type=float, default=20)
+    args = parser.parse_args()
+    print(json.dumps(hash_mode(args) if args.mode == "hash" else http_mode(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+# benchmarks/seed.py
+# Seeds the database named by DATABASE_URL with synthetic users, books,
+# charts of accounts, journal entries, contacts and tasks for load testing.
+#
+#   DATABASE_URL=sqlite:///bench.db python benchmarks/seed.py --create-tables --lines 100000
+#   DATABASE_URL=postgresql://.../crm_bench python benchmarks/seed.py --lines 1000000
+#
+# Against Postgres, run `flask release` first so the schema matches the
+# migrations; --create-tables is meant for throwaway SQLite databases.
+# Everything is written with chunked executemany inserts, and the
+# materialized account balances are rebuilt at the end. Prints a JSON
+# summary including the credentials that benchmarks/load.py logs in with.
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MIGRATE_ON_START", "0")
+
+from sqlalchemy import insert  # noqa: E402
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+from app import create_app  # noqa: E402
+from balances import rebuild_balances  # noqa: E402
+from db import db  # noqa: E402
+from models import (  # noqa: E402
+    Account, AccountingBook, Contact, JournalEntry, JournalLine, Task, User
+)
+
+PASSWORD = "benchpass1"
+ACCOUNT_TYPES = ["Asset", "Liability", "Equity", "Income", "Expense"]
+STATUSES = ["draft", "Submitted", "Approved"]
+CHUNK = 5000
+
+
+def chunked(rows, size=CHUNK):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def insert_returning_ids(table, rows):
+    ids = []
+    for chunk in chunked(rows):
+        ids.extend(db.session.execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True), chunk
+        ).scalars().all())
+    return ids
+
+
+def insert_rows(table, rows):
+    for chunk in chunked(rows):
+        db.session.execute(insert(table), chunk)
+
+
+def seed_accounts(rng, user_id, book_id, count):
+    """A chart of accounts with one root per type and random nesting below it."""
+    table = Account.__table__
+    roots = insert_returning_ids(table, [{
+        "user_id": user_id, "book_id": book_id, "name": f"{t} root", "type": t,
+        "code": f"{book_id}-{i}", "category": t, "parent_id": None
+    } for i, t in enumerate(ACCOUNT_TYPES)])
+    by_type = {t: [root] for t, root in zip(ACCOUNT_TYPES, roots)}
+    # Insert level by level so parents always exist before their children
+    remaining = count - len(roots)
+    code = len(roots)
+    while remaining > 0:
+        level = []
+        for _ in range(min(remaining, max(len(roots), sum(len(v) for v in by_type.values())))):
+            t = rng.choice(ACCOUNT_TYPES)
+            level.append((t, {
+                "user_id": user_id, "book_id": book_id, "name": f"{t} account {code}", "type": t,
+                "code": f"{book_id}-{code}", "category": t, "parent_id": rng.choice(by_type[t])
+            }))
+            code += 1
+        ids = insert_returning_ids(table, [row for _, row in level])
+        for (t, _), account_id in zip(level, ids):
+            by_type[t].append(account_id)
+        remaining -= len(level)
+    return [a for ids in by_type.values() for a in ids]
+
+
+def seed_journal(rng, user_id, book_id, account_ids, line_count, start):
+    entries, lines_per_entry = [], []
+    total = 0
+    while total < line_count:
+        n = rng.randint(2, 4)
+        lines_per_entry.append(n)
+        total += n
+        entries.append({
+            "user_id": user_id, "book_id": book_id,
+            "date": start + timedelta(days=rng.randint(0, 3 * 365)),
+            "description": f"Bench entry {len(entries)}",
+            "status": rng.choice(STATUSES)
+        })
+    entry_ids = insert_returning_ids(JournalEntry.__table__, entries)
+    line_rows = []
+    for entry_id, n in zip(entry_ids, lines_per_entry):
+        amount = round(rng.uniform(1, 5000), 2)
+        # One balancing credit against n - 1 debits
+        debits = [round(amount / (n - 1), 2)] * (n - 1)
+        debits[-1] = round(amount - sum(debits[:-1]), 2)
+        accounts = rng.sample(account_ids, n)
+        for account_id, debit in zip(accounts, debits):
+            line_rows.append({"entry_id": entry_id, "account_id": account_id, "debit": debit, "credit": 0})
+        line_rows.append({"entry_id": entry_id, "account_id": accounts[-1], "debit": 0, "credit": amount})
+        if len(line_rows) >= CHUNK:
+            insert_rows(JournalLine.__table__, line_rows)
+            line_rows = []
+    insert_rows(JournalLine.__table__, line_rows)
+    return len(entry_ids), total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed synthetic CRM data for benchmarks.")
+    parser.add_argument("--users", type=int, default=2)
+    parser.add_argument("--books", type=int, default=1, help="Books per user.")
+    parser.add_argument("--accounts", type=int, default=200, help="Accounts per book.")
+    parser.add_argument("--lines", type=int, default=100000, help="Journal lines in total.")
+    parser.add_argument("--contacts", type=int, default=5000, help="Contacts per user.")
+    parser.add_argument("--tasks", type=int, default=1000, help="Tasks per user.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--create-tables", action="store_true", help="Run db.create_all() first.")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    app = create_app()
+    started = time.perf_counter()
+    with app.app_context():
+        if args.create_tables:
+            db.create_all()
+        run = f"{int(time.time())}"
+        password = generate_password_hash(PASSWORD)
+        user_ids = insert_returning_ids(User.__table__, [{
+            "username": f"bench_{run}_{i}", "firstName": "Bench", "lastName": str(i),
+            "email": f"bench_{run}_{i}@example.com", "contact": "0700000000", "password": password
+        } for i in range(args.users)])
+
+        books = []
+        for user_id in user_ids:
+            book_ids = insert_returning_ids(AccountingBook.__table__, [
+                {"user_id": user_id, "name": f"Bench book {run} {b}"} for b in range(args.books)
+            ])
+            books.extend((user_id, book_id) for book_id in book_ids)
+
+        lines_per_book = max(2, args.lines // max(1, len(books)))
+        start = date.today() - timedelta(days=3 * 365)
+        totals = {"entries": 0, "lines": 0}
+        for user_id, book_id in books:
+            account_ids = seed_accounts(rng, user_id, book_id, args.accounts)
+            entries, lines = seed_journal(rng, user_id, book_id, account_ids, lines_per_book, start)
+            totals["entries"] += entries
+            totals["lines"] += lines
+            db.session.commit()
+            rebuild_balances(book_id)
+
+        for user_id in user_ids:
+            insert_rows(Contact.__table__, [{
+                "user_id": user_id, "name": f"Contact {i}", "email": f"contact{i}_{user_id}@example.com",
+                "phone": f"07{rng.randint(10000000, 99999999)}", "company": f"Company {i % 500}",
+                "notes": "Seeded for benchmarks"
+            } for i in range(args.contacts)])
+            insert_rows(Task.__table__, [{
+                "user_id": user_id, "description": f"Task {i}",
+                "dueDate": start + timedelta(days=rng.randint(0, 4 * 365)),
+                "category": rng.choice(["Sales", "Finance", "Ops"]), "priority": rng.choice(["Low", "Medium", "High"]),
+                "completed": rng.random() < 0.3
+            } for i in range(args.tasks)])
+        db.session.commit()
+
+    print(json.dumps({
+        "users": [{"login": f"bench_{run}_{i}", "password": PASSWORD} for i in range(args.users)],
+        "books": [book_id for _, book_id in books],
+        "accounts_per_book": args.accounts,
+        "journal_entries": totals["entries"],
+        "journal_lines": totals["lines"],
+        "contacts": args.contacts * args.users,
+        "tasks": args.tasks * args.users,
+        "seconds": round(time.perf_counter() - started, 2)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# benchmarks/startup.py
+# Measures cold-start time of create_app() in fresh interpreters, with and
+# without migrations at boot, and prints the results as JSON.
+#
+#   python benchmarks/startup.py --runs 10
+#
+# Uses DATABASE_URL / SECRET_KEY from the environment (or .env), like the app.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import time
+start = time.perf_counter()
+from app import create_app
+create_app()
+print(time.perf_counter() - start)
+"""
+
+
+def measure(runs, migrate_on_start):
+    env = dict(os.environ, MIGRATE_ON_START="1" if migrate_on_start else "0")
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE], cwd=ROOT, env=env,
+            capture_output=True, text=True, check=True
+        )
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return {
+        "migrate_on_start": migrate_on_start,
+        "runs": runs,
+        "median_ms": round(statistics.median(timings) * 1000, 1),
+        "min_ms": round(min(timings) * 1000, 1),
+        "max_ms": round(max(timings) * 1000, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure create_app() cold-start time.")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    results = [measure(args.runs, True), measure(args.runs, False)]
+    print(json.dumps({"benchmark": "startup", "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
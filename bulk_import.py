@@ -0,0 +1,35 @@
+# bulk_import.py
+# Pieces shared by the streaming bulk imports (journal_import.py and
+# contact_io.py): decoding the request body, per-row errors and the report
+# returned to the client.
+import io
+
+MAX_REPORTED_ERRORS = 1000
+
+
+class RowError(Exception):
+    pass
+
+
+def text_stream(binary_stream):
+    return io.TextIOWrapper(binary_stream, encoding="utf-8", newline="")
+
+
+class ImportReport:
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, row, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "error": message})
+
+    def as_dict(self):
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors)
+        }
@@ -0,0 +1,183 @@
+# cache.py
+# Response cache for the report endpoints. Entries are keyed by
+# (user_id, book_id, report, query params, book version); every journal or
+# account write bumps the book's version, so stale entries are simply never
+# looked up again and age out of the LRU. The version also feeds the ETag,
+# which lets unchanged reports answer If-None-Match with a 304 without
+# touching the database.
+#
+# Without REPORT_CACHE_URL the backend is an in-process LRU with TTL. A
+# write would only invalidate the process that served it, so this backend is
+# only used when the app runs in a single process (WEB_CONCURRENCY <= 1, which
+# gunicorn.conf.py sets to its worker count); with several workers the cache
+# is disabled unless REPORT_CACHE_URL points at a Redis-compatible server
+# shared by all of them.
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, current_app, request
+from flask_jwt_extended import get_jwt_identity
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ttl seconds."""
+
+    def __init__(self, maxsize=512, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + (ttl or self.ttl))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def add(self, key, value, ttl=None):
+        """Set key only if it is absent; returns the value now stored."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[1] >= time.monotonic():
+                return item[0]
+        self.set(key, value, ttl)
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCache:
+    """Same interface as TTLCache, backed by a Redis-compatible server."""
+
+    def __init__(self, url, ttl=60, prefix="crm:"):
+        import redis  # optional dependency, only needed when REPORT_CACHE_URL is set
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return value.decode() if isinstance(value, bytes) else value
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, value, ex=ttl or self.ttl)
+
+    def add(self, key, value, ttl=None):
+        if self.client.set(self.prefix + key, value, ex=ttl or self.ttl, nx=True):
+            return value
+        return self.get(key) or value
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + "*"):
+            self.client.delete(key)
+
+
+def init_cache(app):
+    if not app.config.get("REPORT_CACHE_ENABLED", True):
+        app.extensions["report_cache"] = None
+        return
+    ttl = app.config.get("REPORT_CACHE_TTL", 60)
+    url = app.config.get("REPORT_CACHE_URL")
+    if url:
+        app.extensions["report_cache"] = RedisCache(url, ttl=ttl)
+    elif int(os.getenv("WEB_CONCURRENCY") or 1) > 1:
+        # Other workers would keep serving reports from before a write
+        logger.warning("Report cache disabled: several worker processes and no REPORT_CACHE_URL.")
+        app.extensions["report_cache"] = None
+    else:
+        app.extensions["report_cache"] = TTLCache(app.config.get("REPORT_CACHE_SIZE", 512), ttl=ttl)
+
+
+def get_cache():
+    return current_app.extensions.get("report_cache")
+
+
+def _version_key(book_id):
+    return f"book-version:{book_id}"
+
+
+def book_version(book_id):
+    """Current version token of a book; a fresh random token if none is cached."""
+    cache = get_cache()
+    if cache is None:
+        return None
+    version = cache.get(_version_key(book_id))
+    if version is None:
+        version = cache.add(_version_key(book_id), uuid.uuid4().hex)
+    return version
+
+
+def bump_book_version(book_id):
+    """Invalidate every cached report of a book. Call after the write is committed."""
+    cache = get_cache()
+    if cache is not None and book_id:
+        cache.set(_version_key(book_id), uuid.uuid4().hex)
+
+
+def cached_report(name):
+    """Cache a report view's JSON body and serve ETag / If-None-Match for it.
+
+    Must be applied below @jwt_required(). Only 200 responses are cached.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = get_cache()
+            book_id = request.args.get("book_id", type=int)
+            if cache is None or not book_id:
+                return view(*args, **kwargs)
+            params = sorted((k, v) for k, v in request.args.items(multi=True))
+            raw_key = json.dumps([str(get_jwt_identity()), book_id, name, params, book_version(book_id)])
+            digest = hashlib.sha256(raw_key.encode()).hexdigest()
+            etag = digest[:32]
+
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+                response.set_etag(etag)
+                return response
+
+            key = "report:" + digest
+            body = cache.get(key)
+            if body is None:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data(as_text=True)
+                cache.set(key, body)
+            response = Response(body, mimetype="application/json")
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = "private, no-cache"
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,92 @@
+# closing.py
+# Period close for accounting books. Closing a period freezes cumulative
+# per-account totals (ClosingBalance) as of the period end and locks every
+# entry dated on or before it, so reports can start from the latest snapshot
+# and only aggregate the lines posted after it.
+from datetime import timedelta
+
+from balances import balance_totals
+from db import db
+from models import ClosingBalance, PeriodClose
+from reports import account_totals, is_month_aligned
+
+
+def latest_close(book_id, on_or_before=None):
+    query = PeriodClose.query.filter_by(book_id=book_id)
+    if on_or_before:
+        query = query.filter(PeriodClose.period_end <= on_or_before)
+    return query.order_by(PeriodClose.period_end.desc()).first()
+
+
+def snapshot_totals(close):
+    rows = (
+        db.session.query(ClosingBalance.account_id, ClosingBalance.debit, ClosingBalance.credit)
+        .filter(ClosingBalance.close_id == close.id)
+        .all()
+    )
+    return {account_id: (float(debit), float(credit)) for account_id, debit, credit in rows}
+
+
+def add_totals(base, extra):
+    merged = dict(base)
+    for account_id, (debit, credit) in extra.items():
+        base_debit, base_credit = merged.get(account_id, (0.0, 0.0))
+        merged[account_id] = (base_debit + debit, base_credit + credit)
+    return merged
+
+
+def _range_totals(user_id, book_id, start, end):
+    if is_month_aligned(start, end):
+        return balance_totals(book_id, start, end)
+    return account_totals(user_id, book_id, start, end)
+
+
+def cumulative_totals(user_id, book_id, end=None):
+    """Totals from the start of the book through end (all statuses), seeded from the latest close."""
+    close = latest_close(book_id, end)
+    if close is None:
+        return _range_totals(user_id, book_id, None, end)
+    after = close.period_end + timedelta(days=1)
+    if end and end < after:
+        return snapshot_totals(close)
+    return add_totals(snapshot_totals(close), _range_totals(user_id, book_id, after, end))
+
+
+def is_locked(book, entry_date):
+    if book is None or book.closed_through is None or entry_date is None:
+        return False
+    if hasattr(entry_date, "date"):
+        entry_date = entry_date.date()
+    return entry_date <= book.closed_through
+
+
+def close_period(user_id, book, period_end):
+    """Freeze cumulative balances through period_end and lock the period. Caller commits."""
+    totals = cumulative_totals(user_id, book.id, period_end)
+    close = PeriodClose(book_id=book.id, period_end=period_end)
+    db.session.add(close)
+    db.session.flush()
+    rows = [
+        {"close_id": close.id, "account_id": account_id, "debit": debit, "credit": credit}
+        for account_id, (debit, credit) in totals.items()
+        if debit or credit
+    ]
+    if rows:
+        db.session.execute(ClosingBalance.__table__.insert(), rows)
+    book.closed_through = period_end
+    return close
+
+
+def reopen_latest(book):
+    """Drop the most recent close and unlock its period. Caller commits."""
+    close = latest_close(book.id)
+    if close is None:
+        return None
+    db.session.delete(close)
+    previous = (
+        PeriodClose.query.filter(PeriodClose.book_id == book.id, PeriodClose.id != close.id)
+        .order_by(PeriodClose.period_end.desc())
+        .first()
+    )
+    book.closed_through = previous.period_end if previous else None
+    return close
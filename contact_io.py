@@ -0,0 +1,191 @@
+# contact_io.py
+# Bulk contact import (CSV or JSON array) with chunked upserts keyed on
+# email, then phone, and a streaming CSV/JSONL export. Each chunk costs one
+# SELECT for the existing matches, one executemany UPDATE and one executemany
+# INSERT, committed together, instead of a request and a commit per contact.
+import csv
+import io
+import json
+import re
+
+from sqlalchemy import bindparam, insert, update
+
+from bulk_import import ImportReport, RowError
+from db import db
+from models import Contact
+
+CHUNK_SIZE = 1000
+FETCH_SIZE = 2000
+FIELDS = ["name", "email", "phone", "company", "notes"]
+EXPORT_FIELDS = ["id"] + FIELDS
+EMAIL_RE = re.compile(r'^[^\s@]+@[^\s@]+\.[^\s@]+$')
+PHONE_RE = re.compile(r'^\d{10,15}$')
+PHONE_PUNCTUATION = re.compile(r'[\s\-().+]')
+LIMITS = {"name": 120, "email": 120, "phone": 20, "company": 120}
+
+
+def normalize_email(value):
+    return (value or "").strip().lower() or None
+
+
+def normalize_phone(value):
+    return PHONE_PUNCTUATION.sub("", value or "") or None
+
+
+def clean_row(raw):
+    """Normalize one incoming row; returns (contact dict, None) or (None, error)."""
+    if not isinstance(raw, dict):
+        return None, "Each contact must be an object."
+    row = {f: (str(raw[f]).strip() if raw.get(f) is not None else "") for f in FIELDS}
+    row["email"] = normalize_email(row["email"])
+    row["phone"] = normalize_phone(row["phone"])
+    if not row["name"]:
+        return None, "Name is required."
+    if row["email"] and not EMAIL_RE.match(row["email"]):
+        return None, "Invalid email format."
+    if row["phone"] and not PHONE_RE.match(row["phone"]):
+        return None, "Invalid phone number."
+    for field, limit in LIMITS.items():
+        if row[field] and len(row[field]) > limit:
+            return None, f"{field} is longer than {limit} characters."
+    return {f: row[f] or None for f in FIELDS}, None
+
+
+def iter_csv(stream):
+    """Yield (row_number, raw dict) for a CSV body with a header row."""
+    reader = csv.DictReader(stream)
+    if "name" not in (reader.fieldnames or []):
+        yield 1, RowError("Missing CSV column: name.")
+        return
+    for row_number, raw in enumerate(reader, start=2):
+        yield row_number, raw
+
+
+def iter_json(payload):
+    if not isinstance(payload, list):
+        yield 1, RowError("Body must be a JSON array of contacts.")
+        return
+    for row_number, raw in enumerate(payload, start=1):
+        yield row_number, raw
+
+
+class ContactImportReport(ImportReport):
+    def __init__(self):
+        super().__init__()
+        self.created = 0
+        self.updated = 0
+
+    def as_dict(self):
+        result = super().as_dict()
+        result.update(created=self.created, updated=self.updated)
+        return result
+
+
+def _upsert_chunk(user_id, chunk, report):
+    rows = []
+    for row_number, raw in chunk:
+        contact, error = (None, str(raw)) if isinstance(raw, RowError) else clean_row(raw)
+        if error:
+            report.error(row_number, error)
+        else:
+            rows.append((row_number, contact))
+    if not rows:
+        return
+
+    # Existing matches for the whole chunk in one query
+    emails = sorted({c["email"] for _, c in rows if c["email"]})
+    phones = sorted({c["phone"] for _, c in rows if c["phone"]})
+    by_email, by_phone = {}, {}
+    if emails or phones:
+        matches = db.session.query(Contact.id, Contact.email, Contact.phone).filter(
+            Contact.user_id == user_id,
+            db.or_(db.func.lower(Contact.email).in_(emails), Contact.phone.in_(phones))
+        ).order_by(Contact.id)
+        for contact_id, email, phone in matches:
+            if email:
+                by_email.setdefault(normalize_email(email), contact_id)
+            if phone:
+                by_phone.setdefault(phone, contact_id)
+
+    # Rows for the same contact within the file are merged, later values winning
+    updates, inserts = {}, {}
+    for row_number, c in rows:
+        contact_id = (c["email"] and by_email.get(c["email"])) or (c["phone"] and by_phone.get(c["phone"]))
+        if contact_id:
+            merged = updates.setdefault(contact_id, {})
+        else:
+            key = ("email", c["email"]) if c["email"] else ("phone", c["phone"]) if c["phone"] else ("row", row_number)
+            merged = inserts.setdefault(key, {})
+        merged.update({f: v for f, v in c.items() if v is not None})
+
+    try:
+        if updates:
+            # Only fields supplied in the file are overwritten
+            by_fields = {}
+            for contact_id, values in updates.items():
+                by_fields.setdefault(tuple(sorted(values)), []).append({"_id": contact_id, **values})
+            table = Contact.__table__
+            for fields, params in by_fields.items():
+                db.session.execute(
+                    update(table).where(table.c.id == bindparam("_id"))
+                    .values({f: bindparam(f) for f in fields}),
+                    params
+                )
+        if inserts:
+            db.session.execute(insert(Contact.__table__), [
+                {"user_id": int(user_id), **{f: values.get(f) for f in FIELDS}} for values in inserts.values()
+            ])
+        db.session.commit()
+        report.updated += len(updates)
+        report.created += len(inserts)
+        report.imported += len(rows)
+    except Exception as e:
+        db.session.rollback()
+        for row_number, _ in rows:
+            report.error(row_number, f"Chunk failed: {e}")
+
+
+def upsert_contacts(user_id, parsed, chunk_size=CHUNK_SIZE):
+    """Upsert parsed (row_number, raw) pairs chunk by chunk and return the report."""
+    report = ContactImportReport()
+    chunk = []
+    for item in parsed:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            _upsert_chunk(user_id, chunk, report)
+            chunk = []
+    if chunk:
+        _upsert_chunk(user_id, chunk, report)
+    return report
+
+
+def contact_rows(user_id):
+    return (
+        db.session.query(Contact.id, Contact.name, Contact.email, Contact.phone, Contact.company, Contact.notes)
+        .filter(Contact.user_id == user_id)
+        .order_by(Contact.id)
+        .yield_per(FETCH_SIZE)
+    )
+
+
+def csv_chunks(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(["" if v is None else v for v in row])
+        if count % FETCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def jsonl_chunks(rows):
+    out = []
+    for row in rows:
+        out.append(json.dumps(dict(zip(EXPORT_FIELDS, row))) + "\n")
+        if len(out) >= FETCH_SIZE:
+            yield "".join(out)
+            out = []
+    yield "".join(out)
@@ -1,3 +1,28 @@
+import os
+
 from flask_sqlalchemy import SQLAlchemy
 
-db = SQLAlchemy()
\ No newline at end of file
+db = SQLAlchemy()
+
+
+def engine_options(database_url):
+    """Connection pool settings for SQLALCHEMY_ENGINE_OPTIONS, driven by DB_* env vars.
+
+    Size the pool so that gunicorn threads per worker <= DB_POOL_SIZE + DB_MAX_OVERFLOW,
+    and workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) stays below Postgres max_connections.
+    """
+    database_url = database_url or ""
+    options = {
+        # Test connections on checkout so a Postgres restart doesn't surface as errors
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "1").lower() not in ("0", "off", "false", "no"),
+        # Recycle before server/proxy idle timeouts drop connections underneath us
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+    }
+    if not database_url.startswith("sqlite"):
+        options["pool_size"] = int(os.getenv("DB_POOL_SIZE", 5))
+        options["max_overflow"] = int(os.getenv("DB_MAX_OVERFLOW", 10))
+        options["pool_timeout"] = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    statement_timeout = os.getenv("DB_STATEMENT_TIMEOUT_MS")
+    if statement_timeout and database_url.startswith("postgres"):
+        options["connect_args"] = {"options": f"-c statement_timeout={int(statement_timeout)}"}
+    return options
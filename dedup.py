@@ -0,0 +1,150 @@
+# dedup.py
+# Finds likely-duplicate contacts for a user without comparing every pair.
+# Each contact is put into a few blocks: its normalized email, the national
+# part of its phone number, and a coarse name key. Contacts sharing an
+# email or phone block are duplicates outright; contacts sharing a name
+# block are compared pairwise on name and company similarity, which stays
+# cheap because name blocks are small and oversized ones are skipped.
+# Matches are joined with union-find, so A~B and B~C yield one group.
+import re
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+from contact_io import normalize_email, normalize_phone
+from db import db
+from models import Contact
+
+FETCH_SIZE = 2000
+PHONE_DIGITS = 9  # trailing digits compared, so +254 7.. and 07.. match
+NAME_THRESHOLD = 0.88
+COMPANY_THRESHOLD = 0.8
+MAX_BLOCK_SIZE = 200
+NON_WORD = re.compile(r"[^a-z0-9 ]+")
+COMPANY_SUFFIXES = {"ltd", "limited", "inc", "llc", "co", "company", "plc", "corp"}
+
+
+def normalize_text(value):
+    text = unicodedata.normalize("NFKD", value or "").encode("ascii", "ignore").decode().lower()
+    return " ".join(NON_WORD.sub(" ", text).split())
+
+
+def normalize_company(value):
+    return " ".join(t for t in normalize_text(value).split() if t not in COMPANY_SUFFIXES)
+
+
+def phone_key(value):
+    digits = normalize_phone(value)
+    if not digits or not digits.isdigit() or len(digits) < PHONE_DIGITS:
+        return None
+    return digits[-PHONE_DIGITS:]
+
+
+def name_key(name):
+    """Sorted name tokens, first three letters each: 'Jon Smith' and 'Smith, Jonathan' share a block."""
+    tokens = sorted(t[:3] for t in name.split() if t)
+    return " ".join(tokens) or None
+
+
+class UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        self.parent.setdefault(x, x)
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Path compression
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            # Lower id as root keeps groups ordered by the oldest contact
+            if rb < ra:
+                ra, rb = rb, ra
+            self.parent[rb] = ra
+
+
+def similar(a, b):
+    if SequenceMatcher(None, a["name"], b["name"]).ratio() < NAME_THRESHOLD:
+        return False
+    if a["company"] and b["company"]:
+        return SequenceMatcher(None, a["company"], b["company"]).ratio() >= COMPANY_THRESHOLD
+    return True
+
+
+def find_duplicates(user_id):
+    """Return groups of likely-duplicate contacts as [{"ids": [...], "reasons": [...]}]."""
+    rows = (
+        db.session.query(Contact.id, Contact.name, Contact.email, Contact.phone, Contact.company)
+        .filter(Contact.user_id == user_id)
+        .order_by(Contact.id)
+        .yield_per(FETCH_SIZE)
+    )
+    blocks = defaultdict(list)
+    for contact_id, name, email, phone, company in rows:
+        # Token order is ignored, so "Smith, Jon" compares equal to "Jon Smith"
+        name = " ".join(sorted(normalize_text(name).split()))
+        item = {"id": contact_id, "name": name, "company": normalize_company(company)}
+        email = normalize_email(email)
+        if email:
+            blocks[("email", email)].append(item)
+        phone = phone_key(phone)
+        if phone:
+            blocks[("phone", phone)].append(item)
+        key = name_key(item["name"])
+        if key:
+            blocks[("name", key)].append(item)
+
+    groups = UnionFind()
+    reasons = defaultdict(set)
+    for (kind, _), members in blocks.items():
+        if len(members) < 2:
+            continue
+        if kind != "name":
+            for other in members[1:]:
+                groups.union(members[0]["id"], other["id"])
+                reasons[(members[0]["id"], other["id"])].add(kind)
+            continue
+        if len(members) > MAX_BLOCK_SIZE:
+            # Very common names would make this block quadratic; email and phone still apply
+            continue
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                if similar(a, b):
+                    groups.union(a["id"], b["id"])
+                    reasons[(a["id"], b["id"])].add("name")
+
+    by_root = defaultdict(lambda: {"ids": [], "reasons": set()})
+    for contact_id in list(groups.parent):
+        by_root[groups.find(contact_id)]["ids"].append(contact_id)
+    for (a, _), kinds in reasons.items():
+        by_root[groups.find(a)]["reasons"].update(kinds)
+    result = [
+        {"ids": sorted(g["ids"]), "reasons": sorted(g["reasons"])}
+        for g in by_root.values() if len(g["ids"]) > 1
+    ]
+    result.sort(key=lambda g: (-len(g["ids"]), g["ids"][0]))
+    return result
+
+
+def merge_contacts(primary, duplicates):
+    """Fold duplicates into primary and delete them; the caller commits.
+
+    Empty fields on the primary are filled from the duplicates in the order
+    given, and distinct notes are appended.
+    """
+    notes = [primary.notes] if primary.notes else []
+    for dup in duplicates:
+        for field in ("email", "phone", "company"):
+            if not getattr(primary, field) and getattr(dup, field):
+                setattr(primary, field, getattr(dup, field))
+        if dup.notes and dup.notes not in notes:
+            notes.append(dup.notes)
+        db.session.delete(dup)
+    primary.notes = "\n\n".join(notes) or None
+    return primary
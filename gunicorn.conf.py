@@ -0,0 +1,31 @@
+# gunicorn.conf.py
+# Production serving profile: gunicorn -c gunicorn.conf.py wsgi:app
+# Every setting can be overridden from the environment.
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Threaded workers: requests mostly wait on Postgres, so a few processes with
+# several threads each use far less memory than many sync workers.
+worker_class = "gthread"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+# Inherited by the workers; per-process caches and log files check it
+os.environ["WEB_CONCURRENCY"] = str(workers)
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+
+# Keep-alive for the frontend / load balancer; must be below the LB idle timeout
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+
+# Recycle workers periodically to bound memory growth
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 200))
+
+# Each worker builds its own app and connection pool after fork; sharing a
+# pool created in the master would hand the same sockets to several workers.
+preload_app = False
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
@@ -0,0 +1,146 @@
+# jobs.py
+# A small database-backed job queue for work that should not run on the
+# request path (attachment thumbnails and text extraction, see previews.py).
+# Jobs are rows in the job table, enqueued in the same transaction as the
+# data they refer to, and run by `flask worker`:
+#
+#   flask worker --threads 4
+#
+# Each worker thread claims one job at a time. On Postgres candidates are
+# selected FOR UPDATE SKIP LOCKED, so threads and processes never wait on
+# each other's rows; everywhere the claim itself is a conditional UPDATE,
+# so a job is only ever claimed once. Failed jobs are retried with
+# backoff, and jobs left "running" by a worker that died are picked up
+# again after JOB_TIMEOUT seconds.
+import json
+import logging
+import signal
+import threading
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from db import db
+from models import Job
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+HANDLERS = {}
+
+
+def handler(kind):
+    """Register fn(payload) as the handler for jobs of this kind."""
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+def enqueue(kind, payload):
+    """Add a job to the session; it is committed with the caller's transaction."""
+    job = Job(kind=kind, payload=json.dumps(payload))
+    db.session.add(job)
+    return job
+
+
+def claim(timeout):
+    """Mark the next runnable job as running and return it, or None."""
+    now = datetime.utcnow()
+    runnable = db.or_(
+        db.and_(Job.status == "queued", Job.run_after <= now),
+        db.and_(Job.status == "running", Job.locked_at < now - timedelta(seconds=timeout))
+    )
+    candidates = (
+        db.session.query(Job.id, Job.status).filter(runnable)
+        .order_by(Job.run_after, Job.id).limit(5)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    for job_id, status in candidates:
+        claimed = db.session.execute(
+            db.update(Job)
+            .where(Job.id == job_id, Job.status == status, runnable)
+            .values(status="running", locked_at=now, attempts=Job.attempts + 1)
+        ).rowcount
+        if claimed:
+            db.session.commit()
+            return db.session.get(Job, job_id)
+    db.session.rollback()
+    return None
+
+
+def run_job(job):
+    fn = HANDLERS.get(job.kind)
+    try:
+        if fn is None:
+            raise LookupError(f"No handler for job kind '{job.kind}'")
+        fn(json.loads(job.payload or "{}"))
+    except Exception as e:
+        db.session.rollback()
+        logger.exception(f"Job {job.id} ({job.kind}) failed")
+        job = db.session.get(Job, job.id)
+        job.last_error = str(e)[:1000]
+        if job.attempts >= MAX_ATTEMPTS:
+            job.status = "failed"
+        else:
+            job.status = "queued"
+            job.run_after = datetime.utcnow() + timedelta(seconds=30 * 2 ** job.attempts)
+    else:
+        job.status = "done"
+        job.last_error = None
+    job.locked_at = None
+    db.session.commit()
+
+
+def work(app, stop, poll_interval, timeout, once=False):
+    """Worker thread loop: claim and run jobs until stop is set (or the queue is empty, with once)."""
+    while not stop.is_set():
+        with app.app_context():
+            try:
+                job = claim(timeout)
+                if job is not None:
+                    run_job(job)
+            except Exception:
+                logger.exception("Job worker error")
+                job = None
+            finally:
+                db.session.remove()
+        if job is None:
+            if once:
+                return
+            stop.wait(poll_interval)
+
+
+@click.command("worker")
+@click.option("--threads", type=int, default=None, help="Worker threads (default JOB_WORKER_THREADS).")
+@click.option("--once", is_flag=True, help="Exit when the queue is empty.")
+@with_appcontext
+def worker_command(threads, once):
+    """Run queued background jobs."""
+    import previews  # noqa: F401  registers the attachment handlers
+
+    app = current_app._get_current_object()
+    threads = threads or app.config.get("JOB_WORKER_THREADS", 2)
+    stop = threading.Event()
+    if not once:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+    workers = [
+        threading.Thread(
+            target=work,
+            args=(app, stop, app.config.get("JOB_POLL_INTERVAL", 2), app.config.get("JOB_TIMEOUT", 600), once),
+            name=f"job-worker-{n}"
+        )
+        for n in range(threads)
+    ]
+    for thread in workers:
+        thread.start()
+    click.echo(f"Job worker running with {threads} threads.")
+    # Joined with a timeout so the main thread keeps receiving signals
+    while any(thread.is_alive() for thread in workers):
+        for thread in workers:
+            thread.join(timeout=0.5)
+    click.echo("Job worker stopped.")
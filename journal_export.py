@@ -0,0 +1,79 @@
+# journal_export.py
+# Streaming ledger export. Rows are read with a server-side cursor
+# (yield_per) and written out in small batches, so memory stays flat no
+# matter how large the book is. The CSV and JSONL layouts match what
+# journal_import accepts, so an export can be re-imported as-is.
+import csv
+import io
+import json
+
+from db import db
+from models import JournalEntry, JournalLine
+
+FETCH_SIZE = 2000
+CSV_FIELDS = ["entry_ref", "date", "description", "account_id", "debit", "credit", "status"]
+
+
+def ledger_rows(user_id, book_id, date_from=None, date_to=None):
+    query = (
+        db.session.query(
+            JournalEntry.id,
+            JournalEntry.date,
+            JournalEntry.description,
+            JournalEntry.status,
+            JournalLine.account_id,
+            JournalLine.debit,
+            JournalLine.credit
+        )
+        .join(JournalLine, JournalLine.entry_id == JournalEntry.id)
+        .filter(JournalEntry.user_id == user_id, JournalEntry.book_id == book_id)
+    )
+    if date_from:
+        query = query.filter(JournalEntry.date >= date_from)
+    if date_to:
+        query = query.filter(JournalEntry.date <= date_to)
+    return query.order_by(JournalEntry.date, JournalEntry.id, JournalLine.id).yield_per(FETCH_SIZE)
+
+
+def _amount(value):
+    return str(value) if value is not None else "0"
+
+
+def csv_chunks(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_FIELDS)
+    for count, (entry_id, entry_date, description, status, account_id, debit, credit) in enumerate(rows, start=1):
+        writer.writerow([
+            entry_id, entry_date.isoformat(), description or "", account_id,
+            _amount(debit), _amount(credit), status or ""
+        ])
+        if count % FETCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def jsonl_chunks(rows):
+    """Yield one JSON object per entry; rows arrive ordered by entry, so lines group consecutively."""
+    current = None
+    out = []
+    for entry_id, entry_date, description, status, account_id, debit, credit in rows:
+        if current is None or current["id"] != entry_id:
+            if current is not None:
+                out.append(json.dumps(current) + "\n")
+                if len(out) >= FETCH_SIZE:
+                    yield "".join(out)
+                    out = []
+            current = {
+                "id": entry_id,
+                "date": entry_date.isoformat(),
+                "description": description or "",
+                "status": status,
+                "lines": []
+            }
+        current["lines"].append({"account_id": account_id, "debit": _amount(debit), "credit": _amount(credit)})
+    if current is not None:
+        out.append(json.dumps(current) + "\n")
+    yield "".join(out)
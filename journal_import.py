@@ -0,0 +1,198 @@
+# journal_import.py
+# Streaming bulk import of journal entries from CSV or JSON Lines bodies.
+# Rows are parsed lazily from the request stream, validated and inserted in
+# chunks, each chunk in its own transaction, so memory stays bounded by the
+# chunk size rather than the file size.
+import csv
+import json
+from collections import defaultdict
+from datetime import datetime
+from decimal import InvalidOperation
+
+from sqlalchemy import insert
+
+from balances import apply_lines, period_start, to_amount
+from bulk_import import ImportReport, RowError
+from db import db
+from models import Account, JournalEntry, JournalLine
+
+CHUNK_SIZE = 1000
+
+
+def _amount(value):
+    try:
+        amount = to_amount(value if value not in ("", None) else 0)
+    except (InvalidOperation, ValueError):
+        raise RowError(f"Invalid amount '{value}'.")
+    if not amount.is_finite():
+        raise RowError(f"Invalid amount '{value}'.")
+    if amount < 0:
+        raise RowError("Amounts must not be negative.")
+    return amount
+
+
+def _line(raw):
+    if not isinstance(raw, dict):
+        raise RowError("Each line must be an object.")
+    try:
+        account_id = int(raw["account_id"])
+    except (KeyError, TypeError, ValueError):
+        raise RowError(f"Invalid account_id '{raw.get('account_id')}'.")
+    return account_id, _amount(raw.get("debit")), _amount(raw.get("credit"))
+
+
+def _entry(raw, lines):
+    try:
+        entry_date = datetime.strptime(raw.get("date") or "", "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        raise RowError(f"Invalid date '{raw.get('date')}', expected YYYY-MM-DD.")
+    if not lines:
+        raise RowError("Entry has no lines.")
+    total_debit = sum(l[1] for l in lines)
+    total_credit = sum(l[2] for l in lines)
+    if total_debit != total_credit:
+        raise RowError("Debits and credits must balance.")
+    for field in ("description", "status"):
+        if raw.get(field) is not None and not isinstance(raw[field], str):
+            raise RowError(f"{field} must be a string.")
+    return {
+        "date": entry_date,
+        "description": (raw.get("description") or "")[:255],
+        "status": (raw.get("status") or "draft")[:20],
+        "lines": lines
+    }
+
+
+def iter_jsonl(stream):
+    """Yield (row_number, entry or RowError) for a JSON Lines body, one entry per line."""
+    for row_number, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            raw = json.loads(text)
+            if not isinstance(raw, dict):
+                raise RowError("Each line must be a JSON object.")
+            lines = raw.get("lines") or []
+            if not isinstance(lines, list):
+                raise RowError("lines must be a list.")
+            yield row_number, _entry(raw, [_line(l) for l in lines])
+        except ValueError:
+            yield row_number, RowError("Invalid JSON.")
+        except RowError as e:
+            yield row_number, e
+
+
+def iter_csv(stream):
+    """Yield (row_number, entry or RowError) for a CSV body with one line per row.
+
+    Consecutive rows sharing an entry_ref form one entry; the first row of the
+    group supplies the date, description and status.
+    """
+    reader = csv.DictReader(stream)
+    missing = {"entry_ref", "date", "account_id"} - set(reader.fieldnames or [])
+    if missing:
+        yield 1, RowError(f"Missing CSV columns: {', '.join(sorted(missing))}.")
+        return
+    group_ref, group_row, group_head, group_lines, group_error = None, None, None, [], None
+    for row_number, raw in enumerate(reader, start=2):
+        ref = raw.get("entry_ref")
+        if ref != group_ref:
+            if group_head is not None:
+                yield group_row, group_error or _safe_entry(group_head, group_lines)
+            group_ref, group_row, group_head, group_lines, group_error = ref, row_number, raw, [], None
+        if group_error is None:
+            try:
+                group_lines.append(_line(raw))
+            except RowError as e:
+                group_error = RowError(f"Row {row_number}: {e}")
+    if group_head is not None:
+        yield group_row, group_error or _safe_entry(group_head, group_lines)
+
+
+def _safe_entry(raw, lines):
+    try:
+        return _entry(raw, lines)
+    except RowError as e:
+        return e
+
+
+def _chunks(parsed, size):
+    chunk = []
+    for item in parsed:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _insert_chunk(user_id, book_id, chunk, report, locked_through=None):
+    entries = []
+    for row, item in chunk:
+        if isinstance(item, RowError):
+            report.error(row, str(item))
+        elif locked_through and item["date"] <= locked_through:
+            report.error(row, "Entry falls in a closed period.")
+        else:
+            entries.append((row, item))
+    if not entries:
+        return
+
+    # Account membership for the whole chunk in one IN query
+    account_ids = {l[0] for _, e in entries for l in e["lines"]}
+    known = {
+        r[0] for r in db.session.query(Account.id).filter(
+            Account.id.in_(account_ids),
+            Account.user_id == user_id,
+            Account.book_id == book_id
+        )
+    }
+    valid = []
+    for row, e in entries:
+        unknown = next((l[0] for l in e["lines"] if l[0] not in known), None)
+        if unknown is not None:
+            report.error(row, f"Account ID {unknown} does not exist in this book.")
+        else:
+            valid.append((row, e))
+    if not valid:
+        return
+
+    try:
+        entry_table = JournalEntry.__table__
+        ids = db.session.execute(
+            insert(entry_table).returning(entry_table.c.id, sort_by_parameter_order=True),
+            [{
+                "user_id": int(user_id),
+                "book_id": book_id,
+                "date": e["date"],
+                "description": e["description"],
+                "status": e["status"]
+            } for _, e in valid]
+        ).scalars().all()
+        line_rows = []
+        by_period = defaultdict(list)
+        for entry_id, (_, e) in zip(ids, valid):
+            for account_id, debit, credit in e["lines"]:
+                line_rows.append({"entry_id": entry_id, "account_id": account_id, "debit": debit, "credit": credit})
+            by_period[period_start(e["date"])].extend(e["lines"])
+        db.session.execute(JournalLine.__table__.insert(), line_rows)
+        for period, lines in by_period.items():
+            apply_lines(book_id, period, lines)
+        db.session.commit()
+        report.imported += len(valid)
+    except Exception as e:
+        db.session.rollback()
+        for row, _ in valid:
+            report.error(row, f"Chunk failed: {e}")
+
+
+def import_entries(user_id, book_id, parsed, chunk_size=CHUNK_SIZE, locked_through=None):
+    """Insert parsed (row, entry) pairs chunk by chunk and return the import report.
+
+    Entries dated on or before locked_through (the book's closed period) are rejected.
+    """
+    report = ImportReport()
+    for chunk in _chunks(parsed, chunk_size):
+        _insert_chunk(user_id, book_id, chunk, report, locked_through)
+    return report
@@ -0,0 +1,138 @@
+# logging_setup.py
+# Non-blocking, structured logging. Request threads only put records on an
+# in-memory queue (QueueHandler); a background QueueListener thread formats
+# them and does the file and console I/O, with size- or time-based rotation.
+# Each record carries the id of the request that produced it (X-Request-ID,
+# or a generated one), which is also echoed back on the response.
+#
+# Environment:
+#   LOG_LEVEL         INFO
+#   LOG_FORMAT        json | text                  (default json)
+#   LOG_FILE          app.log (empty to disable file logging)
+#   LOG_ROTATION      size | time | external       (default size)
+#   LOG_MAX_BYTES     10485760  (size rotation)
+#   LOG_WHEN          midnight  (time rotation, see TimedRotatingFileHandler)
+#   LOG_BACKUP_COUNT  7
+#
+# Rotating handlers must not share a file between processes: each would
+# rotate on its own, keep writing to the renamed file and overwrite the
+# others' backups. With several worker processes (WEB_CONCURRENCY > 1, set
+# by gunicorn.conf.py) rotation is therefore always "external": every
+# process appends through a WatchedFileHandler, which reopens the file
+# after logrotate (or similar) has moved it.
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import uuid
+from datetime import datetime, timezone
+
+from flask import g, has_request_context, request
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s %(threadName)s [%(request_id)s] : %(message)s"
+
+_listener = None
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the current request id; runs on the calling thread."""
+
+    def filter(self, record):
+        if not hasattr(record, "request_id"):
+            record.request_id = g.get("request_id", "-") if has_request_context() else "-"
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage()
+        }
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class RequestQueueHandler(logging.handlers.QueueHandler):
+    """Render the message and traceback up front but leave formatting to the listener."""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _file_handler():
+    path = os.getenv("LOG_FILE", "app.log")
+    if not path:
+        return None
+    rotation = os.getenv("LOG_ROTATION", "size")
+    if int(os.getenv("WEB_CONCURRENCY") or 1) > 1:
+        rotation = "external"
+    if rotation == "external":
+        return logging.handlers.WatchedFileHandler(path, encoding="utf-8")
+    backups = int(os.getenv("LOG_BACKUP_COUNT", 7))
+    if rotation == "time":
+        return logging.handlers.TimedRotatingFileHandler(
+            path, when=os.getenv("LOG_WHEN", "midnight"), backupCount=backups, encoding="utf-8"
+        )
+    return logging.handlers.RotatingFileHandler(
+        path, maxBytes=int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024)), backupCount=backups, encoding="utf-8"
+    )
+
+
+def configure_logging():
+    """Route the root logger through a queue to a background writer thread. Idempotent."""
+    global _listener
+    if _listener is not None:
+        return
+    if os.getenv("LOG_FORMAT", "json") == "text":
+        formatter = logging.Formatter(TEXT_FORMAT)
+    else:
+        formatter = JsonFormatter()
+    handlers = [logging.StreamHandler()]
+    file_handler = _file_handler()
+    if file_handler is not None:
+        handlers.append(file_handler)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = RequestQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+    root = logging.getLogger()
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    root.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    # Flush whatever is still queued when the process exits
+    atexit.register(_listener.stop)
+
+
+def _assign_request_id():
+    incoming = request.headers.get("X-Request-ID", "")
+    g.request_id = incoming[:64] if incoming else uuid.uuid4().hex
+
+
+def _echo_request_id(response):
+    if "request_id" in g:
+        response.headers["X-Request-ID"] = g.request_id
+    return response
+
+
+def init_request_ids(app):
+    app.before_request(_assign_request_id)
+    app.after_request(_echo_request_id)
@@ -0,0 +1,138 @@
+# metrics.py
+# Request-level performance instrumentation. SQLAlchemy cursor events count
+# queries and time spent in the database for the current request, Flask
+# request hooks time the whole request, and the per-endpoint histograms are
+# exposed on /metrics in the Prometheus text format.
+#
+# Requests that run more than QUERY_BUDGET queries are logged as warnings,
+# which is how per-row query loops (N+1s) show up.
+#
+# Metrics are kept per process; with several gunicorn workers each worker
+# reports its own series, so scrape every worker or aggregate by instance.
+import logging
+import threading
+import time
+
+from flask import Response, abort, current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, labels):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.labels = labels
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, ([*v[0]], v[1], v[2])) for k, v in self._series.items())
+        for label_values, (counts, total, count) in items:
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return "\n".join(lines)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by endpoint.",
+    LATENCY_BUCKETS, ("endpoint", "method", "status")
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "Database queries issued per request.",
+    QUERY_BUCKETS, ("endpoint", "method")
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds", "Time spent in database queries per request.",
+    LATENCY_BUCKETS, ("endpoint", "method")
+)
+ALL_METRICS = (REQUEST_LATENCY, REQUEST_QUERIES, REQUEST_DB_TIME)
+
+_listeners_installed = False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context so a failed statement leaves nothing behind
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not has_app_context():
+        return
+    stats = g.get("request_stats")
+    if stats is None:
+        return
+    stats["queries"] += 1
+    started = getattr(context, "_metrics_start", None)
+    if started is not None:
+        stats["db_time"] += time.perf_counter() - started
+
+
+def _start_request():
+    g.request_stats = {"start": time.perf_counter(), "queries": 0, "db_time": 0.0}
+
+
+def _finish_request(response):
+    stats = g.pop("request_stats", None)
+    if stats is None or request.endpoint == "metrics":
+        return response
+    endpoint = request.endpoint or "unmatched"
+    elapsed = time.perf_counter() - stats["start"]
+    REQUEST_LATENCY.observe((endpoint, request.method, str(response.status_code)), elapsed)
+    REQUEST_QUERIES.observe((endpoint, request.method), stats["queries"])
+    REQUEST_DB_TIME.observe((endpoint, request.method), stats["db_time"])
+    budget = current_app.config.get("QUERY_BUDGET")
+    if budget and stats["queries"] > budget:
+        logger.warning(
+            "Query budget exceeded: %s %s ran %d queries (budget %d, %.1f ms in db, %.1f ms total)",
+            request.method, request.path, stats["queries"], budget,
+            stats["db_time"] * 1000, elapsed * 1000
+        )
+    return response
+
+
+def metrics_view():
+    token = current_app.config.get("METRICS_TOKEN")
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        abort(401)
+    body = "\n".join(m.render() for m in ALL_METRICS) + "\n"
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
+
+def init_metrics(app):
+    global _listeners_installed
+    if not _listeners_installed:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _listeners_installed = True
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.add_url_rule("/metrics", "metrics", metrics_view)
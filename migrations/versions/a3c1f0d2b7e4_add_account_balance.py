@@ -0,0 +1,50 @@
+"""add materialized account balances
+
+Revision ID: a3c1f0d2b7e4
+Revises: 5e9ed84c7a97
+Create Date: 2025-07-02 09:14:27.512093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c1f0d2b7e4'
+down_revision = '5e9ed84c7a97'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('account_balance',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.Date(), nullable=False),
+    sa.Column('debit', sa.Numeric(precision=16, scale=2), nullable=False),
+    sa.Column('credit', sa.Numeric(precision=16, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['account_id'], ['account.id'], ),
+    sa.ForeignKeyConstraint(['book_id'], ['accounting_book.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('book_id', 'account_id', 'period', name='uq_account_balance_book_account_period')
+    )
+
+    # Backfill monthly balances from the existing ledger
+    conn = op.get_bind()
+    if conn.dialect.name == 'postgresql':
+        month = "date_trunc('month', je.date)::date"
+    else:
+        # SQLite stores dates as YYYY-MM-DD text
+        month = "date(je.date, 'start of month')"
+    conn.execute(sa.text(f"""
+        INSERT INTO account_balance (book_id, account_id, period, debit, credit)
+        SELECT je.book_id, jl.account_id, {month},
+               COALESCE(SUM(jl.debit), 0), COALESCE(SUM(jl.credit), 0)
+        FROM journal_line jl
+        JOIN journal_entry je ON je.id = jl.entry_id
+        GROUP BY je.book_id, jl.account_id, {month}
+    """))
+
+def downgrade():
+    op.drop_table('account_balance')
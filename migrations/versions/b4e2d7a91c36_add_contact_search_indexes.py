@@ -0,0 +1,40 @@
+"""add contact listing and trigram search indexes
+
+Revision ID: b4e2d7a91c36
+Revises: e1b5a8c3f692
+Create Date: 2025-07-23 10:14:37.506219
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4e2d7a91c36'
+down_revision = 'e1b5a8c3f692'
+branch_labels = None
+depends_on = None
+
+# Must stay identical to search_text() in routes/contacts.py for the planner
+# to use the index
+SEARCH_EXPRESSION = (
+    "lower(coalesce(name, '') || ' ' || coalesce(email, '') || ' ' || "
+    "coalesce(company, '') || ' ' || coalesce(notes, ''))"
+)
+
+
+def upgrade():
+    op.create_index('ix_contact_user_id_name', 'contact', ['user_id', 'name'], unique=False)
+    if op.get_bind().dialect.name == 'postgresql':
+        # Trigram GIN index so ILIKE '%term%' searches skip the sequential scan;
+        # other databases fall back to scanning the user's contacts
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.execute(
+            f'CREATE INDEX ix_contact_search_trgm ON contact USING gin (({SEARCH_EXPRESSION}) gin_trgm_ops)'
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_contact_search_trgm')
+    op.drop_index('ix_contact_user_id_name', table_name='contact')
@@ -0,0 +1,35 @@
+"""widen task.recurrence to hold full recurrence rules
+
+Revision ID: b9e4f1d6a2c8
+Revises: e5b9d2c4f071
+Create Date: 2025-08-12 10:21:05.318442
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9e4f1d6a2c8'
+down_revision = 'e5b9d2c4f071'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # e.g. FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TU,WE,TH,FR;COUNT=10 is 52 characters
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.alter_column('recurrence',
+               existing_type=sa.String(length=50),
+               type_=sa.String(length=255),
+               existing_nullable=True)
+
+
+def downgrade():
+    # A truncated rule would not parse, so longer rules are dropped
+    op.execute('UPDATE task SET recurrence = NULL WHERE length(recurrence) > 50')
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.alter_column('recurrence',
+               existing_type=sa.String(length=255),
+               type_=sa.String(length=50),
+               existing_nullable=True)
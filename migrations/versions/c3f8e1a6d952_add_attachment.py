@@ -0,0 +1,40 @@
+"""add attachment table for multiple content-addressed files per journal entry
+
+Revision ID: c3f8e1a6d952
+Revises: a7d1c3e58f20
+Create Date: 2025-08-06 10:12:43.905318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f8e1a6d952'
+down_revision = 'a7d1c3e58f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('attachment',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entry_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('content_type', sa.String(length=100), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['entry_id'], ['journal_entry.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_attachment_entry_id'), 'attachment', ['entry_id'], unique=False)
+    op.create_index(op.f('ix_attachment_sha256'), 'attachment', ['sha256'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_attachment_sha256'), table_name='attachment')
+    op.drop_index(op.f('ix_attachment_entry_id'), table_name='attachment')
+    op.drop_table('attachment')
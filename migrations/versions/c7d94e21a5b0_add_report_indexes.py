@@ -0,0 +1,28 @@
+"""add journal indexes for date-ranged reports
+
+Revision ID: c7d94e21a5b0
+Revises: a3c1f0d2b7e4
+Create Date: 2025-07-09 16:42:05.118734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d94e21a5b0'
+down_revision = 'a3c1f0d2b7e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_journal_entry_book_id_date', 'journal_entry', ['book_id', 'date'], unique=False)
+    op.create_index('ix_journal_line_account_id_entry_id', 'journal_line', ['account_id', 'entry_id'], unique=False)
+    op.create_index('ix_journal_line_entry_id', 'journal_line', ['entry_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_journal_line_entry_id', table_name='journal_line')
+    op.drop_index('ix_journal_line_account_id_entry_id', table_name='journal_line')
+    op.drop_index('ix_journal_entry_book_id_date', table_name='journal_entry')
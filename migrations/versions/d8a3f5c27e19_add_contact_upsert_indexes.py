@@ -0,0 +1,26 @@
+"""add contact email and phone lookup indexes for bulk upserts
+
+Revision ID: d8a3f5c27e19
+Revises: b4e2d7a91c36
+Create Date: 2025-07-25 14:32:11.734905
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8a3f5c27e19'
+down_revision = 'b4e2d7a91c36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_contact_user_id_email', 'contact', ['user_id', sa.text('lower(email)')], unique=False)
+    op.create_index('ix_contact_user_id_phone', 'contact', ['user_id', 'phone'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_contact_user_id_phone', table_name='contact')
+    op.drop_index('ix_contact_user_id_email', table_name='contact')
@@ -0,0 +1,47 @@
+"""add period close and closing balance snapshots
+
+Revision ID: e1b5a8c3f692
+Revises: c7d94e21a5b0
+Create Date: 2025-07-16 11:05:48.902417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1b5a8c3f692'
+down_revision = 'c7d94e21a5b0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('accounting_book', sa.Column('closed_through', sa.Date(), nullable=True))
+    op.create_table('period_close',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('period_end', sa.Date(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['book_id'], ['accounting_book.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('book_id', 'period_end', name='uq_period_close_book_id_period_end')
+    )
+    op.create_table('closing_balance',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('close_id', sa.Integer(), nullable=False),
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('debit', sa.Numeric(precision=16, scale=2), nullable=False),
+    sa.Column('credit', sa.Numeric(precision=16, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['account_id'], ['account.id'], ),
+    sa.ForeignKeyConstraint(['close_id'], ['period_close.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_closing_balance_close_id', 'closing_balance', ['close_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_closing_balance_close_id', table_name='closing_balance')
+    op.drop_table('closing_balance')
+    op.drop_table('period_close')
+    op.drop_column('accounting_book', 'closed_through')
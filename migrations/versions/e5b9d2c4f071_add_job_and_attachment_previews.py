@@ -0,0 +1,52 @@
+"""add job queue table and attachment preview/text columns
+
+Revision ID: e5b9d2c4f071
+Revises: c3f8e1a6d952
+Create Date: 2025-08-08 15:36:51.220847
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b9d2c4f071'
+down_revision = 'c3f8e1a6d952'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=50), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('run_after', sa.DateTime(), nullable=False),
+    sa.Column('locked_at', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_job_status_run_after', 'job', ['status', 'run_after'], unique=False)
+    with op.batch_alter_table('attachment', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('thumbnail_key', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('text', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('processed_at', sa.DateTime(), nullable=True))
+    if op.get_bind().dialect.name == 'postgresql':
+        # Serves the journal listing's q= search over attachment text;
+        # must match lower(attachment.text) in routes/journal.py
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.execute('CREATE INDEX ix_attachment_text_trgm ON attachment USING gin ((lower(text)) gin_trgm_ops)')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_attachment_text_trgm')
+    with op.batch_alter_table('attachment', schema=None) as batch_op:
+        batch_op.drop_column('processed_at')
+        batch_op.drop_column('text')
+        batch_op.drop_column('thumbnail_key')
+    op.drop_index('ix_job_status_run_after', table_name='job')
+    op.drop_table('job')
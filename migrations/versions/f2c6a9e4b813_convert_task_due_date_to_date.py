@@ -0,0 +1,85 @@
+"""convert task.dueDate from free text to a date column
+
+Revision ID: f2c6a9e4b813
+Revises: d8a3f5c27e19
+Create Date: 2025-07-29 09:47:22.613058
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c6a9e4b813'
+down_revision = 'd8a3f5c27e19'
+branch_labels = None
+depends_on = None
+
+# Formats the frontend has sent over time; anything else is kept in notes
+DATE_FORMATS = ('%Y-%m-%d', '%Y-%m-%dT%H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y')
+BATCH_SIZE = 1000
+
+task = sa.table(
+    'task',
+    sa.column('id', sa.Integer),
+    sa.column('dueDate', sa.String),
+    sa.column('due_date_new', sa.Date),
+    sa.column('notes', sa.Text)
+)
+
+
+def parse_due_date(value):
+    value = (value or '').strip()
+    if not value:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value[:19], fmt).date()
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).date()
+    except ValueError:
+        return None
+
+
+def upgrade():
+    op.add_column('task', sa.Column('due_date_new', sa.Date(), nullable=True))
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.select(task.c.id, task.c.dueDate, task.c.notes).where(task.c.dueDate.isnot(None))
+    ).fetchall()
+    converted, unparsed = [], []
+    for task_id, raw, notes in rows:
+        parsed = parse_due_date(raw)
+        if parsed is not None:
+            converted.append({'_id': task_id, 'due_date_new': parsed})
+        elif raw.strip():
+            # Keep values that are not dates instead of silently dropping them
+            note = f'Original due date: {raw}'
+            unparsed.append({'_id': task_id, 'notes': f'{notes}\n{note}' if notes else note})
+    for batch, column in ((converted, 'due_date_new'), (unparsed, 'notes')):
+        for i in range(0, len(batch), BATCH_SIZE):
+            conn.execute(
+                task.update().where(task.c.id == sa.bindparam('_id'))
+                .values({column: sa.bindparam(column)}),
+                batch[i:i + BATCH_SIZE]
+            )
+
+    with op.batch_alter_table('task') as batch_op:
+        batch_op.drop_column('dueDate')
+        batch_op.alter_column('due_date_new', new_column_name='dueDate')
+    op.create_index('ix_task_user_id_completed_due_date', 'task', ['user_id', 'completed', 'dueDate'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_task_user_id_completed_due_date', table_name='task')
+    with op.batch_alter_table('task') as batch_op:
+        batch_op.alter_column('dueDate', new_column_name='due_date_new')
+    op.add_column('task', sa.Column('dueDate', sa.String(length=50), nullable=True))
+    conn = op.get_bind()
+    conn.execute(sa.text("UPDATE task SET \"dueDate\" = CAST(due_date_new AS VARCHAR(50))"))
+    with op.batch_alter_table('task') as batch_op:
+        batch_op.drop_column('due_date_new')
@@ -13,6 +13,9 @@ class Account(db.Model):
     book_id = db.Column(db.Integer, db.ForeignKey('accounting_book.id'), nullable=False)
 
 class JournalEntry(db.Model):
+    __table_args__ = (
+        db.Index('ix_journal_entry_book_id_date', 'book_id', 'date'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     date = db.Column(db.Date, nullable=False)
@@ -20,9 +23,14 @@ class JournalEntry(db.Model):
     attachment = db.Column(db.String(255))  # NEW: file path or URL
     status = db.Column(db.String(20), default="Draft")  # NEW: Draft, Submitted, Approved, Rejected
     lines = db.relationship('JournalLine', backref='entry', lazy=True)
+    attachments = db.relationship('Attachment', backref='entry', lazy=True, order_by='Attachment.id')
     book_id = db.Column(db.Integer, db.ForeignKey('accounting_book.id'), nullable=False)
 
 class JournalLine(db.Model):
+    __table_args__ = (
+        db.Index('ix_journal_line_account_id_entry_id', 'account_id', 'entry_id'),
+        db.Index('ix_journal_line_entry_id', 'entry_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     entry_id = db.Column(db.Integer, db.ForeignKey('journal_entry.id'), nullable=False)
     account_id = db.Column(db.Integer, db.ForeignKey('account.id'), nullable=False)
@@ -30,6 +38,18 @@ class JournalLine(db.Model):
     credit = db.Column(db.Numeric(12, 2), default=0)
     account = db.relationship('Account')
 
+class AccountBalance(db.Model):
+    # Materialized per-account monthly totals, kept in step with journal writes
+    __table_args__ = (
+        db.UniqueConstraint('book_id', 'account_id', 'period', name='uq_account_balance_book_account_period'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    book_id = db.Column(db.Integer, db.ForeignKey('accounting_book.id'), nullable=False)
+    account_id = db.Column(db.Integer, db.ForeignKey('account.id'), nullable=False)
+    period = db.Column(db.Date, nullable=False)  # first day of the month
+    debit = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+    credit = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -42,18 +62,28 @@ class User(db.Model):
     contacts = db.relationship('Contact', backref='user', lazy=True, cascade="all, delete-orphan")
 
 class Task(db.Model):
+    __table_args__ = (
+        db.Index('ix_task_user_id_completed_due_date', 'user_id', 'completed', 'dueDate'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     description = db.Column(db.String(255), nullable=False)
-    dueDate = db.Column(db.String(50))  # <-- use dueDate, not due_date
+    dueDate = db.Column(db.Date)  # <-- use dueDate, not due_date
     category = db.Column(db.String(50))
-    recurrence = db.Column(db.String(50))
+    recurrence = db.Column(db.String(255))
     notes = db.Column(db.Text)
     priority = db.Column(db.String(20))
     completed = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class Contact(db.Model):
+    # Postgres also has ix_contact_search_trgm, a pg_trgm GIN index over the
+    # search text built in routes/contacts.py (see migration b4e2d7a91c36)
+    __table_args__ = (
+        db.Index('ix_contact_user_id_name', 'user_id', 'name'),
+        db.Index('ix_contact_user_id_email', 'user_id', db.text('lower(email)')),
+        db.Index('ix_contact_user_id_phone', 'user_id', 'phone'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     name = db.Column(db.String(120), nullable=False)
@@ -67,4 +97,63 @@ class AccountingBook(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     name = db.Column(db.String(100), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    # Optionally: description, period_start, period_end, etc.
\ No newline at end of file
+    closed_through = db.Column(db.Date)  # entries dated on or before this are locked
+    # Optionally: description, period_start, period_end, etc.
+
+class PeriodClose(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('book_id', 'period_end', name='uq_period_close_book_id_period_end'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    book_id = db.Column(db.Integer, db.ForeignKey('accounting_book.id'), nullable=False)
+    period_end = db.Column(db.Date, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    balances = db.relationship('ClosingBalance', backref='close', lazy=True, cascade="all, delete-orphan")
+
+class ClosingBalance(db.Model):
+    # Frozen cumulative totals per account as of PeriodClose.period_end
+    id = db.Column(db.Integer, primary_key=True)
+    close_id = db.Column(db.Integer, db.ForeignKey('period_close.id'), nullable=False, index=True)
+    account_id = db.Column(db.Integer, db.ForeignKey('account.id'), nullable=False)
+    debit = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+    credit = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+
+class RevokedToken(db.Model):
+    # Logged-out and rotated JWTs, kept until they would have expired anyway
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), nullable=False, unique=True)
+    token_type = db.Column(db.String(10), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+class Attachment(db.Model):
+    # A file on a journal entry; the content lives in storage.py under its sha256,
+    # shared by every attachment with the same bytes
+    id = db.Column(db.Integer, primary_key=True)
+    entry_id = db.Column(db.Integer, db.ForeignKey('journal_entry.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    sha256 = db.Column(db.String(64), nullable=False, index=True)
+    size = db.Column(db.Integer, nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    content_type = db.Column(db.String(100), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Filled in by the background worker (previews.py)
+    thumbnail_key = db.Column(db.String(100))
+    text = db.Column(db.Text)
+    processed_at = db.Column(db.DateTime)
+
+class Job(db.Model):
+    # Background work queue, see jobs.py
+    __table_args__ = (
+        db.Index('ix_job_status_run_after', 'status', 'run_after'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text)  # JSON
+    status = db.Column(db.String(20), nullable=False, default="queued")  # queued, running, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
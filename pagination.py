@@ -0,0 +1,36 @@
+# pagination.py
+# Opaque keyset cursors and search helpers shared by the list endpoints.
+import base64
+import json
+
+from flask import request
+
+DEFAULT_MAX_LIMIT = 500
+
+
+def encode_cursor(*values):
+    raw = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return the list of values stored in a cursor, or None if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def escape_like(term):
+    """Escape LIKE wildcards in a search term; use with escape='\\'."""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def parse_limit(maximum=DEFAULT_MAX_LIMIT):
+    """Read ?limit= from the request; None means the caller did not ask for pagination."""
+    limit = request.args.get("limit", type=int)
+    if limit is None:
+        return None
+    return max(1, min(limit, maximum))
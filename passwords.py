@@ -0,0 +1,81 @@
+# passwords.py
+# Password hashing with configurable parameters, run on a small bounded
+# thread pool. scrypt and pbkdf2 release the GIL, so at most
+# PASSWORD_HASH_WORKERS hashes burn CPU at once, and request threads that
+# are not logging in keep being served during a login storm. When
+# PASSWORD_HASH_QUEUE hashes are already running or waiting, new ones fail
+# fast with HashPoolBusy (the routes answer 503) instead of piling up.
+#
+# Stored hashes carry their own parameters (werkzeug's "method$salt$hash"),
+# so changing PASSWORD_HASH_METHOD only affects new hashes; existing users
+# are rehashed transparently the next time they log in.
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = "scrypt:32768:8:1"
+
+
+class HashPoolBusy(Exception):
+    pass
+
+
+class HashPool:
+    def __init__(self, method, workers, queue_size, wait):
+        self.method = method
+        self.wait = wait
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._dummy_hash = None
+
+    @property
+    def dummy_hash(self):
+        """Checked when the user does not exist, so timing does not reveal it. Built on first use."""
+        if self._dummy_hash is None:
+            self._dummy_hash = self.run(generate_password_hash, "dummy-password", self.method)
+        return self._dummy_hash
+
+    @property
+    def prefix(self):
+        # Normalized parameters, e.g. "pbkdf2:sha256" -> "pbkdf2:sha256:1000000"
+        return self.dummy_hash.split("$", 1)[0]
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.wait):
+            raise HashPoolBusy()
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+
+def init_passwords(app):
+    workers = app.config.get("PASSWORD_HASH_WORKERS") or os.cpu_count() or 2
+    app.extensions["password_pool"] = HashPool(
+        app.config.get("PASSWORD_HASH_METHOD") or DEFAULT_METHOD,
+        workers,
+        app.config.get("PASSWORD_HASH_QUEUE") or workers * 4,
+        app.config.get("PASSWORD_HASH_WAIT", 2.0)
+    )
+
+
+def _pool():
+    return current_app.extensions["password_pool"]
+
+
+def hash_password(password):
+    pool = _pool()
+    return pool.run(generate_password_hash, password, pool.method)
+
+
+def verify_password(stored_hash, password):
+    """Return (matches, needs_rehash). stored_hash may be None for an unknown user."""
+    pool = _pool()
+    if stored_hash is None:
+        pool.run(check_password_hash, pool.dummy_hash, password or "")
+        return False, False
+    matches = pool.run(check_password_hash, stored_hash, password or "")
+    return matches, matches and stored_hash.split("$", 1)[0] != pool.prefix
@@ -0,0 +1,147 @@
+# previews.py
+# Background processing of uploaded attachments, run by `flask worker` (see
+# jobs.py): a small JPEG thumbnail for journal listings, and the file's text
+# so entries can be searched by what is on their receipts.
+#
+# All three libraries are optional; without one the matching step is
+# skipped and the attachment is still marked processed:
+#   Pillow       image thumbnails (and PDF thumbnails from the first page's image)
+#   pypdf        text layer of PDFs
+#   pytesseract  OCR of images and of scanned PDFs without a text layer
+#                (also needs the tesseract binary)
+import io
+import logging
+from datetime import datetime
+
+import click
+
+from db import db
+from jobs import enqueue, handler
+from models import Attachment
+from storage import attachments_cli, get_storage, object_key, store_bytes, thumbnail_key
+
+logger = logging.getLogger(__name__)
+
+PROCESS_ATTACHMENT = "attachment.process"
+THUMBNAIL_SIZE = (320, 320)
+MAX_PDF_PAGES = 20
+MAX_TEXT_CHARS = 100000
+
+
+def enqueue_processing(attachment):
+    """Queue thumbnail and text extraction; committed with the caller's transaction."""
+    db.session.flush()  # assigns attachment.id
+    enqueue(PROCESS_ATTACHMENT, {"attachment_id": attachment.id})
+
+
+def _open_image(data):
+    try:
+        from PIL import Image  # optional dependency
+    except ImportError:
+        return None
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    return image
+
+
+def _thumbnail(image):
+    from PIL import ImageOps
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail(THUMBNAIL_SIZE)
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=80, optimize=True)
+    return out.getvalue()
+
+
+def _ocr(image):
+    try:
+        import pytesseract  # optional dependency
+    except ImportError:
+        return ""
+    try:
+        return pytesseract.image_to_string(image)
+    except pytesseract.TesseractNotFoundError:
+        logger.warning("pytesseract is installed but the tesseract binary is not; skipping OCR")
+        return ""
+
+
+def _first_page_image(page):
+    try:
+        images = page.images
+        return images[0].image if len(images) else None
+    except Exception:
+        return None  # needs Pillow, and unusual encodings may not decode
+
+
+def extract_pdf(data):
+    """Return (text, first page image or None) for a PDF."""
+    try:
+        from pypdf import PdfReader  # optional dependency
+    except ImportError:
+        return "", None
+    reader = PdfReader(io.BytesIO(data))
+    pages = reader.pages[:MAX_PDF_PAGES]
+    text = "\n".join(page.extract_text() or "" for page in pages)
+    image = _first_page_image(pages[0]) if pages else None
+    if not text.strip() and image is not None:
+        text = _ocr(image)  # a scan without a text layer
+    return text, image
+
+
+def extract(data, content_type):
+    """Return (text, thumbnail JPEG bytes or None)."""
+    if content_type == "application/pdf":
+        text, image = extract_pdf(data)
+    else:
+        image = _open_image(data)
+        text = _ocr(image) if image is not None else ""
+    thumbnail = _thumbnail(image) if image is not None else None
+    # Postgres text columns cannot hold NUL characters
+    return text.replace("\x00", "").strip()[:MAX_TEXT_CHARS], thumbnail
+
+
+@handler(PROCESS_ATTACHMENT)
+def process_attachment(payload):
+    attachment = db.session.get(Attachment, payload["attachment_id"])
+    if attachment is None:
+        return  # deleted since it was queued
+    # The same file attached elsewhere has already been processed
+    done = Attachment.query.filter(
+        Attachment.sha256 == attachment.sha256,
+        Attachment.id != attachment.id,
+        Attachment.processed_at.isnot(None)
+    ).first()
+    if done is not None:
+        attachment.text = done.text
+        attachment.thumbnail_key = done.thumbnail_key
+    else:
+        blob = get_storage().open(object_key(attachment.sha256))
+        try:
+            data = blob.read()
+        finally:
+            blob.close()
+        text, thumbnail = extract(data, attachment.content_type)
+        if thumbnail is not None:
+            key = thumbnail_key(attachment.sha256)
+            store_bytes(thumbnail, key, "image/jpeg")
+            attachment.thumbnail_key = key
+        attachment.text = text or None
+    attachment.processed_at = datetime.utcnow()
+    db.session.commit()
+
+
+@attachments_cli.command("process")
+@click.option("--all", "reprocess", is_flag=True, help="Also redo attachments processed before.")
+def process_command(reprocess):
+    """Queue thumbnail and text extraction for existing attachments."""
+    if reprocess:
+        Attachment.query.update({Attachment.processed_at: None})
+    query = db.session.query(Attachment.id).filter(Attachment.processed_at.is_(None))
+    count = 0
+    for (attachment_id,) in query:
+        enqueue(PROCESS_ATTACHMENT, {"attachment_id": attachment_id})
+        count += 1
+    db.session.commit()
+    click.echo(f"Queued {count} attachments; run `flask worker` to process them.")
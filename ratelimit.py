@@ -0,0 +1,60 @@
+# ratelimit.py
+# In-process token buckets for the auth endpoints. A bucket holds up to
+# `burst` tokens and refills at `rate` tokens per second; each attempt takes
+# one. Buckets live in a bounded LRU, so a flood of distinct keys cannot
+# grow memory without limit. Limits are per worker process: with N workers
+# the effective limit is up to N times the configured one.
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    def __init__(self, rate, burst, maxsize=100000):
+        self.rate = rate
+        self.burst = burst
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _refill(self, key, now):
+        tokens, updated = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return tokens
+
+    def check(self, key):
+        """Seconds until an attempt would be allowed; 0 if one is available now."""
+        with self._lock:
+            tokens = self._refill(key, time.monotonic())
+            return 0 if tokens >= 1 else math.ceil((1 - tokens) / self.rate)
+
+    def consume(self, key):
+        """Take a token; returns the seconds to wait (0 when the attempt is allowed)."""
+        with self._lock:
+            tokens = self._refill(key, time.monotonic())
+            if tokens < 1:
+                return math.ceil((1 - tokens) / self.rate)
+            self._buckets[key] = (tokens - 1, self._buckets[key][1])
+            return 0
+
+
+def per_minute(limit):
+    """A limiter allowing `limit` attempts per minute with bursts of the same size; None when disabled."""
+    if not limit or limit <= 0:
+        return None
+    return TokenBucketLimiter(limit / 60.0, limit)
+
+
+def init_rate_limits(app):
+    app.extensions["login_limits"] = {
+        # Every login/signup attempt from an address
+        "ip": per_minute(app.config.get("LOGIN_IP_PER_MINUTE")),
+        # Failed logins per account name, so guessing one password is slow
+        # without letting others lock an account out by hammering it
+        "account": per_minute(app.config.get("LOGIN_ACCOUNT_PER_MINUTE"))
+    }
@@ -0,0 +1,215 @@
+# recurrence.py
+# A small RRULE subset for recurring tasks:
+#
+#   FREQ=DAILY|WEEKLY|MONTHLY|YEARLY;INTERVAL=n;BYDAY=MO,WE;BYMONTHDAY=15;
+#   COUNT=n;UNTIL=YYYYMMDD
+#
+# plus the legacy values the frontend stores ("daily", "weekly", "monthly",
+# "yearly", "none"). Occurrences are generated lazily from the task's due
+# date and the generator jumps straight to the requested window, so a
+# calendar never materializes rows or walks years of past dates.
+import calendar
+from datetime import MAXYEAR, date, datetime, timedelta
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+LEGACY = {"daily": "DAILY", "weekly": "WEEKLY", "monthly": "MONTHLY", "yearly": "YEARLY", "annually": "YEARLY"}
+NO_RECURRENCE = {"", "none", "never", "once"}
+MAX_OCCURRENCES = 1000  # per task per request
+# A rule whose day falls in no period for this long never will: monthly
+# patterns repeat every 12 periods, and the leap-year cycle is 400 years.
+# FREQ=MONTHLY;INTERVAL=12;BYMONTHDAY=31 from an April date is one such rule.
+MAX_EMPTY_PERIODS = 400
+
+
+class RecurrenceError(ValueError):
+    pass
+
+
+class Rule:
+    def __init__(self, freq, interval=1, byday=None, bymonthday=None, count=None, until=None):
+        self.freq = freq
+        self.interval = interval
+        self.byday = byday
+        self.bymonthday = bymonthday
+        self.count = count
+        self.until = until
+
+    def __str__(self):
+        parts = [f"FREQ={self.freq}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.byday:
+            parts.append("BYDAY=" + ",".join(WEEKDAYS[d] for d in self.byday))
+        if self.bymonthday:
+            parts.append(f"BYMONTHDAY={self.bymonthday}")
+        if self.count is not None:
+            parts.append(f"COUNT={self.count}")
+        if self.until:
+            parts.append(f"UNTIL={self.until.strftime('%Y%m%d')}")
+        return ";".join(parts)
+
+
+def _positive_int(name, value):
+    try:
+        number = int(value)
+    except ValueError:
+        raise RecurrenceError(f"{name} must be a whole number.")
+    if number < 1:
+        raise RecurrenceError(f"{name} must be at least 1.")
+    return number
+
+
+def parse_rule(text):
+    """Parse a recurrence string; returns a Rule, or None for no recurrence."""
+    text = (text or "").strip()
+    if text.lower() in NO_RECURRENCE:
+        return None
+    if text.lower() in LEGACY:
+        return Rule(LEGACY[text.lower()])
+    if text.upper().startswith("RRULE:"):
+        text = text[6:]
+    fields = {}
+    for part in text.split(";"):
+        if not part:
+            continue
+        key, sep, value = part.partition("=")
+        if not sep:
+            raise RecurrenceError(f"Invalid recurrence part '{part}'.")
+        fields[key.strip().upper()] = value.strip()
+
+    freq = fields.pop("FREQ", "").upper()
+    if freq not in FREQUENCIES:
+        raise RecurrenceError(f"FREQ must be one of {', '.join(FREQUENCIES)}.")
+    rule = Rule(freq)
+    if "INTERVAL" in fields:
+        rule.interval = _positive_int("INTERVAL", fields.pop("INTERVAL"))
+    if "BYDAY" in fields:
+        if freq != "WEEKLY":
+            raise RecurrenceError("BYDAY is only supported with FREQ=WEEKLY.")
+        days = [d.strip().upper() for d in fields.pop("BYDAY").split(",") if d.strip()]
+        if not days or any(d not in WEEKDAYS for d in days):
+            raise RecurrenceError(f"BYDAY takes {','.join(WEEKDAYS)}.")
+        rule.byday = sorted({WEEKDAYS.index(d) for d in days})
+    if "BYMONTHDAY" in fields:
+        if freq != "MONTHLY":
+            raise RecurrenceError("BYMONTHDAY is only supported with FREQ=MONTHLY.")
+        rule.bymonthday = _positive_int("BYMONTHDAY", fields.pop("BYMONTHDAY"))
+        if rule.bymonthday > 31:
+            raise RecurrenceError("BYMONTHDAY must be between 1 and 31.")
+    if "COUNT" in fields:
+        rule.count = _positive_int("COUNT", fields.pop("COUNT"))
+    if "UNTIL" in fields:
+        value = fields.pop("UNTIL")
+        try:
+            rule.until = datetime.strptime(value[:8], "%Y%m%d").date()
+        except ValueError:
+            raise RecurrenceError("UNTIL must be a date like 20251231.")
+    if rule.count is not None and rule.until:
+        raise RecurrenceError("COUNT and UNTIL cannot be combined.")
+    if fields:
+        raise RecurrenceError(f"Unsupported recurrence fields: {', '.join(sorted(fields))}.")
+    return rule
+
+
+def _day_in_month(year, month, day):
+    if year > MAXYEAR:
+        return None
+    if day > calendar.monthrange(year, month)[1]:
+        return None  # e.g. the 31st in a 30-day month is skipped, as in RFC 5545
+    return date(year, month, day)
+
+
+def _candidates(rule, start, skip):
+    """Yield candidate dates in order, beginning `skip` periods after start.
+
+    Stops after MAX_EMPTY_PERIODS periods in a row without a date.
+    """
+    period = skip
+    empty = 0
+    while empty < MAX_EMPTY_PERIODS:
+        step = period * rule.interval
+        if rule.freq == "DAILY":
+            yield start + timedelta(days=step)
+        elif rule.freq == "WEEKLY":
+            if rule.byday:
+                week = start - timedelta(days=start.weekday()) + timedelta(weeks=step)
+                for weekday in rule.byday:
+                    yield week + timedelta(days=weekday)
+            else:
+                yield start + timedelta(weeks=step)
+        else:
+            if rule.freq == "MONTHLY":
+                month_index = start.month - 1 + step
+                candidate = _day_in_month(start.year + month_index // 12, month_index % 12 + 1,
+                                          rule.bymonthday or start.day)
+            else:
+                candidate = _day_in_month(start.year + step, start.month, start.day)
+            if candidate is None:
+                empty += 1
+            else:
+                empty = 0
+                yield candidate
+        period += 1
+
+
+def _periods_before(rule, start, target):
+    """Whole periods that end before target; used to jump ahead when COUNT does not apply."""
+    if target <= start:
+        return 0
+    if rule.freq == "DAILY":
+        elapsed = (target - start).days
+    elif rule.freq == "WEEKLY":
+        elapsed = (target - start).days // 7 - 1
+    elif rule.freq == "MONTHLY":
+        elapsed = (target.year - start.year) * 12 + target.month - start.month - 1
+    else:
+        elapsed = target.year - start.year - 1
+    return max(0, elapsed // rule.interval)
+
+
+def occurrences(rule, start, window_start=None, window_end=None):
+    """Lazily yield occurrence dates of rule within the window.
+
+    As in RFC 5545 the start date is always the first occurrence and counts
+    towards COUNT, even when it does not match BYDAY.
+    """
+    if window_end is not None and start > window_end:
+        return
+    if window_start is None or start >= window_start:
+        yield start
+    if rule is None:
+        return
+    # With COUNT every occurrence from the start has to be counted, so no jumping ahead
+    skip = 0 if rule.count is not None or window_start is None else _periods_before(rule, start, window_start)
+    emitted = 1
+    for candidate in _candidates(rule, start, skip):
+        if candidate <= start:
+            continue
+        if rule.until and candidate > rule.until:
+            return
+        if window_end is not None and candidate > window_end:
+            return
+        emitted += 1
+        if rule.count is not None and emitted > rule.count:
+            return
+        if window_start is None or candidate >= window_start:
+            yield candidate
+
+
+def next_occurrence(rule, current):
+    """Return (date, rule) for the instance after current, or None when the series ends.
+
+    The returned rule has COUNT reduced by one, so the new task carries the
+    remaining occurrences.
+    """
+    if rule is None or rule.count == 1:
+        return None
+    series = occurrences(rule, current)
+    next(series)
+    following = next(series, None)
+    if following is None:
+        return None
+    remaining = Rule(rule.freq, rule.interval, rule.byday, rule.bymonthday,
+                     rule.count - 1 if rule.count is not None else None, rule.until)
+    return following, remaining
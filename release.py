@@ -0,0 +1,66 @@
+# release.py
+# Schema migrations as a release step instead of on every worker boot.
+#
+#   flask release        # run once per deploy, before starting workers
+#
+# create_app() only runs the same guarded upgrade when MIGRATE_ON_START is
+# enabled. On Postgres the upgrade is serialized with an advisory lock, and
+# skipped entirely when the database is already at the latest revision, so
+# concurrent workers neither race each other nor pay for Alembic's env setup.
+import logging
+
+import click
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from flask import current_app
+from flask_migrate import upgrade
+from sqlalchemy import text
+
+from db import db
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key for pg_advisory_lock
+MIGRATION_LOCK_ID = 0x43524D31
+
+
+def pending_migrations():
+    """True when the database is not at the head revision(s) of migrations/."""
+    config = current_app.extensions["migrate"].migrate.get_config()
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+    with db.engine.connect() as conn:
+        current = set(MigrationContext.configure(conn).get_current_heads())
+    return current != heads
+
+
+def run_migrations():
+    """Upgrade to head once, holding an advisory lock on Postgres. Needs an app context."""
+    if not pending_migrations():
+        logger.info("Database schema is up to date.")
+        return False
+    engine = db.engine
+    if engine.dialect.name != "postgresql":
+        upgrade()
+        return True
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        conn.commit()
+        try:
+            # Another process may have finished the upgrade while we waited
+            if not pending_migrations():
+                logger.info("Database schema was upgraded by another process.")
+                return False
+            upgrade()
+            return True
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+            conn.commit()
+
+
+@click.command("release")
+def release_command():
+    """Apply pending database migrations (run once per deploy)."""
+    if run_migrations():
+        click.echo("Database migrations applied.")
+    else:
+        click.echo("No migrations to apply.")
@@ -0,0 +1,233 @@
+# reports.py
+# Shared aggregation engine for the financial reports in routes/journal.py.
+# Debit/credit totals for every account of a book are computed with a single
+# grouped query instead of two SUM queries per account, optionally restricted
+# to a date window and entry statuses, or split into comparative periods.
+from datetime import date, timedelta
+
+from db import db
+from models import Account, JournalEntry, JournalLine
+
+COMPARE_STEPS = {"mom": 1, "yoy": 12}
+MAX_COMPARE_PERIODS = 24
+ROW_VALUE_KEYS = ("debit", "credit", "balance", "amount")
+
+
+def _status_filter(statuses):
+    return db.func.lower(JournalEntry.status).in_([s.lower() for s in statuses])
+
+
+def period_totals(user_id, book_id, windows, statuses=None):
+    """Return one {account_id: (debit, credit)} dict per (start, end) window.
+
+    All windows are aggregated in a single pass: each window becomes a pair of
+    SUM(CASE ...) columns over the same scan. A None start or end is open-ended.
+    """
+    columns = []
+    for start, end in windows:
+        conditions = []
+        if start:
+            conditions.append(JournalEntry.date >= start)
+        if end:
+            conditions.append(JournalEntry.date <= end)
+        if conditions:
+            in_window = db.and_(*conditions)
+            columns.append(db.func.sum(db.case((in_window, JournalLine.debit), else_=0)))
+            columns.append(db.func.sum(db.case((in_window, JournalLine.credit), else_=0)))
+        else:
+            columns.append(db.func.sum(JournalLine.debit))
+            columns.append(db.func.sum(JournalLine.credit))
+    query = (
+        db.session.query(JournalLine.account_id, *columns)
+        .join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
+        .filter(JournalEntry.user_id == user_id, JournalEntry.book_id == book_id)
+    )
+    # Bound the scan to the union of the windows so the (book_id, date) index applies
+    starts = [start for start, _ in windows]
+    ends = [end for _, end in windows]
+    if all(starts):
+        query = query.filter(JournalEntry.date >= min(starts))
+    if all(ends):
+        query = query.filter(JournalEntry.date <= max(ends))
+    if statuses:
+        query = query.filter(_status_filter(statuses))
+    results = [{} for _ in windows]
+    for row in query.group_by(JournalLine.account_id).all():
+        account_id = row[0]
+        for i in range(len(windows)):
+            debit, credit = row[1 + 2 * i], row[2 + 2 * i]
+            results[i][account_id] = (float(debit or 0), float(credit or 0))
+    return results
+
+
+def account_totals(user_id, book_id, start=None, end=None, statuses=None):
+    """Return {account_id: (debit, credit)} for every account with lines in the book."""
+    return period_totals(user_id, book_id, [(start, end)], statuses)[0]
+
+
+def month_end(d):
+    next_month = date(d.year + d.month // 12, d.month % 12 + 1, 1)
+    return next_month - timedelta(days=1)
+
+
+def shift_months(d, months):
+    """Move a date by whole months, keeping month-end dates on the month end."""
+    index = d.year * 12 + d.month - 1 + months
+    year, month = divmod(index, 12)
+    last_day = month_end(date(year, month + 1, 1)).day
+    if d == month_end(d):
+        return date(year, month + 1, last_day)
+    return date(year, month + 1, min(d.day, last_day))
+
+
+def comparison_windows(start, end, compare, count):
+    """Return count windows, the requested one first, each shifted back a month (mom) or year (yoy)."""
+    step = COMPARE_STEPS[compare]
+    return [
+        (shift_months(start, -step * i) if start else None, shift_months(end, -step * i))
+        for i in range(count)
+    ]
+
+
+def is_month_aligned(start, end):
+    """True when the window can be answered from the monthly AccountBalance rows."""
+    return (start is None or start.day == 1) and (end is None or end == month_end(end))
+
+
+def book_accounts(user_id, book_id):
+    return (
+        Account.query.filter_by(user_id=user_id, book_id=book_id)
+        .order_by(Account.code)
+        .all()
+    )
+
+
+def _account_row(acc, **values):
+    row = {
+        "account_id": acc.id,
+        "account_code": acc.code,
+        "account_name": acc.name
+    }
+    row.update(values)
+    return row
+
+
+def trial_balance_report(accounts, totals):
+    result = []
+    total_debit = 0.0
+    total_credit = 0.0
+    for acc in accounts:
+        debit, credit = totals.get(acc.id, (0.0, 0.0))
+        result.append(_account_row(acc, debit=debit, credit=credit, balance=debit - credit))
+        total_debit += debit
+        total_credit += credit
+    return {
+        "accounts": result,
+        "total_debit": total_debit,
+        "total_credit": total_credit
+    }
+
+
+def income_statement_report(accounts, totals):
+    income = []
+    expense = []
+    total_income = 0.0
+    total_expense = 0.0
+    for acc in accounts:
+        debit, credit = totals.get(acc.id, (0.0, 0.0))
+        if acc.type == "Income":
+            income.append(_account_row(acc, amount=credit))
+            total_income += credit
+        elif acc.type == "Expense":
+            expense.append(_account_row(acc, amount=debit))
+            total_expense += debit
+    return {
+        "income": income,
+        "expense": expense,
+        "total_income": total_income,
+        "total_expense": total_expense,
+        "net_income": total_income - total_expense
+    }
+
+
+def balance_sheet_report(accounts, totals):
+    sections = {"Asset": [], "Liability": [], "Equity": []}
+    section_totals = {"Asset": 0.0, "Liability": 0.0, "Equity": 0.0}
+    for acc in accounts:
+        if acc.type not in sections:
+            continue
+        debit, credit = totals.get(acc.id, (0.0, 0.0))
+        # Assets carry debit balances, liabilities and equity carry credit balances
+        balance = debit - credit if acc.type == "Asset" else credit - debit
+        sections[acc.type].append(_account_row(acc, balance=balance))
+        section_totals[acc.type] += balance
+    return {
+        "assets": sections["Asset"],
+        "liabilities": sections["Liability"],
+        "equity": sections["Equity"],
+        "total_assets": section_totals["Asset"],
+        "total_liabilities": section_totals["Liability"],
+        "total_equity": section_totals["Equity"]
+    }
+
+
+def rollup(rows, parent_of, value_keys=(), id_key="account_id"):
+    """Nest flat rows under their parents and add subtotals, in O(rows).
+
+    parent_of maps a row id to its parent id (from the one flat Account
+    query). Rows whose parent is not among the rows become roots. Each node
+    gets a "children" list and, when value_keys are given, a "subtotal" dict
+    summing the node and all of its descendants.
+    """
+    nodes = {row[id_key]: dict(row, children=[]) for row in rows}
+    roots = []
+    for row in rows:
+        node = nodes[row[id_key]]
+        parent = nodes.get(parent_of.get(row[id_key]))
+        if parent is None or parent is node:
+            roots.append(node)
+        else:
+            parent["children"].append(node)
+
+    # Pre-order walk with an explicit stack so deep charts cannot hit the
+    # recursion limit
+    order = []
+    visited = set()
+
+    def walk(start):
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            visited.add(node[id_key])
+            order.append(node)
+            stack.extend(reversed(node["children"]))
+
+    for root in roots:
+        walk(root)
+    # Accounts caught in a parent cycle are never reached from a root;
+    # detach each from its parent and promote it to a root instead
+    for row in rows:
+        node = nodes[row[id_key]]
+        if node[id_key] in visited:
+            continue
+        parent = nodes[parent_of[node[id_key]]]
+        parent["children"] = [child for child in parent["children"] if child is not node]
+        roots.append(node)
+        walk(node)
+
+    if value_keys:
+        for node in reversed(order):
+            node["subtotal"] = {
+                key: node.get(key, 0.0) + sum(child["subtotal"][key] for child in node["children"])
+                for key in value_keys
+            }
+    return roots
+
+
+def rollup_report(report, parent_of):
+    """Turn every account list of a built report into a tree with subtotals."""
+    for key, value in report.items():
+        if isinstance(value, list):
+            value_keys = [k for k in ROW_VALUE_KEYS if value and k in value[0]]
+            report[key] = rollup(value, parent_of, value_keys)
+    return report
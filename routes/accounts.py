@@ -1,42 +1,46 @@
 # routes/accounts.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, g, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, Account, AccountingBook, JournalLine
+from authz import book_required
+from models import db, Account, AccountBalance, JournalLine
 from sqlalchemy.exc import IntegrityError
+from reports import rollup
+from cache import bump_book_version
 
 accounts_bp = Blueprint('accounts', __name__)
 
 @accounts_bp.route('/', methods=['GET'])
 @jwt_required()
+@book_required
 def get_accounts():
     user_id = get_jwt_identity()
-    book_id = request.args.get('book_id', type=int)
-    if not book_id:
-        return jsonify({'error': 'book_id is required'}), 400
-    # Defensive: Check if book exists for this user
-    book = AccountingBook.query.filter_by(id=book_id, user_id=user_id).first()
-    if not book:
-        return jsonify({'error': 'Book not found'}), 404
+    book_id = g.book_id
     try:
         accounts = Account.query.filter_by(user_id=user_id, book_id=book_id).all()
-        return jsonify([{
+        result = [{
             'id': acc.id,
             'name': acc.name,
             'type': acc.type,
             'code': acc.code,
             'category': acc.category,
             'parent_id': acc.parent_id
-        } for acc in accounts])
+        } for acc in accounts]
+        if request.args.get('tree', '').lower() in ('1', 'true', 'yes'):
+            # Built in memory from the flat list; never touches acc.children
+            parent_of = {acc.id: acc.parent_id for acc in accounts}
+            result = rollup(result, parent_of, id_key='id')
+        return jsonify(result)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Failed to fetch accounts: {str(e)}'}), 500
 
 @accounts_bp.route('/', methods=['POST'])
 @jwt_required()
+@book_required
 def add_account():
     user_id = get_jwt_identity()
     data = request.get_json() or {}
-    book_id = data.get('book_id')
+    book_id = g.book_id
     name = data.get('name')
     type_ = data.get('type')
     code = data.get('code')
@@ -46,10 +50,6 @@ def add_account():
     if not all([book_id, name, type_, code, category]):
         return jsonify({'error': 'All fields (book_id, name, type, code, category) are required'}), 400
 
-    book = AccountingBook.query.filter_by(id=book_id, user_id=user_id).first()
-    if not book:
-        return jsonify({'error': 'Book not found'}), 404
-
     if Account.query.filter_by(user_id=user_id, book_id=book_id, code=code).first():
         return jsonify({'error': 'Account code already exists in this book'}), 400
 
@@ -65,6 +65,7 @@ def add_account():
         )
         db.session.add(acc)
         db.session.commit()
+        bump_book_version(book_id)
         return jsonify({'message': 'Account added', 'id': acc.id}), 201
     except IntegrityError as e:
         db.session.rollback()
@@ -85,6 +86,7 @@ def edit_account(account_id):
     account.category = data.get('category', account.category)
     account.parent_id = data.get('parent_id', account.parent_id)
     db.session.commit()
+    bump_book_version(account.book_id)
     return jsonify({'message': 'Account updated'})
 
 @accounts_bp.route('/<int:account_id>', methods=['DELETE'])
@@ -95,6 +97,10 @@ def delete_account(account_id):
     # Prevent deletion if account is used in journal lines
     if JournalLine.query.filter_by(account_id=account.id).first():
         return jsonify({'error': 'Cannot delete account: it is used in journal entries.'}), 400
+    # Only zeroed balance rows can remain once no journal lines reference the account
+    AccountBalance.query.filter_by(account_id=account.id).delete()
+    book_id = account.book_id
     db.session.delete(account)
     db.session.commit()
+    bump_book_version(book_id)
     return jsonify({'message': 'Account deleted'})
\ No newline at end of file
@@ -1,14 +1,46 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from db import db
 from models import User
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token, get_jwt, jwt_required, get_jwt_identity
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
+from authz import user_profile
+from passwords import HashPoolBusy, hash_password, verify_password
+from tokens import revoke
 import re
 
 auth_bp = Blueprint('auth', __name__)
 
+def too_many_attempts(retry_after):
+    response = jsonify({'error': 'Too many attempts. Please try again later.'})
+    response.headers['Retry-After'] = str(retry_after)
+    return response, 429
+
+def limit(name, key, consume=True):
+    """Seconds to wait before the next attempt under the named limiter; 0 if allowed."""
+    limiter = current_app.extensions['login_limits'][name]
+    if limiter is None:
+        return 0
+    return limiter.consume(key) if consume else limiter.check(key)
+
+@auth_bp.errorhandler(HashPoolBusy)
+def hash_pool_busy(e):
+    response = jsonify({'error': 'Server is busy. Please try again shortly.'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+def issue_tokens(user_id):
+    identity = str(user_id)
+    return {
+        'token': create_access_token(identity=identity),
+        'refresh_token': create_refresh_token(identity=identity)
+    }
+
 @auth_bp.route('/signup', methods=['POST'])
 def signup():
+    retry_after = limit('ip', request.remote_addr)
+    if retry_after:
+        return too_many_attempts(retry_after)
     data = request.get_json()
     required = ['username', 'firstName', 'lastName', 'email', 'contact', 'password']
     if not all(field in data and data[field] for field in required):
@@ -21,7 +53,7 @@ def signup():
         return jsonify({'error': 'Username already exists.'}), 400
     if User.query.filter_by(email=data['email']).first():
         return jsonify({'error': 'Email already exists.'}), 400
-    hashed_pw = generate_password_hash(data['password'])
+    hashed_pw = hash_password(data['password'])
     user = User(
         username=data['username'],
         firstName=data['firstName'],
@@ -32,9 +64,8 @@ def signup():
     )
     db.session.add(user)
     db.session.commit()
-    token = create_access_token(identity=str(user.id))
     return jsonify({
-        'token': token,
+        **issue_tokens(user.id),
         'user': {
             'id': user.id,
             'username': user.username,
@@ -47,18 +78,33 @@ def signup():
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
+    retry_after = limit('ip', request.remote_addr)
+    if retry_after:
+        return too_many_attempts(retry_after)
     data = request.get_json()
     login = data.get('login')
     password = data.get('password')
+    account = str(login or '').lower()
+    retry_after = limit('account', account, consume=False)
+    if retry_after:
+        return too_many_attempts(retry_after)
+    # username and email are both unique, so each side of the OR is an index lookup
     user = User.query.filter(
         (User.username == login) | (User.email == login)
     ).first()
-    if not user or not check_password_hash(user.password, password):
+    matches, needs_rehash = verify_password(user.password if user else None, password)
+    if not matches:
+        limit('account', account)
         return jsonify({'error': 'Invalid credentials'}), 401
+    if needs_rehash:
+        # Hashed with older parameters; upgrade while the plaintext is at hand
+        user.password = hash_password(password)
+        db.session.commit()
 
-    token = create_access_token(identity=str(user.id))
+    # The refresh token lets clients renew the access token without sending
+    # the password (and paying for its hash) again
     return jsonify({
-        'token': token,
+        **issue_tokens(user.id),
         'user': {
             'id': user.id,
             'username': user.username,
@@ -69,18 +115,32 @@ def login():
         }
     })
 
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    # Rotation: each refresh token is exchanged exactly once
+    if not revoke(get_jwt()):
+        return jsonify({'error': 'Refresh token has already been used.'}), 401
+    return jsonify(issue_tokens(get_jwt_identity()))
+
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required()
+def logout():
+    revoke(get_jwt())
+    refresh_token = (request.get_json(silent=True) or {}).get('refresh_token')
+    if refresh_token:
+        try:
+            payload = decode_token(refresh_token)
+        except (JWTExtendedException, PyJWTError):
+            payload = None  # expired or invalid, nothing left to revoke
+        if payload and payload.get('type') == 'refresh' and payload['sub'] == get_jwt_identity():
+            revoke(payload)
+    return jsonify({'message': 'Logged out'})
+
 @auth_bp.route('/me', methods=['GET'])
 @jwt_required()
 def me():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user:
+    profile = user_profile(get_jwt_identity())
+    if not profile:
         return jsonify({'error': 'User not found'}), 404
-    return jsonify({
-        'id': user.id,
-        'username': user.username,
-        'firstName': user.firstName,
-        'lastName': user.lastName,
-        'email': user.email,
-        'contact': user.contact
-    })
\ No newline at end of file
+    return jsonify(profile)
\ No newline at end of file
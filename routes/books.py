@@ -1,7 +1,11 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, AccountingBook, Account, JournalEntry
+from models import db, AccountingBook, Account, JournalEntry, PeriodClose
 from sqlalchemy.exc import OperationalError
+from closing import close_period, reopen_latest
+from cache import bump_book_version
+from authz import invalidate_owned_books
+from datetime import datetime
 
 books_bp = Blueprint('books', __name__)
 
@@ -26,6 +30,7 @@ def create_book():
     book = AccountingBook(user_id=user_id, name=name)
     db.session.add(book)
     db.session.commit()
+    invalidate_owned_books(user_id)
     return jsonify({"id": book.id, "name": book.name, "created_at": book.created_at.isoformat() if book.created_at else None}), 201
 
 @books_bp.route('/<int:book_id>', methods=['PUT'])
@@ -53,6 +58,67 @@ def delete_book(book_id):
     # Prevent delete if book has accounts or journal entries
     if Account.query.filter_by(book_id=book_id).first() or JournalEntry.query.filter_by(book_id=book_id).first():
         return jsonify({'error': 'Book is not empty'}), 400
+    for close in PeriodClose.query.filter_by(book_id=book_id).all():
+        db.session.delete(close)
     db.session.delete(book)
     db.session.commit()
-    return jsonify({'message': 'Book deleted'})
\ No newline at end of file
+    invalidate_owned_books(user_id)
+    return jsonify({'message': 'Book deleted'})
+
+# --- Period close ---
+
+def serialize_close(close):
+    return {
+        'id': close.id,
+        'period_end': close.period_end.isoformat(),
+        'created_at': close.created_at.isoformat() if close.created_at else None
+    }
+
+@books_bp.route('/<int:book_id>/closes', methods=['GET'])
+@jwt_required()
+def list_closes(book_id):
+    user_id = get_jwt_identity()
+    book = AccountingBook.query.filter_by(id=book_id, user_id=user_id).first()
+    if not book:
+        return jsonify({'error': 'Book not found'}), 404
+    closes = PeriodClose.query.filter_by(book_id=book_id).order_by(PeriodClose.period_end).all()
+    return jsonify({
+        'closed_through': book.closed_through.isoformat() if book.closed_through else None,
+        'closes': [serialize_close(c) for c in closes]
+    })
+
+@books_bp.route('/<int:book_id>/close', methods=['POST'])
+@jwt_required()
+def close_book_period(book_id):
+    user_id = get_jwt_identity()
+    book = AccountingBook.query.filter_by(id=book_id, user_id=user_id).with_for_update().first()
+    if not book:
+        return jsonify({'error': 'Book not found'}), 404
+    data = request.get_json() or {}
+    try:
+        period_end = datetime.strptime(data.get('period_end') or '', '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'error': 'period_end (YYYY-MM-DD) is required'}), 400
+    if book.closed_through and period_end <= book.closed_through:
+        return jsonify({'error': f'Book is already closed through {book.closed_through.isoformat()}'}), 400
+    close = close_period(user_id, book, period_end)
+    db.session.commit()
+    bump_book_version(book_id)
+    return jsonify(serialize_close(close)), 201
+
+@books_bp.route('/<int:book_id>/reopen', methods=['POST'])
+@jwt_required()
+def reopen_book_period(book_id):
+    user_id = get_jwt_identity()
+    book = AccountingBook.query.filter_by(id=book_id, user_id=user_id).with_for_update().first()
+    if not book:
+        return jsonify({'error': 'Book not found'}), 404
+    close = reopen_latest(book)
+    if not close:
+        return jsonify({'error': 'Book has no closed periods'}), 400
+    db.session.commit()
+    bump_book_version(book_id)
+    return jsonify({
+        'message': 'Period reopened',
+        'closed_through': book.closed_through.isoformat() if book.closed_through else None
+    })
@@ -1,16 +1,46 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from models import db, Contact
 from flask_jwt_extended import jwt_required, get_jwt_identity
-import re
+from contact_io import EMAIL_RE, PHONE_RE, iter_csv, iter_json, upsert_contacts, contact_rows, csv_chunks, jsonl_chunks
+from dedup import find_duplicates, merge_contacts
+from bulk_import import text_stream
+from pagination import encode_cursor, decode_cursor, escape_like, parse_limit
 
 contacts_bp = Blueprint('contacts', __name__)
+SORT_FIELDS = ('name', 'company', 'email', 'id')
+DEFAULT_PAGE_SIZE = 100
+
+def serialize_contact(c):
+    return {
+        'id': c.id,
+        'name': c.name,
+        'email': c.email,
+        'phone': c.phone,
+        'company': c.company,
+        'notes': c.notes
+    }
+
+def search_text():
+    """Lower-cased name/email/company/notes; matches the ix_contact_search_trgm expression."""
+    # Literal columns rather than bound parameters, so the SQL text is the indexed expression
+    text = None
+    for column in (Contact.name, Contact.email, Contact.company, Contact.notes):
+        part = db.func.coalesce(column, db.literal_column("''"))
+        text = part if text is None else text.op('||')(db.literal_column("' '")).op('||')(part)
+    return db.func.lower(text)
+
+def sort_key(sort):
+    # name is NOT NULL, so it is used bare and can walk ix_contact_user_id_name
+    if sort in ('id', 'name'):
+        return getattr(Contact, sort)
+    return db.func.coalesce(getattr(Contact, sort), db.literal_column("''"))
 
 def validate_contact(data):
     if not data.get('name'):
         return 'Name is required.'
-    if data.get('email') and not re.match(r'^[^\s@]+@[^\s@]+\.[^\s@]+$', data['email']):
+    if data.get('email') and not EMAIL_RE.match(data['email']):
         return 'Invalid email format.'
-    if data.get('phone') and not re.match(r'^\d{10,15}$', data['phone']):
+    if data.get('phone') and not PHONE_RE.match(data['phone']):
         return 'Invalid phone number.'
     return None
 
@@ -18,15 +48,58 @@ def validate_contact(data):
 @jwt_required()
 def get_contacts():
     user_id = get_jwt_identity()
-    contacts = Contact.query.filter_by(user_id=user_id).all()
-    return jsonify([{
-        'id': c.id,
-        'name': c.name,
-        'email': c.email,
-        'phone': c.phone,
-        'company': c.company,
-        'notes': c.notes
-    } for c in contacts])
+    sort = request.args.get('sort', 'name')
+    if sort not in SORT_FIELDS:
+        return jsonify({'error': f"sort must be one of: {', '.join(SORT_FIELDS)}."}), 400
+    descending = request.args.get('order', 'asc') == 'desc'
+    order = 'desc' if descending else 'asc'
+    query = Contact.query.filter_by(user_id=user_id)
+
+    # Every whitespace-separated term must appear somewhere in the contact
+    q = request.args.get('q', '').strip()
+    for term in q.lower().split():
+        query = query.filter(search_text().like(f"%{escape_like(term)}%", escape='\\'))
+
+    # Keyset pagination over (sort key, id); NULLs sort as empty strings
+    key = sort_key(sort)
+    limit = parse_limit()
+    after = request.args.get('after')
+    if after:
+        cursor = decode_cursor(after)
+        try:
+            cursor_sort, cursor_order, after_key, after_id = cursor[0], cursor[1], cursor[2], int(cursor[3])
+        except (TypeError, ValueError, IndexError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        # A cursor only continues the listing it came from; comparing a name
+        # with an id cursor value would otherwise fail in the database
+        if (cursor_sort, cursor_order) != (sort, order):
+            return jsonify({'error': 'Cursor does not match sort and order.'}), 400
+        if not isinstance(after_key, int if sort == 'id' else str) or isinstance(after_key, bool):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        if descending:
+            query = query.filter(db.or_(key < after_key, db.and_(key == after_key, Contact.id < after_id)))
+        else:
+            query = query.filter(db.or_(key > after_key, db.and_(key == after_key, Contact.id > after_id)))
+        limit = limit or DEFAULT_PAGE_SIZE
+    if descending:
+        query = query.order_by(key.desc(), Contact.id.desc())
+    else:
+        query = query.order_by(key, Contact.id)
+
+    if limit is None:
+        return jsonify([serialize_contact(c) for c in query.all()])
+
+    contacts = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(contacts) > limit:
+        contacts = contacts[:limit]
+        last = contacts[-1]
+        last_key = last.id if sort == 'id' else (getattr(last, sort) or '')
+        next_cursor = encode_cursor(sort, order, last_key, last.id)
+    return jsonify({
+        'contacts': [serialize_contact(c) for c in contacts],
+        'next_cursor': next_cursor
+    })
 
 @contacts_bp.route("", methods=["POST"])  # <-- NO trailing slash
 @jwt_required()
@@ -47,14 +120,80 @@ def add_contact():
     db.session.add(contact)
     db.session.commit()
     # Return the full contact object
+    return jsonify(serialize_contact(contact)), 201
+
+@contacts_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_contacts():
+    user_id = get_jwt_identity()
+    fmt = request.args.get('format') or ('csv' if request.mimetype == 'text/csv' else 'json')
+    if fmt not in ('csv', 'json'):
+        return jsonify({'error': 'format must be csv or json'}), 400
+    if fmt == 'csv':
+        # Parsed straight off the request stream and upserted chunk by chunk
+        parsed = iter_csv(text_stream(request.stream))
+    else:
+        payload = request.get_json(silent=True)
+        parsed = iter_json(payload.get('contacts') if isinstance(payload, dict) else payload)
+    report = upsert_contacts(user_id, parsed)
+    return jsonify(report.as_dict())
+
+@contacts_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_contacts():
+    user_id = get_jwt_identity()
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ('csv', 'jsonl'):
+        return jsonify({'error': 'format must be csv or jsonl'}), 400
+    rows = contact_rows(user_id)
+    chunks = csv_chunks(rows) if fmt == 'csv' else jsonl_chunks(rows)
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=contacts.{fmt}'}
+    )
+
+@contacts_bp.route('/duplicates', methods=['GET'])
+@jwt_required()
+def get_duplicates():
+    user_id = get_jwt_identity()
+    groups = find_duplicates(user_id)
+    shown = groups[:parse_limit() or DEFAULT_PAGE_SIZE]
+    ids = [i for g in shown for i in g['ids']]
+    contacts = {c.id: c for c in Contact.query.filter(Contact.id.in_(ids))} if ids else {}
     return jsonify({
-        'id': contact.id,
-        'name': contact.name,
-        'email': contact.email,
-        'phone': contact.phone,
-        'company': contact.company,
-        'notes': contact.notes
-    }), 201
+        'total': len(groups),
+        'groups': [{
+            'reasons': g['reasons'],
+            'contacts': [serialize_contact(contacts[i]) for i in g['ids'] if i in contacts]
+        } for g in shown]
+    })
+
+@contacts_bp.route('/merge', methods=['POST'])
+@jwt_required()
+def merge_duplicates():
+    user_id = get_jwt_identity()
+    data = request.get_json() or {}
+    try:
+        primary_id = int(data.get('primary_id'))
+        duplicate_ids = [int(i) for i in data.get('duplicate_ids') or []]
+    except (TypeError, ValueError):
+        return jsonify({'error': 'primary_id and duplicate_ids must be contact IDs.'}), 400
+    duplicate_ids = [i for i in dict.fromkeys(duplicate_ids) if i != primary_id]
+    if not duplicate_ids:
+        return jsonify({'error': 'duplicate_ids is required.'}), 400
+    found = {
+        c.id: c for c in Contact.query.filter(
+            Contact.user_id == user_id, Contact.id.in_([primary_id] + duplicate_ids)
+        ).with_for_update()
+    }
+    missing = [i for i in [primary_id] + duplicate_ids if i not in found]
+    if missing:
+        return jsonify({'error': f'Contact not found: {missing[0]}'}), 404
+    primary = merge_contacts(found[primary_id], [found[i] for i in duplicate_ids])
+    db.session.commit()
+    return jsonify({'merged': len(duplicate_ids), 'contact': serialize_contact(primary)})
 
 @contacts_bp.route('/<int:contact_id>', methods=['PUT'])
 @jwt_required()
@@ -1,13 +1,37 @@
-from flask import Blueprint, request, jsonify, send_from_directory
+from flask import Blueprint, Response, current_app, g, request, jsonify, send_from_directory, stream_with_context, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, Account, JournalEntry, JournalLine, AccountingBook
-from datetime import datetime
-import os
+from authz import book_required, load_book
+from models import db, Account, Attachment, JournalEntry, JournalLine, AccountingBook
+from cache import bump_book_version, cached_report
+from balances import apply_lines, entry_lines, balance_totals, to_amount
+from closing import add_totals, cumulative_totals, is_locked, latest_close, snapshot_totals
+from reports import (
+    COMPARE_STEPS, MAX_COMPARE_PERIODS, account_totals, book_accounts, comparison_windows,
+    is_month_aligned, period_totals, rollup_report, trial_balance_report,
+    income_statement_report, balance_sheet_report
+)
+from journal_export import ledger_rows, csv_chunks, jsonl_chunks
+from bulk_import import text_stream
+from journal_import import iter_csv, iter_jsonl, import_entries
+from pagination import encode_cursor, decode_cursor, escape_like, parse_limit
+from previews import enqueue_processing
+from storage import DEFAULT_MAX_UPLOAD_BYTES, UnsupportedFileType, UploadTooLarge, get_storage, object_key, receive
+from sqlalchemy.orm import selectinload
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import math
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
 
 journal_bp = Blueprint("journal", __name__)
-UPLOAD_FOLDER = "uploads"
+UPLOAD_FOLDER = "uploads"  # flat directory of files uploaded before attachments moved to storage.py
 ALLOWED_EXTENSIONS = {"pdf", "jpg", "jpeg", "png"}
+MAX_FILES_PER_UPLOAD = 10
+MAX_ATTACHMENTS_PER_ENTRY = 50
+DEFAULT_PAGE_SIZE = 100
+CLOSED_PERIOD_ERROR = "Entry falls in a closed period."
+INVALID_LINE = object()  # find_foreign_account: a line that is not {"account_id": <number>, ...}
+MAX_LINE_AMOUNT = 10 ** 10  # journal_line.debit/credit are NUMERIC(12, 2)
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -18,82 +42,230 @@ def parse_date(date_str):
     except Exception:
         return None
 
+def find_foreign_account(user_id, book_id, lines):
+    """Return the first account id in lines that is not in the book, checked with one IN query.
+
+    Returns INVALID_LINE for a line that is not an object with a numeric account_id.
+    """
+    account_ids = set()
+    for line in lines:
+        if not isinstance(line, dict):
+            return INVALID_LINE
+        try:
+            account_ids.add(int(line["account_id"]))
+        except (KeyError, TypeError, ValueError):
+            return INVALID_LINE
+    found = {
+        row[0] for row in db.session.query(Account.id).filter(
+            Account.id.in_(account_ids),
+            Account.user_id == user_id,
+            Account.book_id == book_id
+        )
+    } if account_ids else set()
+    for line in lines:
+        if int(line["account_id"]) not in found:
+            return line["account_id"]
+    return None
+
+def check_lines(user_id, book_id, lines):
+    """Error message for lines that are malformed or reference another book's accounts; None if valid."""
+    if not isinstance(lines, list):
+        return "lines must be a list."
+    bad_account = find_foreign_account(user_id, book_id, lines)
+    if bad_account is INVALID_LINE:
+        return "Each line must be an object with a numeric account_id."
+    if bad_account is not None:
+        return f"Account ID {bad_account} does not exist in this book."
+    for line in lines:
+        for field in ("debit", "credit"):
+            try:
+                amount = float(line.get(field, 0))
+            except (TypeError, ValueError):
+                return "Line debit and credit must be numbers."
+            # float() accepts "Infinity" and "NaN"
+            if not math.isfinite(amount) or abs(amount) >= MAX_LINE_AMOUNT:
+                return "Line debit and credit must be finite amounts below 10,000,000,000."
+    return None
+
+def lines_balance(lines):
+    """Whether checked lines balance to the cent, summed as Decimal."""
+    total_debit = sum((to_amount(float(l.get("debit", 0))) for l in lines), Decimal(0))
+    total_credit = sum((to_amount(float(l.get("credit", 0))) for l in lines), Decimal(0))
+    return total_debit == total_credit
+
+def line_rows(entry_id, lines):
+    return [{
+        "entry_id": entry_id,
+        "account_id": int(line["account_id"]),
+        "debit": float(line.get("debit", 0)),
+        "credit": float(line.get("credit", 0))
+    } for line in lines]
+
+def insert_lines(entry_id, lines):
+    # One executemany INSERT instead of a unit-of-work object per line
+    rows = line_rows(entry_id, lines)
+    if rows:
+        db.session.execute(JournalLine.__table__.insert(), rows)
+
+def line_amounts(lines):
+    return [(int(l["account_id"]), l.get("debit", 0), l.get("credit", 0)) for l in lines]
+
+def read_date_args(*names):
+    """Parse optional YYYY-MM-DD query args; returns (dates, error message)."""
+    dates = {}
+    for name in names:
+        value = request.args.get(name)
+        if not value:
+            dates[name] = None
+            continue
+        parsed = parse_date(value)
+        if not parsed:
+            return None, f"Invalid '{name}' date, expected YYYY-MM-DD."
+        dates[name] = parsed.date()
+    return dates, None
+
+def status_args():
+    status = request.args.get("status")
+    if not status:
+        return None
+    return [s.strip() for s in status.split(",") if s.strip()] or None
+
+def serialize_attachment(attachment):
+    return {
+        "id": attachment.id,
+        "filename": attachment.filename,
+        "content_type": attachment.content_type,
+        "size": attachment.size,
+        "url": url_for("journal.download_attachment", attachment_id=attachment.id),
+        # Set once the background worker has made a thumbnail (see previews.py)
+        "preview_url": url_for("journal.attachment_preview", attachment_id=attachment.id)
+        if attachment.thumbnail_key else None
+    }
+
+def serialize_entry(entry):
+    return {
+        "id": entry.id,
+        "date": entry.date.strftime("%Y-%m-%d"),
+        "description": entry.description,
+        "status": entry.status,
+        "attachment": entry.attachment,
+        "attachments": [serialize_attachment(a) for a in entry.attachments],
+        "lines": [
+            {
+                "account_id": l.account_id,
+                "debit": l.debit,
+                "credit": l.credit
+            } for l in entry.lines
+        ]
+    }
+
 # --- Filter by user_id and book_id everywhere ---
 
 @journal_bp.route("/", methods=["GET"])
 @jwt_required()
+@book_required
 def get_journal_entries():
     user_id = get_jwt_identity()
-    book_id = request.args.get("book_id", type=int)
-    if not book_id:
-        return jsonify({"error": "book_id is required"}), 400
-    # Check if book exists for this user
-    book = AccountingBook.query.filter_by(id=book_id, user_id=user_id).first()
-    if not book:
-        return jsonify({"error": "Book not found"}), 404
-    entries = (
-        JournalEntry.query.filter_by(user_id=user_id, book_id=book_id)
-        .order_by(JournalEntry.date.desc())
-        .all()
+    book_id = g.book_id
+
+    dates, error = read_date_args("from", "to")
+    if error:
+        return jsonify({"error": error}), 400
+    # Lines and attachments for the whole page are fetched in one extra IN query each
+    query = (
+        JournalEntry.query.options(selectinload(JournalEntry.lines), selectinload(JournalEntry.attachments))
+        .filter_by(user_id=user_id, book_id=book_id)
     )
-    result = []
-    for entry in entries:
-        lines = JournalLine.query.filter_by(entry_id=entry.id).all()
-        result.append({
-            "id": entry.id,
-            "date": entry.date.strftime("%Y-%m-%d"),
-            "description": entry.description,
-            "status": entry.status,
-            "attachment": entry.attachment,
-            "lines": [
-                {
-                    "account_id": l.account_id,
-                    "debit": l.debit,
-                    "credit": l.credit
-                } for l in lines
-            ]
-        })
-    return jsonify(result)
+    if dates["from"]:
+        query = query.filter(JournalEntry.date >= dates["from"])
+    if dates["to"]:
+        query = query.filter(JournalEntry.date <= dates["to"])
+    statuses = status_args()
+    if statuses:
+        query = query.filter(db.func.lower(JournalEntry.status).in_([s.lower() for s in statuses]))
+    account_id = request.args.get("account_id", type=int)
+    if account_id:
+        query = query.filter(JournalEntry.lines.any(JournalLine.account_id == account_id))
+    term = (request.args.get("q") or "").strip().lower()
+    if term:
+        # Description, or text extracted from an attachment (trigram-indexed on Postgres)
+        pattern = f"%{escape_like(term)}%"
+        query = query.filter(db.or_(
+            db.func.lower(JournalEntry.description).like(pattern, escape="\\"),
+            JournalEntry.attachments.any(db.func.lower(Attachment.text).like(pattern, escape="\\"))
+        ))
+
+    # Keyset pagination over (date, id), newest first
+    limit = parse_limit()
+    after = request.args.get("after")
+    if after:
+        cursor = decode_cursor(after)
+        try:
+            after_date, after_id = datetime.strptime(cursor[0], "%Y-%m-%d").date(), int(cursor[1])
+        except (TypeError, ValueError, IndexError):
+            return jsonify({"error": "Invalid cursor"}), 400
+        query = query.filter(db.or_(
+            JournalEntry.date < after_date,
+            db.and_(JournalEntry.date == after_date, JournalEntry.id < after_id)
+        ))
+        limit = limit or DEFAULT_PAGE_SIZE
+    query = query.order_by(JournalEntry.date.desc(), JournalEntry.id.desc())
+
+    if limit is None:
+        return jsonify([serialize_entry(entry) for entry in query.all()])
+
+    entries = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        last = entries[-1]
+        next_cursor = encode_cursor(last.date.strftime("%Y-%m-%d"), last.id)
+    return jsonify({
+        "entries": [serialize_entry(entry) for entry in entries],
+        "next_cursor": next_cursor
+    })
 
 @journal_bp.route("", methods=["POST"])
 @jwt_required()
+@book_required
 def add_journal_entry():
     user_id = get_jwt_identity()
     data = request.get_json()
-    book_id = data.get("book_id")
-    if not book_id:
-        return jsonify({"error": "book_id is required"}), 400
+    book_id = g.book_id
+    # Ownership is already checked; the row is still read for its closed period
+    book = load_book(book_id)
+    if book is None:
+        return jsonify({"error": "Book not found"}), 404
 
-    # Prevent cross-book references
+    # Prevent malformed lines and cross-book references
     lines = data.get("lines", [])
-    for line in lines:
-        acc = Account.query.filter_by(id=line["account_id"], user_id=user_id, book_id=book_id).first()
-        if not acc:
-            return jsonify({"error": f"Account ID {line['account_id']} does not exist in this book."}), 400
+    error = check_lines(user_id, book_id, lines)
+    if error:
+        return jsonify({"error": error}), 400
 
     # Optional: Prevent unbalanced entries
-    total_debit = sum(float(l.get("debit", 0)) for l in lines)
-    total_credit = sum(float(l.get("credit", 0)) for l in lines)
-    if round(total_debit, 2) != round(total_credit, 2):
+    if not lines_balance(lines):
         return jsonify({"error": "Debits and credits must balance."}), 400
 
+    entry_date = parse_date(data.get("date"))
+    if not entry_date:
+        return jsonify({"error": "A valid date (YYYY-MM-DD) is required."}), 400
+    if is_locked(book, entry_date):
+        return jsonify({"error": CLOSED_PERIOD_ERROR}), 409
+
     entry = JournalEntry(
         user_id=user_id,
         book_id=book_id,
-        date=parse_date(data["date"]),
+        date=entry_date,
         description=data.get("description", ""),
         status="draft"
     )
     db.session.add(entry)
     db.session.flush()
-    for line in lines:
-        db.session.add(JournalLine(
-            entry_id=entry.id,
-            account_id=line["account_id"],
-            debit=float(line.get("debit", 0)),
-            credit=float(line.get("credit", 0))
-        ))
+    insert_lines(entry.id, lines)
+    apply_lines(book_id, entry.date, line_amounts(lines))
     db.session.commit()
+    bump_book_version(book_id)
     return jsonify({"id": entry.id, "message": "Journal entry created"}), 201
 
 @journal_bp.route("/<int:entry_id>", methods=["PUT"])
@@ -103,272 +275,306 @@ def edit_journal_entry(entry_id):
     entry = JournalEntry.query.filter_by(id=entry_id, user_id=user_id).first_or_404()
     data = request.get_json()
     book_id = entry.book_id
+    book = db.session.get(AccountingBook, book_id)
+    new_date = parse_date(data.get("date")) or entry.date
+    if is_locked(book, entry.date) or is_locked(book, new_date):
+        return jsonify({"error": CLOSED_PERIOD_ERROR}), 409
 
-    # Prevent cross-book references
+    # Prevent malformed lines and cross-book references
     lines = data.get("lines", [])
-    for line in lines:
-        acc = Account.query.filter_by(id=line["account_id"], user_id=user_id, book_id=book_id).first()
-        if not acc:
-            return jsonify({"error": f"Account ID {line['account_id']} does not exist in this book."}), 400
+    error = check_lines(user_id, book_id, lines)
+    if error:
+        return jsonify({"error": error}), 400
 
     # Optional: Prevent unbalanced entries
-    total_debit = sum(float(l.get("debit", 0)) for l in lines)
-    total_credit = sum(float(l.get("credit", 0)) for l in lines)
-    if round(total_debit, 2) != round(total_credit, 2):
+    if not lines_balance(lines):
         return jsonify({"error": "Debits and credits must balance."}), 400
 
-    entry.date = parse_date(data.get("date")) or entry.date
+    # Back the old lines out of the balances before replacing them
+    apply_lines(book_id, entry.date, entry_lines(entry.id), sign=-1)
+    entry.date = new_date
     entry.description = data.get("description", entry.description)
     JournalLine.query.filter_by(entry_id=entry.id).delete()
-    for line in lines:
-        db.session.add(JournalLine(
-            entry_id=entry.id,
-            account_id=line["account_id"],
-            debit=float(line.get("debit", 0)),
-            credit=float(line.get("credit", 0))
-        ))
+    apply_lines(book_id, entry.date, line_amounts(lines))
+    insert_lines(entry.id, lines)
     db.session.commit()
+    bump_book_version(book_id)
     return jsonify({"message": "Journal entry updated"})
 
+@journal_bp.route("/import", methods=["POST"])
+@jwt_required()
+@book_required
+def import_journal():
+    user_id = get_jwt_identity()
+    book_id = g.book_id
+    book = load_book(book_id)
+    if book is None:
+        return jsonify({"error": "Book not found"}), 404
+    fmt = request.args.get("format") or ("csv" if request.mimetype == "text/csv" else "jsonl")
+    if fmt not in ("csv", "jsonl"):
+        return jsonify({"error": "format must be csv or jsonl"}), 400
+    # Parse straight off the request stream; entries are inserted chunk by chunk
+    stream = text_stream(request.stream)
+    parsed = iter_csv(stream) if fmt == "csv" else iter_jsonl(stream)
+    report = import_entries(user_id, book_id, parsed, locked_through=book.closed_through)
+    if report.imported:
+        bump_book_version(book_id)
+    return jsonify(report.as_dict())
+
+@journal_bp.route("/export", methods=["GET"])
+@jwt_required()
+@book_required
+def export_journal():
+    user_id = get_jwt_identity()
+    book_id = g.book_id
+    book = load_book(book_id)
+    if book is None:
+        return jsonify({"error": "Book not found"}), 404
+    fmt = request.args.get("format", "csv")
+    if fmt not in ("csv", "jsonl"):
+        return jsonify({"error": "format must be csv or jsonl"}), 400
+    dates, error = read_date_args("from", "to")
+    if error:
+        return jsonify({"error": error}), 400
+    rows = ledger_rows(user_id, book_id, dates["from"], dates["to"])
+    chunks = csv_chunks(rows) if fmt == "csv" else jsonl_chunks(rows)
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    filename = secure_filename(f"{book.name}_journal.{fmt}") or f"journal.{fmt}"
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
 # --- Attachments: Upload and Download ---
 
 @journal_bp.route("/upload/<int:entry_id>", methods=["POST"])
 @jwt_required()
 def upload_attachment(entry_id):
+    """Attach one or more files (repeat the "file" form field) to an entry."""
     user_id = get_jwt_identity()
     entry = JournalEntry.query.filter_by(id=entry_id, user_id=user_id).first()
     if not entry:
         return jsonify({"error": "Entry not found"}), 404
-    if "file" not in request.files:
+    max_bytes = current_app.config.get("MAX_UPLOAD_BYTES") or DEFAULT_MAX_UPLOAD_BYTES
+    too_large = jsonify({"error": f"Files may be at most {max_bytes} bytes."}), 413
+    # Oversized bodies are refused while the form is parsed, before being spooled
+    request.max_content_length = max_bytes * MAX_FILES_PER_UPLOAD + 64 * 1024
+    try:
+        files = request.files.getlist("file")
+    except RequestEntityTooLarge:
+        return too_large
+    if not files:
         return jsonify({"error": "No file part"}), 400
-    file = request.files["file"]
-    if file.filename == "":
+    if any(file.filename == "" for file in files):
         return jsonify({"error": "No selected file"}), 400
-    if file and allowed_file(file.filename):
-        filename = secure_filename(f"{entry_id}_{file.filename}")
-        os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-        filepath = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(filepath)
-        entry.attachment = filename
-        db.session.commit()
-        return jsonify({"message": "File uploaded", "attachment": filename})
-    return jsonify({"error": "Invalid file type"}), 400
+    if not all(allowed_file(file.filename) for file in files):
+        return jsonify({"error": "Invalid file type"}), 400
+    if len(files) > MAX_FILES_PER_UPLOAD:
+        return jsonify({"error": f"At most {MAX_FILES_PER_UPLOAD} files per upload."}), 400
+    existing = {a.sha256: a for a in entry.attachments}
+    if len(existing) + len(files) > MAX_ATTACHMENTS_PER_ENTRY:
+        return jsonify({"error": f"An entry can have at most {MAX_ATTACHMENTS_PER_ENTRY} attachments."}), 400
+
+    storage = get_storage()
+    attachments = []
+    for file in files:
+        try:
+            received = receive(file.stream, max_bytes, storage.tmp_dir)
+        except UploadTooLarge:
+            return too_large
+        except UnsupportedFileType:
+            return jsonify({"error": "Invalid file type"}), 400
+        # Stored once per content; blobs left behind by a failed request are collected by `attachments gc`
+        storage.put(received, object_key(received.sha256))
+        attachment = existing.get(received.sha256)
+        if attachment is None:
+            attachment = Attachment(
+                entry_id=entry.id,
+                user_id=entry.user_id,
+                sha256=received.sha256,
+                size=received.size,
+                filename=secure_filename(file.filename) or "attachment",
+                content_type=received.content_type
+            )
+            db.session.add(attachment)
+            enqueue_processing(attachment)
+            existing[received.sha256] = attachment
+        attachments.append(attachment)
+    db.session.commit()
+    return jsonify({"message": "File uploaded", "attachments": [serialize_attachment(a) for a in attachments]})
+
+@journal_bp.route("/attachments/<int:attachment_id>", methods=["GET"])
+@jwt_required()
+def download_attachment(attachment_id):
+    """Serve an attachment; Range, ETag and If-None-Match are answered by the storage backend."""
+    attachment = Attachment.query.filter_by(id=attachment_id, user_id=get_jwt_identity()).first()
+    if not attachment:
+        return jsonify({"error": "Attachment not found"}), 404
+    return get_storage().send(
+        object_key(attachment.sha256), attachment.sha256, attachment.filename, attachment.content_type
+    )
+
+@journal_bp.route("/attachments/<int:attachment_id>/preview", methods=["GET"])
+@jwt_required()
+def attachment_preview(attachment_id):
+    attachment = Attachment.query.filter_by(id=attachment_id, user_id=get_jwt_identity()).first()
+    if not attachment or not attachment.thumbnail_key:
+        return jsonify({"error": "Preview not found"}), 404
+    return get_storage().send(
+        attachment.thumbnail_key, f"{attachment.sha256}-thumb", "preview.jpg", "image/jpeg"
+    )
+
+@journal_bp.route("/attachments/<int:attachment_id>", methods=["DELETE"])
+@jwt_required()
+def delete_attachment(attachment_id):
+    attachment = Attachment.query.filter_by(id=attachment_id, user_id=get_jwt_identity()).first()
+    if not attachment:
+        return jsonify({"error": "Attachment not found"}), 404
+    # The blob may be shared with other attachments; `attachments gc` removes it once unused
+    db.session.delete(attachment)
+    db.session.commit()
+    return jsonify({"message": "Attachment deleted"})
 
 @journal_bp.route("/attachment/<filename>", methods=["GET"])
 @jwt_required()
 def get_attachment(filename):
-    # Optionally: check user permissions here
-    return send_from_directory(UPLOAD_FOLDER, filename)
+    """Files uploaded before attachments moved to storage.py."""
+    entry = JournalEntry.query.filter_by(user_id=get_jwt_identity(), attachment=filename).first()
+    if not entry:
+        return jsonify({"error": "Attachment not found"}), 404
+    return send_from_directory(UPLOAD_FOLDER, filename, conditional=True)
 
 # --- Reports: Always filter by user_id and book_id ---
 
+def run_report(build, cumulative=False):
+    """Shared driver for the report endpoints.
+
+    Supports from/to (or as_of) windows, a status filter and comparative
+    periods (compare=mom|yoy, periods=N) computed in a single aggregate query.
+    Cumulative reports (the balance sheet) ignore from and always start at the
+    beginning of the book. tree=1 nests accounts under their parents with
+    rolled-up subtotals.
+    """
+    user_id = get_jwt_identity()
+    book_id = g.book_id
+    dates, error = read_date_args("from", "to", "as_of")
+    if error:
+        return jsonify({"error": error}), 400
+    end = dates["as_of"] or dates["to"]
+    start = None if cumulative or dates["as_of"] else dates["from"]
+    if start and end and start > end:
+        return jsonify({"error": "'from' must not be after 'to'."}), 400
+    statuses = status_args()
+    accounts = book_accounts(user_id, book_id)
+    tree = request.args.get("tree", "").lower() in ("1", "true", "yes")
+    # Roll subtotals up Account.parent_id from the one flat account query
+    parent_of = {acc.id: acc.parent_id for acc in accounts} if tree else None
+
+    def report_for(totals):
+        report = build(accounts, totals)
+        return rollup_report(report, parent_of) if tree else report
+
+    compare = request.args.get("compare")
+    if compare:
+        if compare not in COMPARE_STEPS:
+            return jsonify({"error": "compare must be one of: " + ", ".join(COMPARE_STEPS)}), 400
+        count = max(2, min(request.args.get("periods", 2, type=int), MAX_COMPARE_PERIODS))
+        windows = comparison_windows(start, end or date.today(), compare, count)
+        close = None
+        if start is None and not statuses:
+            close = latest_close(book_id, min(window_end for _, window_end in windows))
+        if close:
+            # Cumulative windows only need the lines after the closing snapshot
+            after = close.period_end + timedelta(days=1)
+            snapshot = snapshot_totals(close)
+            totals = [
+                add_totals(snapshot, t) for t in
+                period_totals(user_id, book_id, [(after, e) for _, e in windows], statuses)
+            ]
+        else:
+            totals = period_totals(user_id, book_id, windows, statuses)
+        periods = []
+        for (window_start, window_end), window_totals in zip(windows, totals):
+            report = report_for(window_totals)
+            report["from"] = window_start.isoformat() if window_start else None
+            report["to"] = window_end.isoformat()
+            periods.append(report)
+        return jsonify({"periods": periods})
+
+    # Cumulative reports start from the latest closing snapshot; whole-month
+    # windows over all statuses come straight from AccountBalance
+    if not statuses and start is None:
+        totals = cumulative_totals(user_id, book_id, end)
+    elif not statuses and is_month_aligned(start, end):
+        totals = balance_totals(book_id, start, end)
+    else:
+        totals = account_totals(user_id, book_id, start, end, statuses)
+    return jsonify(report_for(totals))
+
 @journal_bp.route("/trial-balance", methods=["GET"])
 @jwt_required()
+@book_required
+@cached_report("trial-balance")
 def trial_balance():
-    user_id = get_jwt_identity()
-    book_id = request.args.get("book_id", type=int)
-    if not book_id:
-        return jsonify({"error": "book_id is required"}), 400
-    # Check if book exists for this user
-    book = AccountingBook.query.filter_by(id=book_id, user_id=user_id).first()
-    if not book:
-        return jsonify({"error": "Book not found"}), 404
-    accounts = Account.query.filter_by(user_id=user_id, book_id=book_id).all()
-    result = []
-    total_debit = 0.0
-    total_credit = 0.0
-    for acc in accounts:
-        debit = db.session.query(db.func.sum(JournalLine.debit)).join(JournalEntry).filter(
-            JournalLine.account_id == acc.id,
-            JournalEntry.user_id == user_id,
-            JournalEntry.book_id == book_id
-        ).scalar() or 0.0
-        credit = db.session.query(db.func.sum(JournalLine.credit)).join(JournalEntry).filter(
-            JournalLine.account_id == acc.id,
-            JournalEntry.user_id == user_id,
-            JournalEntry.book_id == book_id
-        ).scalar() or 0.0
-        balance = debit - credit
-        result.append({
-            "account_id": acc.id,
-            "account_code": acc.code,
-            "account_name": acc.name,
-            "debit": float(debit),
-            "credit": float(credit),
-            "balance": float(balance)
-        })
-        total_debit += float(debit)
-        total_credit += float(credit)
-    return jsonify({
-        "accounts": result,
-        "total_debit": float(total_debit),
-        "total_credit": float(total_credit)
-    })
+    return run_report(trial_balance_report)
 
 @journal_bp.route("/income-statement", methods=["GET"])
 @jwt_required()
+@book_required
+@cached_report("income-statement")
 def income_statement():
-    user_id = get_jwt_identity()
-    book_id = request.args.get("book_id", type=int)
-    if not book_id:
-        return jsonify({"error": "book_id is required"}), 400
-    # Income accounts
-    income_accounts = Account.query.filter_by(user_id=user_id, book_id=book_id, type="Income").all()
-    income = []
-    total_income = 0.0
-    for acc in income_accounts:
-        amount = db.session.query(db.func.sum(JournalLine.credit)).join(JournalEntry).filter(
-            JournalLine.account_id == acc.id,
-            JournalEntry.user_id == user_id,
-            JournalEntry.book_id == book_id
-        ).scalar() or 0.0
-        income.append({
-            "account_id": acc.id,
-            "account_code": acc.code,
-            "account_name": acc.name,
-            "amount": float(amount)
-        })
-        total_income += float(amount)
-    # Expense accounts
-    expense_accounts = Account.query.filter_by(user_id=user_id, book_id=book_id, type="Expense").all()
-    expense = []
-    total_expense = 0.0
-    for acc in expense_accounts:
-        amount = db.session.query(db.func.sum(JournalLine.debit)).join(JournalEntry).filter(
-            JournalLine.account_id == acc.id,
-            JournalEntry.user_id == user_id,
-            JournalEntry.book_id == book_id
-        ).scalar() or 0.0
-        expense.append({
-            "account_id": acc.id,
-            "account_code": acc.code,
-            "account_name": acc.name,
-            "amount": float(amount)
-        })
-        total_expense += float(amount)
-    net_income = total_income - total_expense
-    return jsonify({
-        "income": income,
-        "expense": expense,
-        "total_income": float(total_income),
-        "total_expense": float(total_expense),
-        "net_income": float(net_income)
-    })
+    return run_report(income_statement_report)
 
 @journal_bp.route("/balance-sheet", methods=["GET"])
 @jwt_required()
+@book_required
+@cached_report("balance-sheet")
 def balance_sheet():
-    user_id = get_jwt_identity()
-    book_id = request.args.get("book_id", type=int)
-    if not book_id:
-        return jsonify({"error": "book_id is required"}), 400
-    # Assets
-    asset_accounts = Account.query.filter_by(user_id=user_id, book_id=book_id, type="Asset").all()
-    assets = []
-    total_assets = 0.0
-    for acc in asset_accounts:
-        debit = db.session.query(db.func.sum(JournalLine.debit)).join(JournalEntry).filter(
-            JournalLine.account_id == acc.id,
-            JournalEntry.user_id == user_id,
-            JournalEntry.book_id == book_id
-        ).scalar() or 0.0
-        credit = db.session.query(db.func.sum(JournalLine.credit)).join(JournalEntry).filter(
-            JournalLine.account_id == acc.id,
-            JournalEntry.user_id == user_id,
-            JournalEntry.book_id == book_id
-        ).scalar() or 0.0
-        balance = debit - credit
-        assets.append({
-            "account_id": acc.id,
-            "account_code": acc.code,
-            "account_name": acc.name,
-            "balance": float(balance)
-        })
-        total_assets += float(balance)
-    # Liabilities
-    liability_accounts = Account.query.filter_by(user_id=user_id, book_id=book_id, type="Liability").all()
-    liabilities = []
-    total_liabilities = 0.0
-    for acc in liability_accounts:
-        debit = db.session.query(db.func.sum(JournalLine.debit)).join(JournalEntry).filter(
-            JournalLine.account_id == acc.id,
-            JournalEntry.user_id == user_id,
-            JournalEntry.book_id == book_id
-        ).scalar() or 0.0
-        credit = db.session.query(db.func.sum(JournalLine.credit)).join(JournalEntry).filter(
-            JournalLine.account_id == acc.id,
-            JournalEntry.user_id == user_id,
-            JournalEntry.book_id == book_id
-        ).scalar() or 0.0
-        balance = credit - debit
-        liabilities.append({
-            "account_id": acc.id,
-            "account_code": acc.code,
-            "account_name": acc.name,
-            "balance": float(balance)
-        })
-        total_liabilities += float(balance)
-    # Equity
-    equity_accounts = Account.query.filter_by(user_id=user_id, book_id=book_id, type="Equity").all()
-    equity = []
-    total_equity = 0.0
-    for acc in equity_accounts:
-        debit = db.session.query(db.func.sum(JournalLine.debit)).join(JournalEntry).filter(
-            JournalLine.account_id == acc.id,
-            JournalEntry.user_id == user_id,
-            JournalEntry.book_id == book_id
-        ).scalar() or 0.0
-        credit = db.session.query(db.func.sum(JournalLine.credit)).join(JournalEntry).filter(
-            JournalLine.account_id == acc.id,
-            JournalEntry.user_id == user_id,
-            JournalEntry.book_id == book_id
-        ).scalar() or 0.0
-        balance = credit - debit
-        equity.append({
-            "account_id": acc.id,
-            "account_code": acc.code,
-            "account_name": acc.name,
-            "balance": float(balance)
-        })
-        total_equity += float(balance)
-    return jsonify({
-        "assets": assets,
-        "liabilities": liabilities,
-        "equity": equity,
-        "total_assets": float(total_assets),
-        "total_liabilities": float(total_liabilities),
-        "total_equity": float(total_equity)
-    })
+    return run_report(balance_sheet_report, cumulative=True)
 
 @journal_bp.route("/<int:entry_id>", methods=["DELETE"])
 @jwt_required()
 def delete_journal_entry(entry_id):
     user_id = get_jwt_identity()
     entry = JournalEntry.query.filter_by(id=entry_id, user_id=user_id).first_or_404()
+    if is_locked(db.session.get(AccountingBook, entry.book_id), entry.date):
+        return jsonify({"error": CLOSED_PERIOD_ERROR}), 409
+    apply_lines(entry.book_id, entry.date, entry_lines(entry.id), sign=-1)
+    JournalLine.query.filter_by(entry_id=entry.id).delete()
+    Attachment.query.filter_by(entry_id=entry.id).delete()
+    book_id = entry.book_id
     db.session.delete(entry)
     db.session.commit()
+    bump_book_version(book_id)
     return jsonify({"message": "Journal entry deleted"})
 
 @journal_bp.route("/<int:entry_id>/submit", methods=["POST"])
 @jwt_required()
 def submit_entry(entry_id):
-    entry = JournalEntry.query.get(entry_id)
+    user_id = get_jwt_identity()
+    entry = JournalEntry.query.filter_by(id=entry_id, user_id=user_id).first_or_404()
     entry.status = "Submitted"
     db.session.commit()
+    bump_book_version(entry.book_id)
     return jsonify({"message": "Entry submitted"})
 
 @journal_bp.route("/<int:entry_id>/approve", methods=["POST"])
 @jwt_required()
 def approve_entry(entry_id):
-    entry = JournalEntry.query.get(entry_id)
+    user_id = get_jwt_identity()
+    entry = JournalEntry.query.filter_by(id=entry_id, user_id=user_id).first_or_404()
     entry.status = "Approved"
     db.session.commit()
+    bump_book_version(entry.book_id)
     return jsonify({"message": "Entry approved"})
 
 @journal_bp.route("/<int:entry_id>/reject", methods=["POST"])
 @jwt_required()
 def reject_entry(entry_id):
-    entry = JournalEntry.query.get(entry_id)
+    user_id = get_jwt_identity()
+    entry = JournalEntry.query.filter_by(id=entry_id, user_id=user_id).first_or_404()
     entry.status = "Rejected"
     db.session.commit()
+    bump_book_version(entry.book_id)
     return jsonify({"message": "Entry rejected"})
\ No newline at end of file
@@ -2,41 +2,158 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from db import db
 from models import Task
-from datetime import datetime
+from pagination import encode_cursor, decode_cursor, parse_limit
+from recurrence import MAX_OCCURRENCES, RecurrenceError, next_occurrence, occurrences, parse_rule
+from datetime import date, datetime
+from itertools import islice
 
 tasks_bp = Blueprint("tasks", __name__)
+DEFAULT_PAGE_SIZE = 100
+# sort name -> (column, cursor value parser); ties are broken by id
+SORT_FIELDS = {
+    "dueDate": (Task.dueDate, date.fromisoformat),
+    "createdAt": (Task.created_at, datetime.fromisoformat),
+    "id": (Task.id, int)
+}
+DUE_DATE_ERROR = "Invalid dueDate, expected YYYY-MM-DD."
+MAX_CALENDAR_DAYS = 400
+MAX_ROLL_FORWARD = 500
+MAX_RECURRENCE_LENGTH = 255  # Task.recurrence
 
 def validate_task(data):
     if not data.get("description"):
         return "Description is required."
+    return validate_recurrence(data)
+
+def validate_recurrence(data):
+    if data.get("recurrence"):
+        if not isinstance(data["recurrence"], str):
+            return "Invalid recurrence: must be a string."
+        try:
+            rule = parse_rule(data["recurrence"])
+        except RecurrenceError as e:
+            return f"Invalid recurrence: {e}"
+        # roll_forward stores str(rule) with a smaller COUNT, never longer than this
+        if max(len(data["recurrence"]), len(str(rule or ""))) > MAX_RECURRENCE_LENGTH:
+            return f"Invalid recurrence: must be at most {MAX_RECURRENCE_LENGTH} characters."
     return None
 
+def parse_due_date(value):
+    """Accept YYYY-MM-DD (or an ISO datetime, whose date part is kept); raises ValueError."""
+    if value in (None, ""):
+        return None
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+def serialize_task(t):
+    return {
+        "id": t.id,
+        "description": t.description,
+        "dueDate": t.dueDate.isoformat() if t.dueDate else None,  # <-- use dueDate
+        "category": t.category,
+        "recurrence": t.recurrence,
+        "notes": t.notes,
+        "priority": t.priority,
+        "completed": t.completed,
+        "createdAt": t.created_at.isoformat() if t.created_at else None
+    }
+
+def list_args(name):
+    return [v for v in request.args.get(name, "").split(",") if v]
+
+def keyset_filter(column, value, last_id, descending):
+    """Rows after (value, last_id) in an ordering that always puts NULLs last."""
+    if value is None:
+        return db.and_(column.is_(None), Task.id < last_id if descending else Task.id > last_id)
+    if descending:
+        return db.or_(column < value, db.and_(column == value, Task.id < last_id), column.is_(None))
+    return db.or_(column > value, db.and_(column == value, Task.id > last_id), column.is_(None))
+
+def filtered_tasks(user_id):
+    """Apply the GET filters; returns (query, error)."""
+    query = Task.query.filter_by(user_id=user_id)
+    completed = request.args.get("completed")
+    if completed is not None:
+        # Plain equality (not IS) so the (user_id, completed, dueDate) index applies
+        query = query.filter(Task.completed == (completed.lower() in ("1", "true", "yes")))
+    if request.args.get("overdue") in ("1", "true"):
+        query = query.filter(Task.completed == db.false(), Task.dueDate < date.today())
+    priorities = list_args("priority")
+    if priorities:
+        query = query.filter(Task.priority.in_(priorities))
+    categories = list_args("category")
+    if categories:
+        query = query.filter(Task.category.in_(categories))
+    try:
+        due_from = request.args.get("due_from")
+        if due_from:
+            query = query.filter(Task.dueDate >= date.fromisoformat(due_from))
+        due_to = request.args.get("due_to")
+        if due_to:
+            query = query.filter(Task.dueDate <= date.fromisoformat(due_to))
+    except ValueError:
+        return None, "Invalid due_from/due_to date, expected YYYY-MM-DD."
+    return query, None
+
 @tasks_bp.route("", methods=["GET", "POST"])
 @jwt_required()
 def tasks():
     user_id = get_jwt_identity()
     if request.method == "GET":
-        tasks = Task.query.filter_by(user_id=user_id).all()
-        return jsonify([{
-            "id": t.id,
-            "description": t.description,
-            "dueDate": t.dueDate,  # <-- use dueDate
-            "category": t.category,
-            "recurrence": t.recurrence,
-            "notes": t.notes,
-            "priority": t.priority,
-            "completed": t.completed,
-            "createdAt": t.created_at.isoformat() if t.created_at else None
-        } for t in tasks])
+        query, error = filtered_tasks(user_id)
+        if error:
+            return jsonify({"error": error}), 400
+        sort = request.args.get("sort", "dueDate")
+        if sort not in SORT_FIELDS:
+            return jsonify({"error": f"sort must be one of: {', '.join(SORT_FIELDS)}."}), 400
+        column, parse_value = SORT_FIELDS[sort]
+        descending = request.args.get("order", "asc") == "desc"
+
+        # Keyset pagination over (sort column, id); the (user_id, completed, dueDate)
+        # index serves the common "open tasks by due date" listing
+        limit = parse_limit()
+        after = request.args.get("after")
+        if after:
+            cursor = decode_cursor(after)
+            try:
+                value = None if cursor[0] is None else parse_value(cursor[0])
+                query = query.filter(keyset_filter(column, value, int(cursor[1]), descending))
+            except (TypeError, ValueError, IndexError):
+                return jsonify({"error": "Invalid cursor"}), 400
+            limit = limit or DEFAULT_PAGE_SIZE
+        if descending:
+            query = query.order_by(column.desc().nulls_last(), Task.id.desc())
+        else:
+            query = query.order_by(column.asc().nulls_last(), Task.id)
+
+        if limit is None:
+            return jsonify([serialize_task(t) for t in query.all()])
+
+        tasks = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            last = tasks[-1]
+            last_value = getattr(last, column.key)
+            next_cursor = encode_cursor(
+                last_value.isoformat() if isinstance(last_value, (date, datetime)) else last_value, last.id
+            )
+        return jsonify({
+            "tasks": [serialize_task(t) for t in tasks],
+            "next_cursor": next_cursor
+        })
     else:
         data = request.get_json()
         error = validate_task(data)
         if error:
             return jsonify({"error": error}), 400
+        try:
+            due_date = parse_due_date(data.get("dueDate"))
+        except ValueError:
+            return jsonify({"error": DUE_DATE_ERROR}), 400
         task = Task(
             user_id=user_id,
             description=data["description"],
-            dueDate=data.get("dueDate"),  # <-- use dueDate
+            dueDate=due_date,  # <-- use dueDate
             category=data.get("category"),
             recurrence=data.get("recurrence"),
             notes=data.get("notes"),
@@ -45,17 +162,99 @@ def tasks():
         )
         db.session.add(task)
         db.session.commit()
-        return jsonify({
-            "id": task.id,
-            "description": task.description,
-            "dueDate": task.dueDate,
-            "category": task.category,
-            "recurrence": task.recurrence,
-            "notes": task.notes,
-            "priority": task.priority,
-            "completed": task.completed,
-            "createdAt": task.created_at.isoformat() if task.created_at else None
-        }), 201
+        return jsonify(serialize_task(task)), 201
+
+@tasks_bp.route("/calendar", methods=["GET"])
+@jwt_required()
+def task_calendar():
+    """Every task occurrence in [from, to], with recurring tasks expanded server-side."""
+    user_id = get_jwt_identity()
+    try:
+        start = date.fromisoformat(request.args.get("from", ""))
+        end = date.fromisoformat(request.args.get("to", ""))
+    except ValueError:
+        return jsonify({"error": "'from' and 'to' are required, as YYYY-MM-DD."}), 400
+    if end < start or (end - start).days > MAX_CALENDAR_DAYS:
+        return jsonify({"error": f"'to' must be on or after 'from' and at most {MAX_CALENDAR_DAYS} days later."}), 400
+
+    # One-off tasks in the window, plus recurring series that started by its end
+    recurring = db.and_(Task.recurrence.isnot(None), Task.recurrence != "", Task.dueDate <= end)
+    query = Task.query.filter(
+        Task.user_id == user_id,
+        Task.dueDate.isnot(None),
+        db.or_(Task.dueDate.between(start, end), recurring)
+    )
+    if request.args.get("include_completed") not in ("1", "true"):
+        query = query.filter(Task.completed == db.false())
+
+    items = []
+    for task in query:
+        try:
+            rule = parse_rule(task.recurrence)
+        except RecurrenceError:
+            rule = None  # legacy free text is shown once, on its due date
+        for day in islice(occurrences(rule, task.dueDate, start, end), MAX_OCCURRENCES):
+            items.append({
+                "date": day.isoformat(),
+                "task_id": task.id,
+                "description": task.description,
+                "category": task.category,
+                "priority": task.priority,
+                "completed": task.completed,
+                "recurring": rule is not None,
+                "instance": day == task.dueDate
+            })
+    items.sort(key=lambda item: (item["date"], item["task_id"]))
+    return jsonify({"from": start.isoformat(), "to": end.isoformat(), "occurrences": items})
+
+@tasks_bp.route("/roll-forward", methods=["POST"])
+@jwt_required()
+def roll_forward():
+    """Complete tasks and create the next instance of each recurring one, in one transaction."""
+    user_id = get_jwt_identity()
+    data = request.get_json() or {}
+    try:
+        ids = list(dict.fromkeys(int(i) for i in data.get("ids") or []))
+    except (TypeError, ValueError):
+        return jsonify({"error": "ids must be a list of task IDs."}), 400
+    if not ids or len(ids) > MAX_ROLL_FORWARD:
+        return jsonify({"error": f"ids must contain between 1 and {MAX_ROLL_FORWARD} task IDs."}), 400
+
+    found = {t.id: t for t in Task.query.filter(Task.user_id == user_id, Task.id.in_(ids)).with_for_update()}
+    created, skipped = [], []
+    for task_id in ids:
+        task = found.get(task_id)
+        if task is None or task.completed:
+            skipped.append(task_id)
+            continue
+        task.completed = True
+        try:
+            rule = parse_rule(task.recurrence)
+        except RecurrenceError:
+            rule = None
+        following = next_occurrence(rule, task.dueDate or date.today())
+        if following is None:
+            continue
+        next_date, remaining = following
+        new_task = Task(
+            user_id=task.user_id,
+            description=task.description,
+            dueDate=next_date,
+            category=task.category,
+            # The rule text only changes when COUNT has to tick down
+            recurrence=task.recurrence if remaining.count is None else str(remaining),
+            notes=task.notes,
+            priority=task.priority,
+            completed=False
+        )
+        db.session.add(new_task)
+        created.append(new_task)
+    db.session.commit()
+    return jsonify({
+        "completed": len(ids) - len(skipped),
+        "skipped": skipped,
+        "created": [serialize_task(t) for t in created]
+    })
 
 @tasks_bp.route("/<int:id>", methods=["PUT", "DELETE"])
 @jwt_required()
@@ -66,22 +265,20 @@ def task_detail(id):
         return jsonify({"error": "Task not found"}), 404
     if request.method == "PUT":
         data = request.get_json()
+        error = validate_recurrence(data)
+        if error:
+            return jsonify({"error": error}), 400
+        if "dueDate" in data:
+            try:
+                data["dueDate"] = parse_due_date(data["dueDate"])
+            except ValueError:
+                return jsonify({"error": DUE_DATE_ERROR}), 400
         for field in ["description", "dueDate", "category", "recurrence", "notes", "priority", "completed"]:
             if field in data:
                 setattr(task, field, data[field])
         db.session.commit()
-        return jsonify({
-            "id": task.id,
-            "description": task.description,
-            "dueDate": task.dueDate,
-            "category": task.category,
-            "recurrence": task.recurrence,
-            "notes": task.notes,
-            "priority": task.priority,
-            "completed": task.completed,
-            "createdAt": task.created_at.isoformat() if task.created_at else None
-        })
+        return jsonify(serialize_task(task))
     else:
         db.session.delete(task)
         db.session.commit()
-        return jsonify({"message": "Task deleted"})
\ No newline at end of file
+        return jsonify({"message": "Task deleted"})
@@ -0,0 +1,290 @@
+# storage.py
+# Blob storage for journal attachments. Uploads are copied in chunks to a
+# temporary file while being hashed and measured, so a request never holds
+# the whole file in memory and oversized files are rejected part-way
+# through. Blobs are stored under their sha256 ("objects/ab/abcdef..."), so
+# the same receipt uploaded twice is kept once, and the hash doubles as a
+# strong ETag.
+#
+# STORAGE_BACKEND selects the backend:
+#   local  files under STORAGE_DIR, served with send_file (Range, ETag and
+#          If-None-Match/If-Modified-Since handled by werkzeug)
+#   s3     any S3-compatible service (S3_ENDPOINT_URL for MinIO and the
+#          like); downloads redirect to a short-lived presigned URL, and the
+#          service answers Range and conditional requests itself. Needs boto3.
+#
+# Thumbnails made by previews.py live under "thumbnails/", keyed the same
+# way. Blobs may be shared between attachments, so deleting an attachment
+# only removes its row; `flask attachments gc` removes blobs nothing refers to.
+import hashlib
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+import click
+from flask import current_app, redirect, send_file
+from flask.cli import AppGroup
+
+from db import db
+from models import Attachment
+
+attachments_cli = AppGroup("attachments", help="Maintain stored attachment files.")
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+# Leading bytes of the accepted formats; the client's filename and
+# Content-Type are not trusted
+SIGNATURES = (
+    (b"%PDF-", "application/pdf"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+)
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class UnsupportedFileType(Exception):
+    pass
+
+
+def object_key(sha256):
+    return f"objects/{sha256[:2]}/{sha256}"
+
+
+def thumbnail_key(sha256):
+    """Thumbnails are keyed by the sha256 of the original, so they are shared the same way."""
+    return f"thumbnails/{sha256[:2]}/{sha256}.jpg"
+
+
+def sniff_content_type(head):
+    for signature, content_type in SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    return None
+
+
+class ReceivedFile:
+    """An upload spooled to a temporary file, with its hash, size and sniffed type."""
+
+    def __init__(self, path, sha256, size, content_type):
+        self.path = path
+        self.sha256 = sha256
+        self.size = size
+        self.content_type = content_type
+
+    def discard(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def receive(stream, max_bytes, tmp_dir=None):
+    """Copy stream to a temporary file in chunks, hashing as it goes.
+
+    Raises UploadTooLarge past max_bytes and UnsupportedFileType when the
+    content is not a PDF, JPEG or PNG; the temporary file is removed then.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    content_type = None
+    fd, path = tempfile.mkstemp(prefix="upload-", dir=tmp_dir)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                if size == 0:
+                    content_type = sniff_content_type(chunk)
+                    if content_type is None:
+                        raise UnsupportedFileType()
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge()
+                digest.update(chunk)
+                out.write(chunk)
+        if size == 0:
+            raise UnsupportedFileType()
+    except BaseException:
+        os.remove(path)
+        raise
+    return ReceivedFile(path, digest.hexdigest(), size, content_type)
+
+
+class LocalStorage:
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, *key.split("/"))
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    def put(self, received, key):
+        """Move a ReceivedFile into place; a no-op if the blob is already stored."""
+        path = self._path(key)
+        if os.path.exists(path):
+            received.discard()
+            # Counts as new for `attachments gc` until the row is committed
+            os.utime(path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Same filesystem as tmp_dir, so this is an atomic rename
+        os.replace(received.path, path)
+
+    def open(self, key):
+        return open(self._path(key), "rb")
+
+    def delete(self, key):
+        path = self._path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def list(self, prefix="objects/"):
+        """Yield (key, last modified as an aware datetime) for every blob under prefix."""
+        base = self._path(prefix.rstrip("/"))
+        for directory, _, files in os.walk(base):
+            for name in files:
+                path = os.path.join(directory, name)
+                modified = datetime.fromtimestamp(os.path.getmtime(path), timezone.utc)
+                yield prefix + os.path.relpath(path, base).replace(os.sep, "/"), modified
+
+    def send(self, key, etag, filename, content_type):
+        return send_file(
+            self._path(key),
+            mimetype=content_type,
+            download_name=filename,
+            conditional=True,
+            etag=etag,
+            max_age=3600
+        )
+
+
+class S3Storage:
+    def __init__(self, bucket, endpoint_url=None, prefix="", url_expires=300, tmp_dir=None):
+        import boto3  # optional dependency, only needed when STORAGE_BACKEND=s3
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.url_expires = url_expires
+        self.tmp_dir = tmp_dir
+
+    def exists(self, key):
+        from botocore.exceptions import ClientError
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.prefix + key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def put(self, received, key):
+        try:
+            if self.exists(key):
+                # Copying the object onto itself refreshes LastModified, so it
+                # counts as new for `attachments gc` until the row is committed
+                self.client.copy_object(
+                    Bucket=self.bucket, Key=self.prefix + key,
+                    CopySource={"Bucket": self.bucket, "Key": self.prefix + key},
+                    MetadataDirective="REPLACE", ContentType=received.content_type
+                )
+            else:
+                self.client.upload_file(
+                    received.path, self.bucket, self.prefix + key,
+                    ExtraArgs={"ContentType": received.content_type}
+                )
+        finally:
+            received.discard()
+
+    def open(self, key):
+        return self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)["Body"]
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+
+    def list(self, prefix="objects/"):
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix + prefix):
+            for item in page.get("Contents", []):
+                yield item["Key"][len(self.prefix):], item["LastModified"]
+
+    def send(self, key, etag, filename, content_type):
+        url = self.client.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": self.prefix + key,
+                "ResponseContentType": content_type,
+                "ResponseContentDisposition": f'inline; filename="{filename}"'
+            },
+            ExpiresIn=self.url_expires
+        )
+        return redirect(url, code=302)
+
+
+def init_storage(app):
+    backend = app.config.get("STORAGE_BACKEND", "local")
+    root = app.config.get("STORAGE_DIR") or "uploads"
+    if backend == "s3":
+        tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        app.extensions["storage"] = S3Storage(
+            app.config["S3_BUCKET"],
+            endpoint_url=app.config.get("S3_ENDPOINT_URL"),
+            prefix=app.config.get("S3_PREFIX") or "",
+            url_expires=app.config.get("S3_URL_EXPIRES", 300),
+            tmp_dir=tmp_dir
+        )
+    elif backend == "local":
+        app.extensions["storage"] = LocalStorage(root)
+    else:
+        raise ValueError(f"Unknown STORAGE_BACKEND '{backend}'")
+
+
+def get_storage():
+    return current_app.extensions["storage"]
+
+
+def store_bytes(data, key, content_type):
+    """Store a small generated file (e.g. a thumbnail) under key."""
+    storage = get_storage()
+    fd, path = tempfile.mkstemp(prefix="generated-", dir=storage.tmp_dir)
+    with os.fdopen(fd, "wb") as out:
+        out.write(data)
+    storage.put(ReceivedFile(path, hashlib.sha256(data).hexdigest(), len(data), content_type), key)
+
+
+def unreferenced_blobs(referenced, grace=timedelta(hours=1)):
+    """Keys of stored blobs not in referenced and older than grace.
+
+    The grace period covers uploads whose blob is stored but whose row is
+    not committed yet.
+    """
+    cutoff = datetime.now(timezone.utc) - grace
+    storage = get_storage()
+    for prefix in ("objects/", "thumbnails/"):
+        for key, modified in storage.list(prefix):
+            sha256 = key.rsplit("/", 1)[-1].split(".", 1)[0]
+            if sha256 not in referenced and modified < cutoff:
+                yield key
+
+
+@attachments_cli.command("gc")
+@click.option("--dry-run", is_flag=True, help="Only list the blobs that would be deleted.")
+def gc_command(dry_run):
+    """Delete stored blobs that no attachment refers to."""
+    referenced = {row[0] for row in db.session.query(Attachment.sha256).distinct()}
+    storage = get_storage()
+    count = 0
+    for key in list(unreferenced_blobs(referenced)):
+        if dry_run:
+            click.echo(key)
+        else:
+            storage.delete(key)
+        count += 1
+    click.echo(f"{'Would delete' if dry_run else 'Deleted'} {count} unreferenced blobs.")
@@ -0,0 +1,96 @@
+# tests/conftest.py
+# The app modules are imported top-level (`import recurrence`), as they are
+# when run from the repository root. Request-level tests get a fresh app on
+# a throwaway SQLite database, with uploads and the log file in temporary
+# directories.
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Read when app.py is imported, so set before any test imports it
+os.environ.setdefault("LOG_FILE", os.path.join(tempfile.mkdtemp(prefix="crm-tests-"), "app.log"))
+
+PASSWORD = "abcdefg1"
+ACCOUNTS = [
+    ("1000", "Cash", "Asset"),
+    ("2000", "Loan", "Liability"),
+    ("3000", "Capital", "Equity"),
+    ("4000", "Sales", "Income"),
+    ("5000", "Rent", "Expense"),
+]
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setenv("SECRET_KEY", "test-secret-key-that-is-long-enough-for-hs256")
+    monkeypatch.setenv("STORAGE_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setenv("MIGRATE_ON_START", "0")
+    monkeypatch.setenv("PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000")
+    monkeypatch.setenv("LOGIN_IP_PER_MINUTE", "0")
+    monkeypatch.setenv("LOGIN_ACCOUNT_PER_MINUTE", "0")
+    # A single process, so the in-process report cache is used
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    from app import create_app
+    from db import db
+
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def signup(client, username="alice"):
+    return client.post("/api/auth/signup", json={
+        "username": username,
+        "firstName": "Test",
+        "lastName": "User",
+        "email": f"{username}@example.com",
+        "contact": "0700000000",
+        "password": PASSWORD
+    })
+
+
+@pytest.fixture
+def client(app):
+    """A test client signed in as a new user."""
+    client = app.test_client()
+    response = signup(client)
+    assert response.status_code == 201, response.get_json()
+    client.environ_base["HTTP_AUTHORIZATION"] = "Bearer " + response.get_json()["token"]
+    return client
+
+
+@pytest.fixture
+def book(client):
+    """(book_id, {account name: id}) for a new book with one account of each type."""
+    book_id = client.post("/api/books", json={"name": "Test book"}).get_json()["id"]
+    accounts = {}
+    for code, name, account_type in ACCOUNTS:
+        response = client.post("/api/accounts", json={
+            "book_id": book_id, "name": name, "type": account_type, "code": f"{code}-{book_id}",
+            "category": account_type
+        })
+        assert response.status_code == 201, response.get_json()
+        accounts[name] = response.get_json()["id"]
+    return book_id, accounts
+
+
+def post_entry(client, book_id, debit_account, credit_account, amount, day="2025-01-15", **fields):
+    return client.post("/api/journal", json=dict({
+        "book_id": book_id,
+        "date": day,
+        "description": "Test entry",
+        "lines": [
+            {"account_id": debit_account, "debit": amount, "credit": 0},
+            {"account_id": credit_account, "debit": 0, "credit": amount},
+        ]
+    }, **fields))
@@ -0,0 +1,41 @@
+from conftest import signup
+from db import db
+from models import AccountingBook
+
+
+def delete_elsewhere(app, book_id):
+    """Delete a book the way another worker would, without touching this worker's cache."""
+    with app.app_context():
+        db.session.delete(db.session.get(AccountingBook, book_id))
+        db.session.commit()
+
+
+def test_other_users_book(app, client):
+    book_id = client.post("/api/books", json={"name": "Mine"}).get_json()["id"]
+    other = app.test_client()
+    token = signup(other, "bob").get_json()["token"]
+    other.environ_base["HTTP_AUTHORIZATION"] = "Bearer " + token
+    assert other.get(f"/api/accounts?book_id={book_id}").status_code == 404
+    assert client.get(f"/api/accounts?book_id={book_id}").status_code == 200
+
+
+def test_book_deleted_through_another_worker(app, client):
+    book_id = client.post("/api/books", json={"name": "Doomed"}).get_json()["id"]
+    assert client.get(f"/api/accounts?book_id={book_id}").status_code == 200  # caches ownership
+    delete_elsewhere(app, book_id)
+
+    response = client.post("/api/journal", json={"book_id": book_id, "date": "2025-01-15", "lines": []})
+    assert response.status_code == 404
+    with app.app_context():
+        assert app.extensions["owned_books"].get("1") is None  # the only user
+    # The next request reloads the owned set and no longer sees the book
+    assert client.get(f"/api/accounts?book_id={book_id}").status_code == 404
+
+
+def test_import_and_export_of_deleted_book(app, client):
+    book_id = client.post("/api/books", json={"name": "Doomed"}).get_json()["id"]
+    assert client.get(f"/api/accounts?book_id={book_id}").status_code == 200
+    delete_elsewhere(app, book_id)
+    response = client.post(f"/api/journal/import?book_id={book_id}&format=jsonl", data=b"")
+    assert response.status_code == 404
+    assert client.get(f"/api/journal/export?book_id={book_id}").status_code == 404
@@ -0,0 +1,42 @@
+import io
+
+import contact_io
+from bulk_import import RowError
+
+
+def test_clean_row():
+    contact, error = contact_io.clean_row({
+        "name": " Ada ", "email": " ADA@Example.com", "phone": "+44 (20) 7946-0958", "company": ""
+    })
+    assert error is None
+    assert contact == {"name": "Ada", "email": "ada@example.com", "phone": "442079460958",
+                       "company": None, "notes": None}
+
+
+def test_clean_row_errors():
+    assert contact_io.clean_row(["Ada"]) == (None, "Each contact must be an object.")
+    assert contact_io.clean_row({"email": "a@b.co"}) == (None, "Name is required.")
+    assert contact_io.clean_row({"name": "Ada", "email": "ada"}) == (None, "Invalid email format.")
+    assert contact_io.clean_row({"name": "Ada", "phone": "123"}) == (None, "Invalid phone number.")
+    assert contact_io.clean_row({"name": "A" * 121}) == (None, "name is longer than 120 characters.")
+
+
+def test_iter_csv():
+    parsed = list(contact_io.iter_csv(io.StringIO("name,email\nAda,ada@example.com\nBob,\n")))
+    assert parsed == [(2, {"name": "Ada", "email": "ada@example.com"}), (3, {"name": "Bob", "email": ""})]
+    missing = list(contact_io.iter_csv(io.StringIO("email\na@b.co\n")))
+    assert len(missing) == 1 and isinstance(missing[0][1], RowError)
+
+
+def test_iter_json():
+    assert list(contact_io.iter_json([{"name": "Ada"}, "x"])) == [(1, {"name": "Ada"}), (2, "x")]
+    parsed = list(contact_io.iter_json({"name": "Ada"}))
+    assert len(parsed) == 1 and isinstance(parsed[0][1], RowError)
+
+
+def test_report_counts():
+    report = contact_io.ContactImportReport()
+    report.created, report.updated = 2, 1
+    report.error(3, "Name is required.")
+    result = report.as_dict()
+    assert (result["created"], result["updated"], result["failed"]) == (2, 1, 1)
@@ -0,0 +1,57 @@
+import pytest
+
+CONTACTS = [
+    {"name": "Ada Lovelace", "company": "Analytical", "email": "ada@example.com"},
+    {"name": "Grace Hopper", "company": "Navy", "notes": "100% COBOL"},
+    {"name": "Alan Turing", "company": None},
+    {"name": "Edsger Dijkstra", "company": "Analytical"},
+    {"name": "Barbara Liskov", "company": "MIT"},
+]
+
+
+@pytest.fixture
+def contacts(client):
+    for contact in CONTACTS:
+        assert client.post("/api/contacts", json=contact).status_code == 201
+
+
+def walk(client, query, limit=2):
+    names, url = [], f"/api/contacts?{query}&limit={limit}"
+    while url:
+        page = client.get(url).get_json()
+        names += [c["name"] for c in page["contacts"]]
+        url = page["next_cursor"] and f"/api/contacts?{query}&limit={limit}&after={page['next_cursor']}"
+    return names
+
+
+@pytest.mark.parametrize("query", ["sort=name", "sort=company&order=desc", "sort=id&order=desc", "sort=email"])
+def test_pages_match_the_full_listing(client, contacts, query):
+    everything = [c["name"] for c in client.get(f"/api/contacts?{query}").get_json()]
+    assert len(everything) == len(CONTACTS)
+    assert walk(client, query) == everything
+
+
+def test_company_sort_puts_missing_first(client, contacts):
+    names = walk(client, "sort=company")
+    assert names[0] == "Alan Turing"
+    assert names[1:3] == ["Ada Lovelace", "Edsger Dijkstra"]
+
+
+def test_cursor_is_bound_to_its_sort(client, contacts):
+    cursor = client.get("/api/contacts?sort=name&limit=2").get_json()["next_cursor"]
+    response = client.get(f"/api/contacts?sort=id&limit=2&after={cursor}")
+    assert response.status_code == 400
+    assert client.get(f"/api/contacts?sort=name&order=desc&after={cursor}").status_code == 400
+    assert client.get("/api/contacts?after=garbage").status_code == 400
+    assert client.get("/api/contacts?sort=phone").status_code == 400
+
+
+def test_search(client, contacts):
+    def search(q):
+        return sorted(c["name"] for c in client.get("/api/contacts", query_string={"q": q}).get_json())
+    assert search("analytical") == ["Ada Lovelace", "Edsger Dijkstra"]
+    assert search("ada analytical") == ["Ada Lovelace"]
+    # LIKE wildcards in the term are matched literally
+    assert search("100%") == ["Grace Hopper"]
+    assert search("%") == ["Grace Hopper"]
+    assert search("_") == []
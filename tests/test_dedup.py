@@ -0,0 +1,41 @@
+from dedup import UnionFind, name_key, normalize_company, normalize_text, phone_key, similar
+
+
+def test_normalize_text():
+    assert normalize_text("  José  O'Brien-Smith ") == "jose o brien smith"
+    assert normalize_text(None) == ""
+
+
+def test_normalize_company_drops_suffixes():
+    assert normalize_company("Acme Co. Ltd") == "acme"
+    assert normalize_company("Company") == ""
+
+
+def test_phone_key_matches_national_and_international():
+    assert phone_key("+254 712 345 678") == phone_key("0712-345-678") == "712345678"
+    assert phone_key("12345") is None
+    assert phone_key("ext. 12345678") is None
+    assert phone_key(None) is None
+
+
+def test_name_key_ignores_token_order():
+    assert name_key("jon smith") == name_key("smith jonathan") == "jon smi"
+    assert name_key("") is None
+
+
+def test_union_find_groups_transitively():
+    groups = UnionFind()
+    groups.union(3, 2)
+    groups.union(2, 5)
+    groups.union(7, 8)
+    assert groups.find(5) == groups.find(3) == 2
+    assert groups.find(8) == 7
+    assert groups.find(9) == 9
+
+
+def test_similar():
+    a = {"name": "jon smith", "company": "acme"}
+    assert similar(a, {"name": "jon smyth", "company": "acme"})
+    assert similar(a, {"name": "jon smith", "company": ""})
+    assert not similar(a, {"name": "jon smith", "company": "globex"})
+    assert not similar(a, {"name": "jane doe", "company": "acme"})
@@ -0,0 +1,100 @@
+import io
+from datetime import datetime, timedelta
+
+import pytest
+
+import jobs
+from conftest import post_entry
+from db import db
+from models import Attachment, Job
+
+PNG_SIZE = (640, 480)
+
+
+@pytest.fixture
+def ctx(app):
+    with app.app_context():
+        yield
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+    monkeypatch.setitem(jobs.HANDLERS, "test.ok", calls.append)
+
+    def fail(payload):
+        raise RuntimeError("boom")
+    monkeypatch.setitem(jobs.HANDLERS, "test.fail", fail)
+    return calls
+
+
+def test_claim_and_run(ctx, calls):
+    jobs.enqueue("test.ok", {"n": 1})
+    db.session.commit()
+    job = jobs.claim(timeout=600)
+    assert (job.status, job.attempts) == ("running", 1)
+    assert jobs.claim(timeout=600) is None  # claimed once only
+    jobs.run_job(job)
+    assert calls == [{"n": 1}]
+    assert db.session.get(Job, job.id).status == "done"
+
+
+def test_failures_back_off_then_give_up(ctx, calls):
+    jobs.enqueue("test.fail", {})
+    db.session.commit()
+    job_id = Job.query.one().id
+    for attempt in range(1, jobs.MAX_ATTEMPTS + 1):
+        job = jobs.claim(timeout=600)
+        assert job is not None and job.attempts == attempt
+        jobs.run_job(job)
+        job = db.session.get(Job, job_id)
+        assert job.last_error == "boom"
+        if attempt < jobs.MAX_ATTEMPTS:
+            assert job.status == "queued"
+            assert job.run_after > datetime.utcnow()
+            assert jobs.claim(timeout=600) is None  # not before the backoff
+            job.run_after = datetime.utcnow() - timedelta(seconds=1)
+            db.session.commit()
+    assert db.session.get(Job, job_id).status == "failed"
+
+
+def test_unknown_kind_fails(ctx):
+    jobs.enqueue("test.missing", {})
+    db.session.commit()
+    jobs.run_job(jobs.claim(timeout=600))
+    assert "No handler" in Job.query.one().last_error
+
+
+def test_stale_running_job_is_reclaimed(ctx, calls):
+    jobs.enqueue("test.ok", {})
+    db.session.commit()
+    job = jobs.claim(timeout=600)
+    job.locked_at = datetime.utcnow() - timedelta(seconds=601)
+    db.session.commit()
+    reclaimed = jobs.claim(timeout=600)
+    assert reclaimed.id == job.id and reclaimed.attempts == 2
+
+
+def test_worker_processes_uploaded_attachments(app, client, book):
+    Image = pytest.importorskip("PIL.Image")
+    book_id, accounts = book
+    entry_id = post_entry(client, book_id, accounts["Cash"], accounts["Sales"], 10).get_json()["id"]
+    image = io.BytesIO()
+    Image.new("RGB", PNG_SIZE, "red").save(image, "PNG")
+    image.seek(0)
+    attachment = client.post(f"/api/journal/upload/{entry_id}", data={"file": (image, "r.png")},
+                             content_type="multipart/form-data").get_json()["attachments"][0]
+    assert attachment["preview_url"] is None
+
+    result = app.test_cli_runner().invoke(args=["worker", "--once", "--threads", "1"])
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        assert Attachment.query.one().processed_at is not None
+        assert Job.query.one().status == "done"
+    entry = client.get(f"/api/journal?book_id={book_id}").get_json()[0]
+    preview_url = entry["attachments"][0]["preview_url"]
+    response = client.get(preview_url)
+    assert response.status_code == 200
+    assert response.mimetype == "image/jpeg"
+    thumbnail = Image.open(io.BytesIO(response.data))
+    assert max(thumbnail.size) <= 320
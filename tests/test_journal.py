@@ -0,0 +1,81 @@
+from conftest import post_entry
+
+
+def test_create_entry(client, book):
+    book_id, accounts = book
+    response = post_entry(client, book_id, accounts["Cash"], accounts["Sales"], "100.10")
+    assert response.status_code == 201
+    entries = client.get(f"/api/journal?book_id={book_id}").get_json()
+    assert len(entries) == 1
+
+
+def test_unbalanced_entry(client, book):
+    book_id, accounts = book
+    response = client.post("/api/journal", json={"book_id": book_id, "date": "2025-01-15", "lines": [
+        {"account_id": accounts["Cash"], "debit": 0.1},
+        {"account_id": accounts["Cash"], "debit": 0.2},
+        {"account_id": accounts["Sales"], "credit": 0.3},
+    ]})
+    assert response.status_code == 201
+    response = post_entry(client, book_id, accounts["Cash"], accounts["Sales"], 10, lines=[
+        {"account_id": accounts["Cash"], "debit": 10},
+        {"account_id": accounts["Sales"], "credit": 9.99},
+    ])
+    assert response.status_code == 400
+
+
+def test_malformed_lines(client, book):
+    book_id, accounts = book
+    cash, sales = accounts["Cash"], accounts["Sales"]
+    for lines in (
+        {"account_id": cash},
+        [1],
+        [{"debit": 1}],
+        [{"account_id": cash, "debit": "ten"}, {"account_id": sales, "credit": "ten"}],
+        [{"account_id": cash, "debit": "Infinity"}, {"account_id": sales, "credit": "Infinity"}],
+        [{"account_id": cash, "debit": "NaN"}, {"account_id": sales, "credit": "NaN"}],
+        [{"account_id": cash, "debit": "1e300"}, {"account_id": sales, "credit": "1e300"}],
+    ):
+        response = client.post("/api/journal", json={"book_id": book_id, "date": "2025-01-15", "lines": lines})
+        assert response.status_code == 400, lines
+
+
+def test_foreign_account(client, book):
+    book_id, accounts = book
+    other = client.post("/api/books", json={"name": "Other"}).get_json()["id"]
+    response = post_entry(client, other, accounts["Cash"], accounts["Sales"], 5)
+    assert response.status_code == 400
+    assert "does not exist in this book" in response.get_json()["error"]
+
+
+def test_edit_rejects_non_finite_amounts(client, book):
+    book_id, accounts = book
+    entry_id = post_entry(client, book_id, accounts["Cash"], accounts["Sales"], 5).get_json()["id"]
+    response = client.put(f"/api/journal/{entry_id}", json={"lines": [
+        {"account_id": accounts["Cash"], "debit": "inf"},
+        {"account_id": accounts["Sales"], "credit": "inf"},
+    ]})
+    assert response.status_code == 400
+
+
+def test_keyset_pagination(client, book):
+    book_id, accounts = book
+    for day in ("2025-01-03", "2025-01-01", "2025-01-03", "2025-01-02", "2025-01-03"):
+        post_entry(client, book_id, accounts["Cash"], accounts["Sales"], 1, day=day)
+    everything = [e["id"] for e in client.get(f"/api/journal?book_id={book_id}").get_json()]
+
+    seen, url = [], f"/api/journal?book_id={book_id}&limit=2"
+    while url:
+        page = client.get(url).get_json()
+        assert len(page["entries"]) <= 2
+        seen += [e["id"] for e in page["entries"]]
+        url = page["next_cursor"] and f"/api/journal?book_id={book_id}&limit=2&after={page['next_cursor']}"
+    assert seen == everything
+    assert [e["date"][:10] for e in client.get(f"/api/journal?book_id={book_id}").get_json()] == [
+        "2025-01-03", "2025-01-03", "2025-01-03", "2025-01-02", "2025-01-01"
+    ]
+
+
+def test_invalid_cursor(client, book):
+    book_id, _ = book
+    assert client.get(f"/api/journal?book_id={book_id}&after=not-a-cursor").status_code == 400
@@ -0,0 +1,90 @@
+import io
+import json
+from datetime import date
+from decimal import Decimal
+
+import journal_import
+from bulk_import import ImportReport, RowError
+
+
+def jsonl(*rows):
+    return io.StringIO("\n".join(r if isinstance(r, str) else json.dumps(r) for r in rows))
+
+
+def entry(**fields):
+    raw = {"date": "2025-01-31", "description": "Rent", "lines": [
+        {"account_id": 1, "debit": "100.50"},
+        {"account_id": "2", "credit": 100.5}
+    ]}
+    raw.update(fields)
+    return raw
+
+
+def test_jsonl():
+    parsed = list(journal_import.iter_jsonl(jsonl(entry(), "", entry(status="posted"))))
+    assert [row for row, _ in parsed] == [1, 3]
+    first = parsed[0][1]
+    assert first["date"] == date(2025, 1, 31)
+    assert first["status"] == "draft"
+    assert first["lines"] == [(1, Decimal("100.50"), Decimal(0)), (2, Decimal(0), Decimal("100.5"))]
+    assert parsed[1][1]["status"] == "posted"
+
+
+def test_jsonl_row_errors():
+    rows = [
+        "{not json",
+        [1, 2],
+        entry(lines={"account_id": 1}),
+        entry(lines=[1]),
+        entry(lines=[{"account_id": "x", "debit": 1}]),
+        entry(lines=[{"account_id": 1, "debit": "NaN"}, {"account_id": 2, "credit": "NaN"}]),
+        entry(lines=[{"account_id": 1, "debit": "Infinity"}, {"account_id": 2, "credit": "Infinity"}]),
+        entry(lines=[{"account_id": 1, "debit": -5}, {"account_id": 2, "credit": -5}]),
+        entry(lines=[{"account_id": 1, "debit": 5}, {"account_id": 2, "credit": 4}]),
+        entry(lines=[]),
+        entry(date="31/01/2025"),
+        entry(description=["Rent"]),
+        entry(status=1),
+    ]
+    parsed = list(journal_import.iter_jsonl(jsonl(*rows)))
+    assert len(parsed) == len(rows)
+    assert all(isinstance(item, RowError) for _, item in parsed)
+
+
+def test_csv_groups_by_entry_ref():
+    body = io.StringIO(
+        "entry_ref,date,description,status,account_id,debit,credit\n"
+        "a,2025-01-01,Sale,posted,1,50,\n"
+        "a,,,,2,,50\n"
+        "b,2025-01-02,Bad,,1,10,\n"
+        "b,,,,x,,10\n"
+        "c,2025-01-03,Fee,,1,5,\n"
+        "c,,,,3,,5\n"
+    )
+    parsed = list(journal_import.iter_csv(body))
+    assert [row for row, _ in parsed] == [2, 4, 6]
+    assert parsed[0][1]["description"] == "Sale"
+    assert parsed[0][1]["status"] == "posted"
+    assert len(parsed[0][1]["lines"]) == 2
+    assert str(parsed[1][1]) == "Row 5: Invalid account_id 'x'."
+    assert parsed[2][1]["date"] == date(2025, 1, 3)
+
+
+def test_csv_missing_columns():
+    parsed = list(journal_import.iter_csv(io.StringIO("date,debit\n2025-01-01,1\n")))
+    assert len(parsed) == 1
+    assert str(parsed[0][1]) == "Missing CSV columns: account_id, entry_ref."
+
+
+def test_report_truncates_errors(monkeypatch):
+    monkeypatch.setattr("bulk_import.MAX_REPORTED_ERRORS", 2)
+    report = ImportReport()
+    report.imported = 5
+    for row in range(3):
+        report.error(row, "bad")
+    assert report.as_dict() == {
+        "imported": 5,
+        "failed": 3,
+        "errors": [{"row": 0, "error": "bad"}, {"row": 1, "error": "bad"}],
+        "errors_truncated": True
+    }
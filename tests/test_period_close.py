@@ -0,0 +1,64 @@
+import io
+import json
+
+from conftest import post_entry
+
+
+def balance_sheet(client, book_id, **args):
+    query = "".join(f"&{k}={v}" for k, v in args.items())
+    return client.get(f"/api/journal/balance-sheet?book_id={book_id}{query}").get_json()
+
+
+def test_close_locks_the_period(client, book):
+    book_id, accounts = book
+    entry_id = post_entry(client, book_id, accounts["Cash"], accounts["Capital"], 100, day="2025-01-10").get_json()["id"]
+    response = client.post(f"/api/books/{book_id}/close", json={"period_end": "2025-01-31"})
+    assert response.status_code == 201
+    assert response.get_json()["period_end"] == "2025-01-31"
+
+    assert post_entry(client, book_id, accounts["Cash"], accounts["Capital"], 1, day="2025-01-31").status_code == 409
+    assert client.put(f"/api/journal/{entry_id}", json={"lines": []}).status_code == 409
+    assert client.delete(f"/api/journal/{entry_id}").status_code == 409
+    # Moving a later entry into the closed period is refused too
+    later = post_entry(client, book_id, accounts["Cash"], accounts["Capital"], 1, day="2025-02-01").get_json()["id"]
+    assert client.put(f"/api/journal/{later}", json={"date": "2025-01-15", "lines": []}).status_code == 409
+
+    body = json.dumps({"date": "2025-01-20", "lines": [
+        {"account_id": accounts["Cash"], "debit": 1}, {"account_id": accounts["Capital"], "credit": 1}
+    ]})
+    report = client.post(f"/api/journal/import?book_id={book_id}&format=jsonl", data=io.BytesIO(body.encode()))
+    assert report.get_json()["imported"] == 0
+    assert report.get_json()["errors"][0]["error"] == "Entry falls in a closed period."
+
+
+def test_close_validation(client, book):
+    book_id, _ = book
+    assert client.post(f"/api/books/{book_id}/close", json={}).status_code == 400
+    assert client.post(f"/api/books/{book_id}/close", json={"period_end": "2025-03-31"}).status_code == 201
+    assert client.post(f"/api/books/{book_id}/close", json={"period_end": "2025-02-28"}).status_code == 400
+    assert client.post("/api/books/9999/close", json={"period_end": "2025-02-28"}).status_code == 404
+
+
+def test_reports_start_from_the_snapshot(client, book):
+    book_id, accounts = book
+    post_entry(client, book_id, accounts["Cash"], accounts["Capital"], 100, day="2025-01-10")
+    post_entry(client, book_id, accounts["Cash"], accounts["Loan"], 40, day="2025-02-10")
+    before = balance_sheet(client, book_id, as_of="2025-02-28")
+    client.post(f"/api/books/{book_id}/close", json={"period_end": "2025-01-31"})
+    after = balance_sheet(client, book_id, as_of="2025-02-28")
+    assert after == before
+    assert after["total_assets"] == 140
+    assert balance_sheet(client, book_id, as_of="2025-01-31")["total_assets"] == 100
+
+
+def test_reopen(client, book):
+    book_id, accounts = book
+    client.post(f"/api/books/{book_id}/close", json={"period_end": "2025-01-31"})
+    client.post(f"/api/books/{book_id}/close", json={"period_end": "2025-02-28"})
+    response = client.post(f"/api/books/{book_id}/reopen")
+    assert response.get_json()["closed_through"] == "2025-01-31"
+    assert post_entry(client, book_id, accounts["Cash"], accounts["Capital"], 1, day="2025-02-15").status_code == 201
+    closes = client.get(f"/api/books/{book_id}/closes").get_json()
+    assert [c["period_end"] for c in closes["closes"]] == ["2025-01-31"]
+    client.post(f"/api/books/{book_id}/reopen")
+    assert client.post(f"/api/books/{book_id}/reopen").status_code == 400
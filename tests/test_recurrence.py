@@ -0,0 +1,118 @@
+from datetime import date
+from itertools import islice
+
+import pytest
+
+from recurrence import RecurrenceError, next_occurrence, occurrences, parse_rule
+
+
+def dates(rule_text, start, window_start=None, window_end=None, limit=50):
+    return list(islice(occurrences(parse_rule(rule_text), start, window_start, window_end), limit))
+
+
+def test_no_recurrence():
+    for text in (None, "", "none", "Never", " once "):
+        assert parse_rule(text) is None
+    assert dates("none", date(2025, 1, 1)) == [date(2025, 1, 1)]
+
+
+def test_legacy_values():
+    assert str(parse_rule("weekly")) == "FREQ=WEEKLY"
+    assert str(parse_rule("Annually")) == "FREQ=YEARLY"
+
+
+def test_round_trip():
+    text = "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,FR;COUNT=5"
+    assert str(parse_rule(text)) == text
+    assert str(parse_rule("RRULE:freq=monthly;bymonthday=15;until=20251231")) == \
+        "FREQ=MONTHLY;BYMONTHDAY=15;UNTIL=20251231"
+
+
+@pytest.mark.parametrize("text", [
+    "FREQ=HOURLY",
+    "FREQ=DAILY;INTERVAL=0",
+    "FREQ=DAILY;INTERVAL=x",
+    "FREQ=DAILY;BYDAY=MO",
+    "FREQ=WEEKLY;BYDAY=XX",
+    "FREQ=WEEKLY;BYMONTHDAY=3",
+    "FREQ=MONTHLY;BYMONTHDAY=32",
+    "FREQ=DAILY;COUNT=2;UNTIL=20250101",
+    "FREQ=DAILY;UNTIL=tomorrow",
+    "FREQ=DAILY;BYHOUR=9",
+    "FREQ=DAILY;INTERVAL",
+])
+def test_invalid_rules(text):
+    with pytest.raises(RecurrenceError):
+        parse_rule(text)
+
+
+def test_daily_count():
+    assert dates("FREQ=DAILY;COUNT=3", date(2025, 1, 30)) == [
+        date(2025, 1, 30), date(2025, 1, 31), date(2025, 2, 1)
+    ]
+
+
+def test_weekly_byday_counts_start():
+    # Start is a Wednesday and is the first occurrence even though it is not in BYDAY
+    assert dates("FREQ=WEEKLY;BYDAY=MO,FR;COUNT=4", date(2025, 1, 1)) == [
+        date(2025, 1, 1), date(2025, 1, 3), date(2025, 1, 6), date(2025, 1, 10)
+    ]
+
+
+def test_monthly_skips_short_months():
+    assert dates("FREQ=MONTHLY;COUNT=4", date(2025, 1, 31)) == [
+        date(2025, 1, 31), date(2025, 3, 31), date(2025, 5, 31), date(2025, 7, 31)
+    ]
+
+
+def test_yearly_leap_day():
+    assert dates("FREQ=YEARLY;COUNT=3", date(2024, 2, 29)) == [
+        date(2024, 2, 29), date(2028, 2, 29), date(2032, 2, 29)
+    ]
+
+
+def test_until_is_inclusive():
+    assert dates("FREQ=WEEKLY;UNTIL=20250115", date(2025, 1, 1)) == [
+        date(2025, 1, 1), date(2025, 1, 8), date(2025, 1, 15)
+    ]
+
+
+def test_window_jumps_ahead():
+    assert dates("FREQ=MONTHLY;BYMONTHDAY=10", date(2000, 1, 10),
+                 date(2025, 3, 1), date(2025, 5, 31)) == [
+        date(2025, 3, 10), date(2025, 4, 10), date(2025, 5, 10)
+    ]
+
+
+def test_window_with_count():
+    assert dates("FREQ=DAILY;COUNT=5", date(2025, 1, 1), date(2025, 1, 4), date(2025, 1, 31)) == [
+        date(2025, 1, 4), date(2025, 1, 5)
+    ]
+
+
+def test_start_after_window():
+    assert dates("daily", date(2025, 2, 1), date(2025, 1, 1), date(2025, 1, 31)) == []
+
+
+def test_day_that_never_occurs_ends_the_series():
+    # Every twelfth month from April is an April, which has no 31st
+    rule = parse_rule("FREQ=MONTHLY;INTERVAL=12;BYMONTHDAY=31")
+    assert list(occurrences(rule, date(2025, 4, 30))) == [date(2025, 4, 30)]
+    assert list(occurrences(rule, date(2025, 4, 30), date(2026, 1, 1), date(2030, 12, 31))) == []
+    assert next_occurrence(rule, date(2025, 4, 30)) is None
+
+
+def test_leap_day_past_the_last_year():
+    rule = parse_rule("FREQ=YEARLY;INTERVAL=1000")
+    assert list(occurrences(rule, date(2000, 2, 29))) == [
+        date(2000, 2, 29), date(4000, 2, 29), date(6000, 2, 29), date(8000, 2, 29)
+    ]
+
+
+def test_next_occurrence_decrements_count():
+    following, remaining = next_occurrence(parse_rule("FREQ=DAILY;COUNT=3"), date(2025, 1, 1))
+    assert following == date(2025, 1, 2)
+    assert str(remaining) == "FREQ=DAILY;COUNT=2"
+    assert next_occurrence(parse_rule("FREQ=DAILY;COUNT=1"), date(2025, 1, 1)) is None
+    assert next_occurrence(parse_rule("FREQ=DAILY;UNTIL=20250101"), date(2025, 1, 1)) is None
+    assert next_occurrence(None, date(2025, 1, 1)) is None
@@ -0,0 +1,51 @@
+from cache import init_cache
+from conftest import post_entry
+
+
+def trial_balance(client, book_id, **headers):
+    return client.get(f"/api/journal/trial-balance?book_id={book_id}", headers=headers)
+
+
+def test_etag_and_not_modified(client, book):
+    book_id, accounts = book
+    post_entry(client, book_id, accounts["Cash"], accounts["Sales"], 25)
+    response = trial_balance(client, book_id)
+    assert response.status_code == 200
+    assert response.get_json()["total_debit"] == 25
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+    again = trial_balance(client, book_id, **{"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.data == b""
+    assert trial_balance(client, book_id).get_data() == response.get_data()
+
+
+def test_writes_invalidate_cached_reports(client, book):
+    book_id, accounts = book
+    post_entry(client, book_id, accounts["Cash"], accounts["Sales"], 25)
+    etag = trial_balance(client, book_id).headers["ETag"]
+
+    post_entry(client, book_id, accounts["Rent"], accounts["Cash"], 5)
+    response = trial_balance(client, book_id, **{"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.get_json()["total_debit"] == 30
+
+
+def test_etag_depends_on_parameters(client, book):
+    book_id, _ = book
+    plain = trial_balance(client, book_id).headers["ETag"]
+    ranged = client.get(f"/api/journal/trial-balance?book_id={book_id}&from=2025-01-01")
+    assert ranged.headers["ETag"] != plain
+    assert client.get(f"/api/journal/income-statement?book_id={book_id}",
+                      headers={"If-None-Match": plain}).status_code == 200
+
+
+def test_cache_disabled_with_several_workers(app, client, book, monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    init_cache(app)
+    book_id, _ = book
+    response = trial_balance(client, book_id)
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
@@ -0,0 +1,48 @@
+from reports import rollup, rollup_report
+
+
+def row(account_id, **values):
+    return dict(account_id=account_id, account_code=str(account_id), account_name=f"A{account_id}", **values)
+
+
+def test_rollup_nests_and_subtotals():
+    roots = rollup(
+        [row(1, balance=1.0), row(2, balance=2.0), row(3, balance=3.0), row(4, balance=4.0)],
+        {2: 1, 3: 2},
+        ["balance"]
+    )
+    assert [r["account_id"] for r in roots] == [1, 4]
+    assert roots[0]["subtotal"] == {"balance": 6.0}
+    assert roots[0]["children"][0]["subtotal"] == {"balance": 5.0}
+    assert roots[1]["subtotal"] == {"balance": 4.0}
+
+
+def test_rollup_missing_parent_becomes_root():
+    roots = rollup([row(2, amount=1.0)], {2: 99}, ["amount"])
+    assert [r["account_id"] for r in roots] == [2]
+
+
+def test_rollup_breaks_parent_cycles():
+    roots = rollup([row(1, amount=1.0), row(2, amount=2.0)], {1: 2, 2: 1}, ["amount"])
+    assert len(roots) == 1
+    assert roots[0]["subtotal"] == {"amount": 3.0}
+    assert len(roots[0]["children"]) == 1
+
+
+def test_rollup_deep_chain():
+    depth = 5000
+    rows = [row(i, amount=1.0) for i in range(depth)]
+    roots = rollup(rows, {i: i - 1 for i in range(1, depth)}, ["amount"])
+    assert roots[0]["subtotal"] == {"amount": float(depth)}
+
+
+def test_rollup_report_converts_every_account_list():
+    report = {
+        "accounts": [row(1, debit=1.0, credit=0.0), row(2, debit=2.0, credit=1.0)],
+        "empty": [],
+        "total_debit": 3.0
+    }
+    result = rollup_report(report, {2: 1})
+    assert result["total_debit"] == 3.0
+    assert result["empty"] == []
+    assert result["accounts"][0]["subtotal"] == {"debit": 3.0, "credit": 1.0}
@@ -0,0 +1,69 @@
+import io
+import time
+from datetime import timedelta
+
+import pytest
+
+from storage import (
+    LocalStorage, ReceivedFile, S3Storage, UnsupportedFileType, UploadTooLarge, object_key, receive
+)
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
+
+
+def test_receive_hashes_and_sniffs(tmp_path):
+    received = receive(io.BytesIO(PNG), 1000, tmp_dir=str(tmp_path))
+    assert (received.size, received.content_type) == (len(PNG), "image/png")
+    assert len(received.sha256) == 64
+    received.discard()
+
+
+def test_receive_rejects(tmp_path):
+    with pytest.raises(UploadTooLarge):
+        receive(io.BytesIO(PNG), 10, tmp_dir=str(tmp_path))
+    with pytest.raises(UnsupportedFileType):
+        receive(io.BytesIO(b"MZ executable"), 1000, tmp_dir=str(tmp_path))
+    assert list(tmp_path.iterdir()) == []
+
+
+def stored_twice(storage, tmp_dir, key):
+    """Put the same blob twice, a second apart; return its modification times."""
+    times = []
+    for _ in range(2):
+        received = receive(io.BytesIO(PNG), 1000, tmp_dir=tmp_dir)
+        storage.put(received, key)
+        times.append(dict(storage.list())[key])
+        time.sleep(1.1)
+    return times
+
+
+def test_local_put_refreshes_existing_blob(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    key = object_key("ab" * 32)
+    first, second = stored_twice(storage, storage.tmp_dir, key)
+    assert second - first >= timedelta(seconds=1)
+
+
+def test_s3_put_refreshes_existing_blob(tmp_path, monkeypatch):
+    moto = pytest.importorskip("moto")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with moto.mock_aws():
+        storage = S3Storage("attachments", prefix="crm", tmp_dir=str(tmp_path))
+        storage.client.create_bucket(Bucket="attachments")
+        key = object_key("cd" * 32)
+        first, second = stored_twice(storage, str(tmp_path), key)
+        assert second - first >= timedelta(seconds=1)
+        head = storage.client.head_object(Bucket="attachments", Key="crm/" + key)
+        assert head["ContentType"] == "image/png"
+        assert storage.open(key).read() == PNG
+
+
+def test_received_file_discard_is_idempotent(tmp_path):
+    path = tmp_path / "upload"
+    path.write_bytes(b"x")
+    received = ReceivedFile(str(path), "0" * 64, 1, "image/png")
+    received.discard()
+    received.discard()
+    assert not path.exists()
@@ -0,0 +1,35 @@
+def create_task(client, **fields):
+    return client.post("/api/tasks", json=dict({"description": "Pay rent", "dueDate": "2025-04-30"}, **fields))
+
+
+def test_long_recurrence_rules(client):
+    rule = "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TU,WE,TH,FR;COUNT=10"
+    assert len(rule) > 50
+    response = create_task(client, recurrence=rule)
+    assert response.status_code == 201
+    assert response.get_json()["recurrence"] == rule
+
+    response = create_task(client, recurrence=rule + ";" * 250)
+    assert response.status_code == 400
+    assert "at most 255 characters" in response.get_json()["error"]
+    response = create_task(client, recurrence=["FREQ=DAILY"])
+    assert response.status_code == 400
+
+
+def test_roll_forward_counts_down(client):
+    task_id = create_task(client, recurrence="FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TU,WE,TH,FR;COUNT=10").get_json()["id"]
+    response = client.post("/api/tasks/roll-forward", json={"ids": [task_id]})
+    assert response.status_code == 200
+    created = response.get_json()["created"]
+    assert [(t["dueDate"], t["recurrence"]) for t in created] == [
+        ("2025-05-01", "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TU,WE,TH,FR;COUNT=9")
+    ]
+
+
+def test_rule_that_never_recurs(client):
+    task_id = create_task(client, recurrence="FREQ=MONTHLY;INTERVAL=12;BYMONTHDAY=31").get_json()["id"]
+    response = client.get("/api/tasks/calendar?from=2025-01-01&to=2025-12-31")
+    assert response.status_code == 200
+    assert [o["date"] for o in response.get_json()["occurrences"]] == ["2025-04-30"]
+    response = client.post("/api/tasks/roll-forward", json={"ids": [task_id]})
+    assert response.get_json()["created"] == []
@@ -0,0 +1,61 @@
+from app import create_app
+from conftest import PASSWORD, signup
+
+
+def bearer(token):
+    return {"Authorization": "Bearer " + token}
+
+
+def test_refresh_rotates(app):
+    client = app.test_client()
+    tokens = signup(client).get_json()
+    response = client.post("/api/auth/refresh", headers=bearer(tokens["refresh_token"]))
+    assert response.status_code == 200
+    rotated = response.get_json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    assert client.get("/api/auth/me", headers=bearer(rotated["token"])).status_code == 200
+
+    # A refresh token is exchanged once; the replacement keeps working
+    reused = client.post("/api/auth/refresh", headers=bearer(tokens["refresh_token"]))
+    assert reused.status_code == 401
+    assert client.post("/api/auth/refresh", headers=bearer(rotated["refresh_token"])).status_code == 200
+
+
+def test_token_types_are_not_interchangeable(app):
+    client = app.test_client()
+    tokens = signup(client).get_json()
+    assert client.post("/api/auth/refresh", headers=bearer(tokens["token"])).status_code == 422
+    assert client.get("/api/auth/me", headers=bearer(tokens["refresh_token"])).status_code == 422
+
+
+def test_logout_revokes_both_tokens(app):
+    client = app.test_client()
+    signup(client)
+    tokens = client.post("/api/auth/login", json={"login": "alice", "password": PASSWORD}).get_json()
+    response = client.post("/api/auth/logout", headers=bearer(tokens["token"]),
+                           json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    assert client.get("/api/auth/me", headers=bearer(tokens["token"])).status_code == 401
+    assert client.post("/api/auth/refresh", headers=bearer(tokens["refresh_token"])).status_code == 401
+
+
+def test_revocations_reach_other_workers(app, monkeypatch):
+    monkeypatch.setenv("BLOCKLIST_REFRESH", "0")
+    other_worker = create_app()
+    client = app.test_client()
+    tokens = signup(client).get_json()
+    other = other_worker.test_client()
+    assert other.get("/api/auth/me", headers=bearer(tokens["token"])).status_code == 200
+    client.post("/api/auth/logout", headers=bearer(tokens["token"]))
+    assert other.get("/api/auth/me", headers=bearer(tokens["token"])).status_code == 401
+    # Rotation is decided by the database, not the blocklist sync
+    assert other.post("/api/auth/refresh", headers=bearer(tokens["refresh_token"])).status_code == 200
+    assert client.post("/api/auth/refresh", headers=bearer(tokens["refresh_token"])).status_code == 401
+
+
+def test_prune_keeps_unexpired_revocations(app):
+    client = app.test_client()
+    tokens = signup(client).get_json()
+    client.post("/api/auth/logout", headers=bearer(tokens["token"]))
+    result = app.test_cli_runner().invoke(args=["tokens", "prune"])
+    assert "Pruned 0 expired revocations." in result.output
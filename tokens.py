@@ -0,0 +1,109 @@
+# tokens.py
+# Refresh-token rotation and the JWT blocklist. Revoked tokens (logged out,
+# or refresh tokens that have been rotated) are written to RevokedToken and
+# mirrored in a per-worker dict of jti -> expiry, which the JWTManager
+# blocklist loader checks on every request without touching the database.
+#
+# Each worker pulls rows revoked elsewhere at most every BLOCKLIST_REFRESH
+# seconds, so an access token logged out through another worker keeps
+# working for up to that long (access tokens are short-lived anyway).
+# Refresh tokens do not depend on that window: rotation inserts the old jti
+# under a unique constraint, so a refresh token can only ever be exchanged
+# once, whichever worker sees it. Entries are dropped once the token would
+# have expired on its own, which keeps the set small enough that a plain
+# set lookup is cheaper than a bloom filter with its false positives.
+import threading
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy.exc import IntegrityError
+
+from db import db
+from models import RevokedToken
+
+# Rows committed this long after their revoked_at are still picked up
+SYNC_OVERLAP = timedelta(seconds=60)
+
+tokens_cli = AppGroup("tokens", help="Maintain the JWT revocation list.")
+
+
+class Blocklist:
+    """Thread-safe in-memory mirror of the unexpired RevokedToken rows."""
+
+    def __init__(self, refresh_interval=30):
+        self.refresh_interval = refresh_interval
+        self._revoked = {}  # jti -> expiry as a unix timestamp
+        self._lock = threading.Lock()
+        self._synced_at = None
+        self._next_sync = 0
+
+    def __contains__(self, jti):
+        if time.monotonic() >= self._next_sync:
+            self.sync()
+        return jti in self._revoked
+
+    def add(self, jti, expires):
+        with self._lock:
+            self._revoked[jti] = expires
+
+    def sync(self):
+        """Load rows revoked since the last sync and drop expired entries."""
+        started = datetime.utcnow()
+        query = db.session.query(RevokedToken.jti, RevokedToken.expires_at).filter(
+            RevokedToken.expires_at > started
+        )
+        if self._synced_at is not None:
+            query = query.filter(RevokedToken.revoked_at >= self._synced_at - SYNC_OVERLAP)
+        rows = query.all()
+        now = time.time()
+        with self._lock:
+            for jti, expires_at in rows:
+                self._revoked[jti] = _timestamp(expires_at)
+            self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+            self._synced_at = started
+            self._next_sync = time.monotonic() + self.refresh_interval
+
+
+def _timestamp(naive_utc):
+    return (naive_utc - datetime(1970, 1, 1)).total_seconds()
+
+
+def init_tokens(app, jwt):
+    app.extensions["token_blocklist"] = Blocklist(app.config.get("BLOCKLIST_REFRESH", 30))
+
+    @jwt.token_in_blocklist_loader
+    def token_revoked(jwt_header, jwt_payload):
+        return jwt_payload["jti"] in current_app.extensions["token_blocklist"]
+
+
+def revoke(payload):
+    """Revoke a decoded token and commit; False if it was already revoked.
+
+    The unique jti makes this the atomic step of refresh rotation: of two
+    concurrent refreshes with the same token, only one gets True.
+    """
+    db.session.add(RevokedToken(
+        jti=payload["jti"],
+        token_type=payload.get("type", "access"),
+        user_id=int(payload["sub"]),
+        expires_at=datetime.utcfromtimestamp(payload["exp"])
+    ))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return False
+    finally:
+        current_app.extensions["token_blocklist"].add(payload["jti"], payload["exp"])
+    return True
+
+
+@tokens_cli.command("prune")
+def prune_command():
+    """Delete revocations of tokens that have expired anyway."""
+    count = RevokedToken.query.filter(RevokedToken.expires_at <= datetime.utcnow()).delete()
+    db.session.commit()
+    click.echo(f"Pruned {count} expired revocations.")